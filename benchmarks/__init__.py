@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de Flowbooster.
+
+Cada módulo se ejecuta desde la raíz del repositorio con
+``python -m benchmarks.<nombre>`` y no forma parte de la aplicación.
+"""
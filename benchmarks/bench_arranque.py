@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de arranque: importar core, la línea de comandos y la primera ventana del dashboard.
+
+Cada objetivo se lanza en un intérprete nuevo varias veces y se da la mediana, el
+mínimo y la primera ejecución (la más parecida a un arranque en frío). Antes se
+compilan core, cli y dashboard a bytecode, como en una instalación o en el
+ejecutable de PyInstaller. Para cada objetivo se añade el informe de
+'python -X importtime': los módulos con más tiempo propio y cuánto cuestan, si se
+cargan, las dependencias pesadas (Pillow, exifread, pyminizip, zipfile, sqlite3,
+PySide6). Uso:
+
+    python -m benchmarks.bench_arranque
+    python -m benchmarks.bench_arranque --repeticiones 20 --json arranque.json
+"""
+import argparse
+import compileall
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_compresion import version_repositorio
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos cuyo coste de importación se sigue aparte
+PESADOS = ("PIL", "exifread", "pyminizip", "zipfile", "sqlite3", "concurrent.futures.process", "PySide6")
+
+# La ventana se da por pintada cuando Qt ha procesado los eventos de show()
+CODIGO_VENTANA = """
+from PySide6.QtWidgets import QApplication
+import dashboard
+app = QApplication([])
+ventana = dashboard.DashboardUI()
+ventana.show()
+app.processEvents()
+"""
+
+
+# --- Objetivos ---
+
+def objetivos(temporal):
+    """Devuelve {nombre: argumentos de python}; el dashboard solo si PySide6 está instalado."""
+    origen = os.path.join(temporal, "origen_vacio")
+    os.makedirs(origen, exist_ok=True)
+    lista = {
+        "python_vacio": ["-c", "pass"],
+        "import_core": ["-c", "import core"],
+        "cli_ayuda": ["-m", "cli", "--help"],
+        "cli_tipo_vacio": ["-m", "cli", "tipo", origen, os.path.join(temporal, "destino")],
+    }
+    if importlib.util.find_spec("PySide6") is not None:
+        lista["dashboard_ventana"] = ["-c", CODIGO_VENTANA]
+    return lista
+
+
+def entorno_hijo(offscreen):
+    entorno = dict(os.environ)
+    if offscreen:
+        entorno["QT_QPA_PLATFORM"] = "offscreen"
+    return entorno
+
+
+def precompilar():
+    """Compila a bytecode los módulos de la aplicación (PYTHONDONTWRITEBYTECODE no afecta a compileall)."""
+    for modulo in ("core.py", "cli.py", "dashboard.py"):
+        compileall.compile_file(os.path.join(RAIZ, modulo), quiet=2)
+
+
+# --- Medición ---
+
+def cronometrar(argumentos, entorno):
+    """Segundos de reloj desde que se lanza el intérprete hasta que termina."""
+    inicio = time.perf_counter()
+    resultado = subprocess.run([sys.executable, *argumentos], cwd=RAIZ, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    segundos = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(f"{' '.join(argumentos)} terminó con código {resultado.returncode}:\n"
+                           f"{resultado.stderr.decode(errors='replace')[-2000:]}")
+    return segundos
+
+
+def informe_importtime(argumentos, entorno, primeros=10):
+    """
+    Ejecuta el objetivo con -X importtime y resume lo que se importó.
+
+    Returns:
+        dict: Total de las importaciones en ms, número de módulos, los 'primeros' con
+            más tiempo propio y el tiempo acumulado de cada módulo de PESADOS (None si
+            no se cargó).
+    """
+    resultado = subprocess.run([sys.executable, "-X", "importtime", *argumentos], cwd=RAIZ, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue  # cabecera
+        # La sangría del nombre indica la profundidad: las de nivel 0 suman el total
+        profundidad = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        modulos.append((nombre.strip(), int(propio), int(acumulado), profundidad))
+    total = sum(acumulado for _, _, acumulado, profundidad in modulos if profundidad == 0)
+    pesados = {}
+    for pesado in PESADOS:
+        tiempos = [acumulado for nombre, _, acumulado, _ in modulos if nombre == pesado]
+        pesados[pesado] = round(tiempos[0] / 1000, 2) if tiempos else None
+    lentos = sorted(modulos, key=lambda m: m[1], reverse=True)[:primeros]
+    return {
+        "importaciones_ms": round(total / 1000, 2),
+        "modulos": len(modulos),
+        "mas_lentos": [{"modulo": nombre, "propio_ms": round(propio / 1000, 2),
+                        "acumulado_ms": round(acumulado / 1000, 2)}
+                       for nombre, propio, acumulado, _ in lentos],
+        "pesados": pesados,
+    }
+
+
+def medir_objetivo(argumentos, entorno, repeticiones, primeros):
+    tiempos = [cronometrar(argumentos, entorno) for _ in range(repeticiones)]
+    return {
+        "mediana_ms": round(statistics.median(tiempos) * 1000, 1),
+        "minimo_ms": round(min(tiempos) * 1000, 1),
+        "primera_ms": round(tiempos[0] * 1000, 1),
+        **informe_importtime(argumentos, entorno, primeros),
+    }
+
+
+# --- Informe ---
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=10, help="Arranques por objetivo")
+    parser.add_argument("--modulos", type=int, default=8, help="Módulos más lentos a mostrar por objetivo")
+    parser.add_argument("--objetivo", action="append", help="Medir solo este objetivo (repetible)")
+    parser.add_argument("--offscreen", action="store_true",
+                        help="Abrir el dashboard sin pantalla (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument("--json", help="Guardar también los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    offscreen = args.offscreen or (sys.platform.startswith("linux") and not os.environ.get("DISPLAY")
+                                   and not os.environ.get("WAYLAND_DISPLAY"))
+    entorno = entorno_hijo(offscreen)
+    precompilar()
+    temporal = tempfile.mkdtemp(prefix="flowbooster_bench_arranque_")
+    try:
+        resultados = {}
+        for nombre, argumentos in objetivos(temporal).items():
+            if args.objetivo and nombre not in args.objetivo:
+                continue
+            resultados[nombre] = medir_objetivo(argumentos, entorno, args.repeticiones, args.modulos)
+            shutil.rmtree(os.path.join(temporal, "destino"), ignore_errors=True)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    print(f"{'objetivo':<20}{'mediana ms':>12}{'mínimo ms':>12}{'primera ms':>12}{'imports ms':>12}{'módulos':>9}")
+    for nombre, r in resultados.items():
+        print(f"{nombre:<20}{r['mediana_ms']:>12.1f}{r['minimo_ms']:>12.1f}{r['primera_ms']:>12.1f}"
+              f"{r['importaciones_ms']:>12.1f}{r['modulos']:>9}")
+    for nombre, r in resultados.items():
+        cargados = ", ".join(f"{m} {ms:.1f} ms" for m, ms in r["pesados"].items() if ms is not None)
+        print(f"\n{nombre}: pesados cargados: {cargados or 'ninguno'}")
+        for modulo in r["mas_lentos"]:
+            print(f"    {modulo['modulo']:<40}{modulo['propio_ms']:>9.2f} ms propio{modulo['acumulado_ms']:>10.2f} ms acumulado")
+    if args.json:
+        informe = {
+            "benchmark": "arranque",
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "entorno": {"python": platform.python_version(), "plataforma": platform.platform(),
+                        "offscreen": offscreen, "commit": version_repositorio()},
+            "repeticiones": args.repeticiones,
+            "resultados": resultados,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de la compresión a ZIP: comprimir_carpeta_zip y comprimir_varias_carpetas_zip en cada modo.
+
+Genera un corpus sintético reproducible (misma semilla, mismos bytes): JPEG
+incompresibles, sidecars XMP compresibles, unos pocos archivos de varios GB y
+muchos archivos diminutos. Cada modo (deflate, contraseña, partes...) se mide en
+un proceso hijo para que el pico de memoria sea solo suyo, y se guardan MB/s,
+CPU, pico de RSS y tamaño de salida en un JSON para comparar ejecuciones. Uso:
+
+    python -m benchmarks.bench_compresion --perfil rapido
+    python -m benchmarks.bench_compresion --corpus /datos/corpus --json resultados.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import core
+
+MB = 1024 * 1024
+PASSWORD = "flowbooster-bench"
+
+# Tamaños del corpus: 'completo' es el de referencia; 'rapido' sirve para probar cambios
+PERFILES = {
+    "completo": {"jpeg": 400, "jpeg_mb": 8, "sidecars": 4000, "grandes": 3, "grande_mb": 2560,
+                 "diminutos": 50000},
+    "rapido": {"jpeg": 40, "jpeg_mb": 2, "sidecars": 400, "grandes": 2, "grande_mb": 64, "diminutos": 2000},
+}
+
+# Modo -> (función, argumentos); la función 'carpeta' comprime la raíz del corpus y
+# 'varias' sus cuatro subcarpetas, como hace el diálogo de compresión
+MODOS = {
+    "deflate": ("varias", {}),
+    "deflate_una_carpeta": ("carpeta", {}),
+    "password": ("varias", {"password": PASSWORD}),
+    "split": ("varias", {"split": True}),
+    "split_password": ("varias", {"split": True, "password": PASSWORD}),
+    "split_independiente": ("varias", {"split": True, "partes_independientes": True}),
+}
+
+SUBCARPETAS = ("fotos", "sidecars", "grandes", "diminutos")
+
+XMP = """<?xpacket begin="" id="W5M0MpCehiHzreSzNTczkc9d"?>
+<x:xmpmeta xmlns:x="adobe:ns:meta/">
+ <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description rdf:about="" xmlns:xmp="http://ns.adobe.com/xap/1.0/"
+    xmlns:crs="http://ns.adobe.com/camera-raw-settings/1.0/"
+    xmp:CreateDate="2024-03-{dia:02d}T{hora:02d}:{minuto:02d}:12"
+    xmp:Rating="{rating}"
+    crs:Exposure2012="{exposicion:+.2f}"
+    crs:Temperature="{temperatura}"
+    crs:Tint="{tinte:+d}">
+{historial}  </rdf:Description>
+ </rdf:RDF>
+</x:xmpmeta>
+<?xpacket end="w"?>
+"""
+
+
+# --- Corpus ---
+
+def _escribir_repetido(ruta, bloque, tamano):
+    """Escribe 'tamano' bytes repitiendo un bloque (mayor que la ventana de deflate, así que no se comprime mejor)."""
+    with open(ruta, "wb") as f:
+        restante = tamano
+        while restante > 0:
+            f.write(bloque[:restante])
+            restante -= len(bloque)
+
+
+def generar_corpus(carpeta, parametros, semilla):
+    """
+    Crea el corpus en 'carpeta' (fotos/, sidecars/, grandes/ y diminutos/).
+
+    Returns:
+        dict: Archivos y bytes por subcarpeta.
+    """
+    rng = random.Random(semilla)
+    for sub in SUBCARPETAS:
+        os.makedirs(os.path.join(carpeta, sub), exist_ok=True)
+    # JPEG: cabecera JFIF y datos aleatorios, de la mitad al doble del tamaño medio
+    for i in range(parametros["jpeg"]):
+        tamano = int(parametros["jpeg_mb"] * MB * rng.uniform(0.5, 1.5))
+        with open(os.path.join(carpeta, "fotos", f"IMG_{i:05d}.jpg"), "wb") as f:
+            f.write(b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+            f.write(rng.randbytes(tamano))
+            f.write(b"\xff\xd9")
+    # Sidecars XMP de Lightroom/Camera Raw: texto muy compresible de 2 a 40 KB
+    for i in range(parametros["sidecars"]):
+        historial = "".join(
+            f'   <rdf:li stEvt:action="saved" stEvt:instanceID="xmp.iid:{rng.getrandbits(128):032x}"/>\n'
+            for _ in range(rng.randint(10, 300)))
+        texto = XMP.format(dia=rng.randint(1, 28), hora=rng.randint(0, 23), minuto=rng.randint(0, 59),
+                           rating=rng.randint(0, 5), exposicion=rng.uniform(-2, 2),
+                           temperatura=rng.randint(2500, 9000), tinte=rng.randint(-50, 50), historial=historial)
+        with open(os.path.join(carpeta, "sidecars", f"IMG_{i:05d}.xmp"), "w", encoding="utf-8") as f:
+            f.write(texto)
+    # Grandes: vídeos incompresibles y TIFF a medio comprimir (16 valores por byte)
+    for i in range(parametros["grandes"]):
+        bloque = rng.randbytes(8 * MB)
+        if i % 2:
+            nombre = f"escaneo_{i:02d}.tif"
+            bloque = bloque.translate(bytes(range(16)) * 16)
+        else:
+            nombre = f"clip_{i:02d}.mov"
+        _escribir_repetido(os.path.join(carpeta, "grandes", nombre), bloque, parametros["grande_mb"] * MB)
+    # Diminutos: JSON y TXT de 50 B a 2 KB repartidos en subcarpetas de 500
+    for i in range(parametros["diminutos"]):
+        sub = os.path.join(carpeta, "diminutos", f"lote_{i // 500:03d}")
+        if i % 500 == 0:
+            os.makedirs(sub, exist_ok=True)
+        if i % 2:
+            contenido = json.dumps({"id": i, "etiquetas": [rng.choice("abcdefgh") for _ in range(rng.randint(1, 40))]})
+            nombre = f"meta_{i:06d}.json"
+        else:
+            contenido = rng.randbytes(rng.randint(50, 2048)).hex()[:rng.randint(50, 2048)]
+            nombre = f"nota_{i:06d}.txt"
+        with open(os.path.join(sub, nombre), "w", encoding="utf-8") as f:
+            f.write(contenido)
+    return resumen_corpus(carpeta)
+
+
+def resumen_corpus(carpeta):
+    resumen = {}
+    for sub in SUBCARPETAS:
+        archivos = total = 0
+        for raiz, _, nombres in os.walk(os.path.join(carpeta, sub)):
+            for nombre in nombres:
+                archivos += 1
+                total += os.path.getsize(os.path.join(raiz, nombre))
+        resumen[sub] = {"archivos": archivos, "bytes": total}
+    return resumen
+
+
+def preparar_corpus(carpeta, parametros, semilla):
+    """Reutiliza el corpus de 'carpeta' si se generó con los mismos parámetros; si no, lo crea de nuevo."""
+    manifiesto = os.path.join(carpeta, "corpus.json")
+    esperado = {"parametros": parametros, "semilla": semilla}
+    try:
+        with open(manifiesto, encoding="utf-8") as f:
+            if json.load(f) == esperado:
+                return resumen_corpus(carpeta), False
+    except (OSError, ValueError):
+        pass
+    for sub in SUBCARPETAS:
+        shutil.rmtree(os.path.join(carpeta, sub), ignore_errors=True)
+    resumen = generar_corpus(carpeta, parametros, semilla)
+    with open(manifiesto, "w", encoding="utf-8") as f:
+        json.dump(esperado, f)
+    return resumen, True
+
+
+# --- Medición (en el proceso hijo) ---
+
+def pico_rss_mb():
+    """Pico de memoria residente de este proceso en MB."""
+    # En Linux ru_maxrss se hereda del padre al hacer fork; VmHWM empieza de cero con exec
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class ContadoresMemoria(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (nombre, ctypes.c_size_t) for nombre in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        contadores = ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(contadores), contadores.cb)
+        return contadores.PeakWorkingSetSize / MB
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (MB if sys.platform == "darwin" else 1024)  # bytes en macOS, KB en el resto
+
+
+def medir_modo(modo, corpus, salida, split_mb):
+    """Ejecuta un modo una vez y devuelve sus medidas."""
+    funcion, opciones = MODOS[modo]
+    opciones = dict(opciones)
+    if opciones.pop("split", False):
+        opciones["split_size"] = split_mb
+    rss_base = pico_rss_mb()
+    estadisticas = {}
+    cpu = time.process_time()
+    inicio = time.perf_counter()
+    if funcion == "carpeta":
+        partes = core.comprimir_carpeta_zip(corpus, salida, estadisticas=estadisticas, **opciones)
+    else:
+        partes = core.comprimir_varias_carpetas_zip([os.path.join(corpus, sub) for sub in SUBCARPETAS], salida,
+                                                    estadisticas=estadisticas, **opciones)
+    segundos = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu
+    return {
+        "segundos": round(segundos, 3),
+        "cpu_s": round(cpu, 3),
+        "pico_rss_mb": round(pico_rss_mb(), 1),
+        "rss_base_mb": round(rss_base, 1),
+        "partes": len(partes),
+        "bytes_salida": sum(os.path.getsize(p) for p in partes),
+        "cpu_deflate_s": estadisticas.get("cpu_deflate_s"),
+        "politica": estadisticas.get("politica"),
+    }
+
+
+def medir_en_hijo(modo, corpus, split_mb):
+    """Lanza un proceso nuevo para el modo y devuelve lo que mide."""
+    salida = tempfile.mkdtemp(prefix="flowbooster_bench_zip_")
+    try:
+        proceso = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_compresion", "--medir", modo, "--corpus", corpus,
+             "--salida", salida, "--split-mb", str(split_mb)],
+            capture_output=True, text=True)
+        if proceso.returncode:
+            raise RuntimeError(f"El modo {modo} falló:\n{proceso.stderr}")
+        return json.loads(proceso.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(salida, ignore_errors=True)
+
+
+# --- Informe ---
+
+def version_repositorio():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(core.__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def entorno():
+    try:
+        import cryptography
+        version_cryptography = cryptography.__version__
+    except ImportError:
+        version_cryptography = None
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers_compresion": core.WORKERS_COMPRESION,
+        "nivel_zip": core.NIVEL_ZIP,
+        "cryptography": version_cryptography,
+        "commit": version_repositorio(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--perfil", choices=sorted(PERFILES), default="completo", help="Tamaño del corpus")
+    for clave, ayuda in (("jpeg", "JPEG incompresibles"), ("jpeg_mb", "Tamaño medio de cada JPEG en MB"),
+                         ("sidecars", "Sidecars XMP"), ("grandes", "Archivos de varios GB"),
+                         ("grande_mb", "Tamaño de cada archivo grande en MB"), ("diminutos", "Archivos diminutos")):
+        parser.add_argument("--" + clave.replace("_", "-"), dest=clave, type=int, help=f"{ayuda} (cambia el perfil)")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del corpus")
+    parser.add_argument("--corpus", help="Carpeta del corpus: se reutiliza entre ejecuciones (por defecto, temporal)")
+    parser.add_argument("--modos", default=",".join(MODOS), help="Modos separados por comas")
+    parser.add_argument("--split-mb", type=int, default=1024, help="Tamaño de parte de los modos split")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Veces que se mide cada modo (se da la mediana)")
+    parser.add_argument("--json", help="Archivo de resultados (por defecto bench_compresion_<fecha>.json)")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    parser.add_argument("--salida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        # Proceso hijo: una medición y el resultado como última línea
+        print(json.dumps(medir_modo(args.medir, args.corpus, args.salida, args.split_mb)))
+        return
+
+    modos = [m.strip() for m in args.modos.split(",") if m.strip()]
+    desconocidos = [m for m in modos if m not in MODOS]
+    if desconocidos:
+        parser.error(f"Modos desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(MODOS)})")
+    parametros = dict(PERFILES[args.perfil])
+    for clave in parametros:
+        if getattr(args, clave) is not None:
+            parametros[clave] = getattr(args, clave)
+
+    temporal = None
+    corpus = args.corpus
+    if corpus is None:
+        temporal = corpus = tempfile.mkdtemp(prefix="flowbooster_bench_corpus_")
+    try:
+        os.makedirs(corpus, exist_ok=True)
+        inicio = time.perf_counter()
+        resumen, generado = preparar_corpus(corpus, parametros, args.semilla)
+        total_bytes = sum(r["bytes"] for r in resumen.values())
+        total_archivos = sum(r["archivos"] for r in resumen.values())
+        print(f"Corpus {'generado' if generado else 'reutilizado'} en {time.perf_counter() - inicio:.1f} s: "
+              f"{total_archivos} archivos, {total_bytes / MB:.0f} MB")
+
+        resultados = []
+        print(f"{'modo':<22}{'MB/s':>9}{'segundos':>10}{'CPU s':>9}{'pico RSS MB':>13}{'salida MB':>11}"
+              f"{'ratio':>8}{'partes':>8}")
+        for modo in modos:
+            medidas = [medir_en_hijo(modo, corpus, args.split_mb) for _ in range(args.repeticiones)]
+            mediana = sorted(medidas, key=lambda m: m["segundos"])[len(medidas) // 2]
+            resultado = dict(mediana, modo=modo, funcion=MODOS[modo][0],
+                             mb_por_segundo=round(total_bytes / MB / mediana["segundos"], 1),
+                             ratio=round(mediana["bytes_salida"] / total_bytes, 4),
+                             segundos_todas=[m["segundos"] for m in medidas])
+            if len(medidas) > 1:
+                resultado["desviacion_segundos"] = round(statistics.stdev(resultado["segundos_todas"]), 3)
+            resultados.append(resultado)
+            print(f"{modo:<22}{resultado['mb_por_segundo']:>9.1f}{resultado['segundos']:>10.2f}"
+                  f"{resultado['cpu_s']:>9.2f}{resultado['pico_rss_mb']:>13.1f}"
+                  f"{resultado['bytes_salida'] / MB:>11.1f}{resultado['ratio']:>8.3f}{resultado['partes']:>8}")
+
+        informe = {
+            "benchmark": "compresion",
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "entorno": entorno(),
+            "corpus": {"perfil": args.perfil, "parametros": parametros, "semilla": args.semilla,
+                       "archivos": total_archivos, "bytes": total_bytes, "por_carpeta": resumen},
+            "split_mb": args.split_mb,
+            "repeticiones": args.repeticiones,
+            "resultados": resultados,
+        }
+        ruta_json = args.json or f"bench_compresion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"Resultados en {ruta_json}")
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
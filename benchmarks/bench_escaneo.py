@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark del escaneo de carpetas: os.listdir + isfile + getmtime frente a escanear_carpeta.
+
+Cuenta las llamadas al sistema de tipo stat/listado que hace cada variante sobre
+una carpeta sintética y mide el tiempo. Uso:
+
+    python -m benchmarks.bench_escaneo --archivos 20000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import core
+
+
+class ContadorSyscalls:
+    """
+    Cuenta las llamadas a os.stat/os.lstat/os.listdir/os.scandir y los stat reales
+    que hacen las entradas de os.scandir, sustituyendo temporalmente esas funciones.
+    """
+    def __init__(self):
+        self.conteo = {"stat": 0, "listdir": 0, "scandir": 0, "direntry_stat": 0}
+
+    def __enter__(self):
+        self._originales = (os.stat, os.lstat, os.listdir, os.scandir)
+        stat, lstat, listdir, scandir = self._originales
+        conteo = self.conteo
+
+        def stat_contado(*args, **kwargs):
+            conteo["stat"] += 1
+            return stat(*args, **kwargs)
+
+        def lstat_contado(*args, **kwargs):
+            conteo["stat"] += 1
+            return lstat(*args, **kwargs)
+
+        def listdir_contado(*args, **kwargs):
+            conteo["listdir"] += 1
+            return listdir(*args, **kwargs)
+
+        def scandir_contado(*args, **kwargs):
+            conteo["scandir"] += 1
+            return _ScandirContado(scandir(*args, **kwargs), conteo)
+
+        os.stat, os.lstat, os.listdir, os.scandir = stat_contado, lstat_contado, listdir_contado, scandir_contado
+        return self
+
+    def __exit__(self, *exc):
+        os.stat, os.lstat, os.listdir, os.scandir = self._originales
+
+    @property
+    def total(self):
+        return sum(self.conteo.values())
+
+
+class _ScandirContado:
+    """Envuelve el iterador de os.scandir para contar los stat que realmente tocan el disco."""
+    def __init__(self, iterador, conteo):
+        self._iterador = iterador
+        self._conteo = conteo
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._iterador.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _EntradaContada(next(self._iterador), self._conteo)
+
+
+class _EntradaContada:
+    """Proxy de os.DirEntry. En Windows stat() sale de la caché de scandir y no cuenta."""
+    def __init__(self, entrada, conteo):
+        self._entrada = entrada
+        self._conteo = conteo
+        self._stat_hecho = os.name == "nt"
+
+    def __getattr__(self, nombre):
+        return getattr(self._entrada, nombre)
+
+    def stat(self, *args, **kwargs):
+        if not self._stat_hecho:
+            self._conteo["direntry_stat"] += 1
+            self._stat_hecho = True
+        return self._entrada.stat(*args, **kwargs)
+
+
+def escaneo_anterior(origen):
+    """Reproduce el escaneo previo de analizar_origen_por_fecha (listdir + isfile + getmtime)."""
+    resultado = []
+    for archivo in os.listdir(origen):
+        ruta_completa = os.path.join(origen, archivo)
+        if not os.path.isfile(ruta_completa):
+            continue
+        resultado.append((archivo, os.path.getmtime(ruta_completa)))
+    return resultado
+
+
+def escaneo_nuevo(origen):
+    """Escaneo actual con escanear_carpeta; el mtime viene en el registro."""
+    return [(registro.nombre, registro.mtime) for registro in core.escanear_carpeta(origen)]
+
+
+def crear_carpeta_sintetica(carpeta, n_archivos):
+    """Crea n_archivos vacíos y algunas subcarpetas para que el escáner las ignore."""
+    for i in range(n_archivos):
+        with open(os.path.join(carpeta, f"IMG_{i:06d}.jpg"), "wb"):
+            pass
+    for i in range(10):
+        os.makedirs(os.path.join(carpeta, f"sub_{i}"), exist_ok=True)
+
+
+def medir(funcion, origen):
+    with ContadorSyscalls() as contador:
+        inicio = time.perf_counter()
+        resultado = funcion(origen)
+        duracion = time.perf_counter() - inicio
+    return resultado, contador, duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archivos", type=int, default=5000, help="Número de archivos sintéticos")
+    parser.add_argument("--carpeta", help="Carpeta real a medir (por defecto se crea una sintética)")
+    args = parser.parse_args()
+
+    temporal = None
+    origen = args.carpeta
+    if origen is None:
+        temporal = tempfile.mkdtemp(prefix="flowbooster_bench_")
+        crear_carpeta_sintetica(temporal, args.archivos)
+        origen = temporal
+    try:
+        antes, c_antes, t_antes = medir(escaneo_anterior, origen)
+        despues, c_despues, t_despues = medir(escaneo_nuevo, origen)
+        assert sorted(antes) == sorted(despues), "Los dos escaneos no devuelven lo mismo"
+
+        print(f"Archivos: {len(antes)}")
+        print(f"{'variante':<12}{'syscalls':>10}{'por archivo':>14}{'segundos':>11}  detalle")
+        for nombre, contador, duracion in (("anterior", c_antes, t_antes), ("scandir", c_despues, t_despues)):
+            por_archivo = contador.total / max(1, len(antes))
+            print(f"{nombre:<12}{contador.total:>10}{por_archivo:>14.2f}{duracion:>11.4f}  {contador.conteo}")
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de la lectura de fechas EXIF: exifread completo frente a la lectura rápida acotada.
+
+Genera JPEG reales con Pillow y RAW sintéticos con estructura TIFF (IFD0, Exif IFD,
+MakerNote y datos de sensor) y compara bytes leídos y archivos por segundo. Uso:
+
+    python -m benchmarks.bench_exif --archivos 200 --raw-mb 25
+"""
+import argparse
+import builtins
+import os
+import shutil
+import struct
+import tempfile
+import time
+from datetime import datetime
+
+import exifread
+from PIL import Image
+
+import core
+
+FECHA = "2024:03:12 14:30:12"
+
+
+class ArchivoContado:
+    """Envuelve un archivo abierto y suma los bytes que se leen de él."""
+    def __init__(self, f, contador):
+        self._f = f
+        self._contador = contador
+
+    def read(self, *args):
+        datos = self._f.read(*args)
+        self._contador["bytes"] += len(datos)
+        return datos
+
+    def __getattr__(self, nombre):
+        return getattr(self._f, nombre)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+def abrir_contado(contador):
+    def abrir(*args, **kwargs):
+        return ArchivoContado(builtins.open(*args, **kwargs), contador)
+    return abrir
+
+
+def fecha_con_exifread(ruta, abrir=open):
+    """Camino anterior de obtener_fecha_archivo: exifread sobre el archivo completo."""
+    with abrir(ruta, 'rb') as f:
+        tags = exifread.process_file(f, stop_tag='EXIF DateTimeOriginal')
+        if 'EXIF DateTimeOriginal' in tags:
+            return datetime.strptime(str(tags['EXIF DateTimeOriginal']), '%Y:%m:%d %H:%M:%S')
+    return None
+
+
+def crear_jpeg(ruta, lado=1600):
+    imagen = Image.effect_noise((lado, lado * 3 // 4), 64).convert("RGB")
+    exif = Image.Exif()
+    exif[0x010F] = "Flowbooster"
+    exif[0x8769] = {0x9003: FECHA}
+    imagen.save(ruta, quality=90, exif=exif)
+
+
+def crear_raw_tiff(ruta, tamano_datos):
+    """
+    Escribe un RAW sintético con la disposición habitual de CR2/NEF/ARW: cabecera TIFF,
+    IFD0 con puntero a Exif IFD, MakerNote grande y, al final, los datos del sensor.
+    """
+    maker_note = os.urandom(64 * 1024)
+    fecha = FECHA.encode("ascii") + b"\x00"
+    offset_ifd0 = 8
+    ifd0 = struct.pack("<H", 2)
+    offset_exif = offset_ifd0 + 2 + 2 * 12 + 4
+    offset_datos_exif = offset_exif + 2 + 2 * 12 + 4
+    offset_fecha = offset_datos_exif
+    offset_maker = offset_fecha + len(fecha)
+    offset_sensor = offset_maker + len(maker_note)
+    ifd0 += struct.pack("<HHII", 0x0111, 4, 1, offset_sensor)  # StripOffsets
+    ifd0 += struct.pack("<HHII", 0x8769, 4, 1, offset_exif)    # ExifIFDPointer
+    ifd0 += struct.pack("<I", 0)
+    exif_ifd = struct.pack("<H", 2)
+    exif_ifd += struct.pack("<HHII", 0x9003, 2, len(fecha), offset_fecha)          # DateTimeOriginal
+    exif_ifd += struct.pack("<HHII", 0x927C, 7, len(maker_note), offset_maker)     # MakerNote
+    exif_ifd += struct.pack("<I", 0)
+    with open(ruta, "wb") as f:
+        f.write(b"II*\x00" + struct.pack("<I", offset_ifd0))
+        f.write(ifd0)
+        f.write(exif_ifd)
+        f.write(fecha)
+        f.write(maker_note)
+        restante = tamano_datos
+        bloque = os.urandom(1024 * 1024)
+        while restante > 0:
+            f.write(bloque[:restante])
+            restante -= len(bloque)
+
+
+def medir(nombre, funcion, rutas):
+    contador = {"bytes": 0}
+    abrir = abrir_contado(contador)
+    original = getattr(core, "open", None)
+    core.open = abrir  # Sombra del builtin solo dentro de core
+    try:
+        inicio = time.perf_counter()
+        fechas = [funcion(ruta, abrir) for ruta in rutas]
+        duracion = time.perf_counter() - inicio
+    finally:
+        if original is None:
+            del core.open
+        else:
+            core.open = original
+    return {
+        "variante": nombre,
+        "archivos_por_segundo": len(rutas) / duracion if duracion else float("inf"),
+        "bytes_por_archivo": contador["bytes"] / max(1, len(rutas)),
+        "fechas": fechas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archivos", type=int, default=100, help="Archivos de cada tipo")
+    parser.add_argument("--raw-mb", type=int, default=25, help="Tamaño de los datos de sensor de cada RAW")
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix="flowbooster_bench_exif_")
+    try:
+        muestra_jpeg = os.path.join(carpeta, "muestra.jpg")
+        muestra_raw = os.path.join(carpeta, "muestra.cr2")
+        crear_jpeg(muestra_jpeg)
+        crear_raw_tiff(muestra_raw, args.raw_mb * 1024 * 1024)
+        # Copias de la misma muestra para no gastar el tiempo del benchmark generando imágenes
+        fixtures = {"JPEG": [], "RAW": []}
+        for i in range(args.archivos):
+            for tipo, muestra, ext in (("JPEG", muestra_jpeg, ".jpg"), ("RAW", muestra_raw, ".cr2")):
+                ruta = os.path.join(carpeta, f"IMG_{i:05d}{ext}")
+                shutil.copyfile(muestra, ruta)
+                fixtures[tipo].append(ruta)
+
+        print(f"{'tipo':<6}{'variante':<12}{'archivos/s':>12}{'bytes/archivo':>16}")
+        for tipo, rutas in fixtures.items():
+            anterior = medir("exifread", fecha_con_exifread, rutas)
+            rapida = medir("rápida", lambda ruta, _abrir: core.obtener_fecha_archivo(ruta), rutas)
+            assert anterior["fechas"] == rapida["fechas"], "Las dos variantes no dan las mismas fechas"
+            for r in (anterior, rapida):
+                print(f"{tipo:<6}{r['variante']:<12}{r['archivos_por_segundo']:>12.1f}{r['bytes_por_archivo']:>16.0f}")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
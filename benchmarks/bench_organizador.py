@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de extremo a extremo del organizador: análisis, estructura y procesar_proyecto(_por_fecha) por fases.
+
+Genera una carpeta de N archivos (de 1k a 1M) con fechas distintas: JPEG con
+DateTimeOriginal escrito con Pillow, RAW con estructura TIFF y vídeos MP4 con la
+fecha en moov/mvhd. Cada escenario trabaja sobre una copia nueva del origen
+(enlaces duros, así que prepararla apenas cuesta) y se cronometra fase a fase con
+los eventos de progreso, moviendo y copiando. Uso:
+
+    python -m benchmarks.bench_organizador --archivos 10000
+    python -m benchmarks.bench_organizador --archivos 1000000 --fixtures /datos/fixtures --destino /mnt/ssd
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import struct
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import core
+from benchmarks.bench_exif import FECHA, crear_jpeg, crear_raw_tiff
+
+FECHA_INICIAL = datetime(2024, 1, 1)
+TIPOS = (("jpg", "IMG_", ".jpg"), ("raw", "RAW_", ".cr2"), ("video", "MVI_", ".mp4"))
+
+
+# --- Fixtures ---
+
+def _caja_mp4(tipo, contenido):
+    return struct.pack(">I4s", 8 + len(contenido), tipo) + contenido
+
+
+def crear_mp4(ruta, fecha, tamano_datos):
+    """MP4 mínimo que lee leer_fecha_video: ftyp, moov/mvhd con creation_time y mdat."""
+    creacion = int((fecha - datetime(1970, 1, 1)).total_seconds()) + core._EPOCA_MP4
+    mvhd = struct.pack(">B3x4I", 0, creacion, creacion, 1000, 10000) + bytes(80)
+    with open(ruta, "wb") as f:
+        f.write(_caja_mp4(b"ftyp", b"isom\x00\x00\x02\x00isomiso2mp41"))
+        f.write(_caja_mp4(b"moov", _caja_mp4(b"mvhd", mvhd)))
+        f.write(_caja_mp4(b"mdat", bytes(tamano_datos)))
+
+
+def generar_fixtures(carpeta, parametros, semilla):
+    """
+    Crea los archivos del origen. Los JPEG y los RAW salen de una plantilla (Pillow y
+    crear_raw_tiff) en la que se sustituye la fecha EXIF de cada archivo.
+
+    Returns:
+        dict: Archivos creados por tipo.
+    """
+    rng = random.Random(semilla)
+    plantillas = {}
+    with tempfile.TemporaryDirectory() as temporal:
+        crear_jpeg(os.path.join(temporal, "p.jpg"), lado=parametros["jpeg_lado"])
+        crear_raw_tiff(os.path.join(temporal, "p.cr2"), parametros["raw_kb"] * 1024)
+        for tipo, nombre in (("jpg", "p.jpg"), ("raw", "p.cr2")):
+            with open(os.path.join(temporal, nombre), "rb") as f:
+                datos = f.read()
+            plantillas[tipo] = (datos, datos.index(FECHA.encode("ascii")))
+    conteo = {tipo: 0 for tipo, _, _ in TIPOS}
+    tipos = rng.choices(TIPOS, weights=parametros["mezcla"], k=parametros["archivos"])
+    for i, (tipo, prefijo, ext) in enumerate(tipos):
+        fecha = FECHA_INICIAL + timedelta(seconds=rng.randrange(parametros["dias"] * 86400))
+        ruta = os.path.join(carpeta, f"{prefijo}{i:07d}{ext}")
+        if tipo == "video":
+            crear_mp4(ruta, fecha, parametros["video_kb"] * 1024)
+        else:
+            datos, posicion = plantillas[tipo]
+            with open(ruta, "wb") as f:
+                f.write(datos[:posicion])
+                f.write(fecha.strftime("%Y:%m:%d %H:%M:%S").encode("ascii"))
+                f.write(datos[posicion + len(FECHA):])
+        conteo[tipo] += 1
+    return conteo
+
+
+def preparar_fixtures(carpeta, parametros, semilla):
+    """Reutiliza los fixtures de 'carpeta' si se generaron con los mismos parámetros."""
+    manifiesto = os.path.join(carpeta, "fixtures.json")
+    origen = os.path.join(carpeta, "origen")
+    esperado = {"parametros": parametros, "semilla": semilla}
+    try:
+        with open(manifiesto, encoding="utf-8") as f:
+            guardado = json.load(f)
+        if guardado["esperado"] == esperado:
+            return origen, guardado["conteo"], False
+    except (OSError, ValueError, KeyError):
+        pass
+    shutil.rmtree(origen, ignore_errors=True)
+    os.makedirs(origen)
+    conteo = generar_fixtures(origen, parametros, semilla)
+    with open(manifiesto, "w", encoding="utf-8") as f:
+        json.dump({"esperado": esperado, "conteo": conteo}, f)
+    return origen, conteo, True
+
+
+def materializar(fixtures, destino):
+    """Crea en 'destino' una copia del origen con enlaces duros (o copiando si el sistema no los admite)."""
+    shutil.rmtree(destino, ignore_errors=True)
+    os.makedirs(destino)
+    with os.scandir(fixtures) as entradas:
+        for entrada in entradas:
+            try:
+                os.link(entrada.path, os.path.join(destino, entrada.name))
+            except OSError:
+                shutil.copy2(entrada.path, os.path.join(destino, entrada.name))
+
+
+# --- Medición ---
+
+class Cronometro:
+    """Recoge los eventos de progreso y calcula lo que duró cada fase."""
+    def __init__(self):
+        self.fases = []
+        self._actual = None
+
+    def __call__(self, evento):
+        if evento["tipo"] == "progreso":
+            return
+        ahora = time.perf_counter()
+        if self._actual is not None:
+            nombre, inicio = self._actual
+            self.fases.append((nombre, ahora - inicio))
+            self._actual = None
+        if evento["tipo"] == "fase":
+            self._actual = (evento["fase"], ahora)
+
+    def cerrar(self):
+        self({"tipo": "fin"})
+        return self.fases
+
+
+def medir(funcion, *args, **kwargs):
+    """Ejecuta funcion con un ReporteProgreso y devuelve (resultado, [(fase, segundos)], total)."""
+    cronometro = Cronometro()
+    inicio = time.perf_counter()
+    resultado = funcion(*args, progreso=core.ReporteProgreso(cronometro), **kwargs)
+    total = time.perf_counter() - inicio
+    return resultado, cronometro.cerrar(), total
+
+
+def ejecutar_escenarios(fixtures, trabajo, destinos, opciones):
+    """
+    Ejecuta todos los escenarios una vez.
+
+    Returns:
+        dict: (función, modo, fase) -> segundos; la fase 'total' es la llamada completa.
+    """
+    tiempos = {}
+    origen = os.path.join(trabajo, "origen")
+    nivel = opciones["nivel"]
+    workers = opciones["workers"]
+    caches = []
+
+    def preparar():
+        """Origen nuevo y la caché del escenario: ninguna, una vacía o la compartida ya llena."""
+        materializar(fixtures, origen)
+        shutil.rmtree(destinos, ignore_errors=True)
+        os.makedirs(destinos)
+        if opciones["cache"] == "no":
+            return None
+        if opciones["cache"] == "fria":
+            cache = core.CacheMetadatos(os.path.join(trabajo, f"cache_{len(caches)}.sqlite"))
+            caches.append(cache)
+            return cache
+        if not caches:
+            caches.append(core.CacheMetadatos(os.path.join(trabajo, "cache.sqlite")))
+        # Mismas rutas e inodos que la vez anterior (enlaces duros), así que todo son aciertos
+        core.obtener_fechas_archivos(core.escanear_carpeta(origen), workers, cache=caches[0])
+        return caches[0]
+
+    # analizar_origen: un solo recorrido, sin fases
+    preparar()
+    inicio = time.perf_counter()
+    core.analizar_origen(origen)
+    tiempos[("analizar_origen", "-", "total")] = time.perf_counter() - inicio
+
+    # analizar_origen_por_fecha y, con su resultado, crear_estructura_por_fecha
+    cache = preparar()
+    (archivos_por_fecha, _), fases, total = medir(core.analizar_origen_por_fecha, origen, workers, cache=cache)
+    for fase, segundos in fases:
+        tiempos[("analizar_origen_por_fecha", "-", fase)] = segundos
+    tiempos[("analizar_origen_por_fecha", "-", "total")] = total
+    inicio = time.perf_counter()
+    core.crear_estructura_por_fecha(destinos, archivos_por_fecha, nivel)
+    tiempos[("crear_estructura_por_fecha", "-", "total")] = time.perf_counter() - inicio
+
+    for modo, copiar in (("mover", False), ("copiar", True)):
+        preparar()
+        _, fases, total = medir(core.procesar_proyecto, origen, destinos, copiar)
+        for fase, segundos in fases:
+            tiempos[("procesar_proyecto", modo, fase)] = segundos
+        tiempos[("procesar_proyecto", modo, "total")] = total
+
+        cache = preparar()
+        _, fases, total = medir(core.procesar_proyecto_por_fecha, origen, destinos, nivel, copiar,
+                                max_workers=workers, cache=cache)
+        for fase, segundos in fases:
+            tiempos[("procesar_proyecto_por_fecha", modo, fase)] = segundos
+        tiempos[("procesar_proyecto_por_fecha", modo, "total")] = total
+    for cache in caches:
+        cache.cerrar()
+    shutil.rmtree(origen, ignore_errors=True)
+    shutil.rmtree(destinos, ignore_errors=True)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archivos", type=int, default=10000, help="Archivos del origen (de 1k a 1M)")
+    parser.add_argument("--mezcla", default="60,30,10", help="Proporción JPEG,RAW,vídeo")
+    parser.add_argument("--dias", type=int, default=90, help="Días entre los que se reparten las fechas")
+    parser.add_argument("--jpeg-lado", type=int, default=320, help="Ancho en píxeles de los JPEG")
+    parser.add_argument("--raw-kb", type=int, default=256, help="Datos de sensor de cada RAW en KB")
+    parser.add_argument("--video-kb", type=int, default=512, help="Datos de cada vídeo en KB")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de tipos y fechas")
+    parser.add_argument("--fixtures", help="Carpeta de los fixtures: se reutilizan entre ejecuciones "
+                                           "(por defecto, temporal)")
+    parser.add_argument("--destino", help="Carpeta donde crear los destinos, p. ej. en otro disco "
+                                          "(por defecto, junto al origen)")
+    parser.add_argument("--nivel", default="dia", choices=("dia", "semana", "mes", "año"),
+                        help="Nivel de organización por fecha")
+    parser.add_argument("--workers", default=None, help="Workers de metadatos: número o 'ssd', 'hdd', 'nas'")
+    parser.add_argument("--cache", default="no", choices=("no", "fria", "caliente"),
+                        help="Caché de metadatos: sin caché, vacía en cada escenario o ya llena")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Veces que se ejecuta todo (se da la mediana)")
+    parser.add_argument("--json", help="Guardar también los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    mezcla = [int(x) for x in args.mezcla.split(",")]
+    if len(mezcla) != 3:
+        parser.error("--mezcla necesita tres pesos: JPEG,RAW,vídeo")
+    workers = int(args.workers) if args.workers and args.workers.isdigit() else args.workers
+    parametros = {"archivos": args.archivos, "mezcla": mezcla, "dias": args.dias, "jpeg_lado": args.jpeg_lado,
+                  "raw_kb": args.raw_kb, "video_kb": args.video_kb}
+
+    temporal = tempfile.mkdtemp(prefix="flowbooster_bench_org_")
+    carpeta_fixtures = args.fixtures or os.path.join(temporal, "fixtures")
+    try:
+        os.makedirs(carpeta_fixtures, exist_ok=True)
+        inicio = time.perf_counter()
+        fixtures, conteo, generado = preparar_fixtures(carpeta_fixtures, parametros, args.semilla)
+        print(f"Fixtures {'generados' if generado else 'reutilizados'} en {time.perf_counter() - inicio:.1f} s: "
+              f"{args.archivos} archivos {conteo}")
+        # El origen de trabajo va junto a los fixtures para poder usar enlaces duros
+        trabajo = tempfile.mkdtemp(prefix="trabajo_", dir=carpeta_fixtures)
+        destinos = os.path.join(tempfile.mkdtemp(prefix="flowbooster_bench_destino_", dir=args.destino)
+                                if args.destino else trabajo, "destino")
+        opciones = {"nivel": args.nivel, "workers": workers, "cache": args.cache}
+        try:
+            ejecuciones = [ejecutar_escenarios(fixtures, trabajo, destinos, opciones)
+                           for _ in range(args.repeticiones)]
+        finally:
+            shutil.rmtree(trabajo, ignore_errors=True)
+            if args.destino:
+                shutil.rmtree(os.path.dirname(destinos), ignore_errors=True)
+
+        filas = []
+        for clave in ejecuciones[0]:
+            segundos = statistics.median(e[clave] for e in ejecuciones if clave in e)
+            funcion, modo, fase = clave
+            filas.append({"funcion": funcion, "modo": modo, "fase": fase, "segundos": round(segundos, 4),
+                          "archivos_por_segundo": round(args.archivos / segundos, 1) if segundos else None})
+        print(f"\n{'función':<30}{'modo':<8}{'fase':<15}{'segundos':>10}{'archivos/s':>14}")
+        for fila in filas:
+            por_segundo = f"{fila['archivos_por_segundo']:.0f}" if fila["archivos_por_segundo"] else "-"
+            print(f"{fila['funcion']:<30}{fila['modo']:<8}{fila['fase']:<15}{fila['segundos']:>10.3f}"
+                  f"{por_segundo:>14}")
+        if args.json:
+            informe = {
+                "benchmark": "organizador",
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "parametros": parametros,
+                "semilla": args.semilla,
+                "conteo": conteo,
+                "opciones": opciones,
+                "repeticiones": args.repeticiones,
+                "resultados": filas,
+            }
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(informe, f, indent=2, ensure_ascii=False)
+            print(f"Resultados en {args.json}")
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+
+"""
+Interfaz de línea de comandos de Flowbooster.
+
+Ejecuta las funciones del core sin interfaz gráfica (servidores, cron) y escribe el
+resultado de cada trabajo como JSON en la salida estándar. Nunca importa Qt, y el
+core solo se importa cuando hay un trabajo que ejecutar, así que la ayuda y los
+errores de uso responden al instante. Uso:
+
+    python -m cli tipo /media/tarjeta /srv/proyectos/boda --copiar
+    python -m cli fecha /media/tarjeta /srv/fotos --nivel mes --incremental
+    python -m cli emparejar /fotos/jpg /fotos/raw /fotos/revisar
+    python -m cli sin-pareja /fotos/jpg /fotos/raw /fotos/revisar
+    python -m cli comprimir /srv/proyectos/boda --destino /srv/zips --parte-mb 2048 --independientes
+    python -m cli --progreso lote trabajos.json
+
+Un archivo de trabajos es una lista de objetos (o un objeto con esa lista en
+'trabajos') con el comando en 'comando' y las opciones con los mismos nombres que
+en la línea de comandos, con guiones bajos en lugar de guiones:
+
+    {"trabajos": [
+        {"comando": "fecha", "origen": "/media/tarjeta", "destino": "/srv/fotos", "nivel": "mes", "copiar": true},
+        {"comando": "comprimir", "carpetas": ["/srv/fotos/2024-05"], "destino": "/srv/zips", "parte_mb": 500}
+    ], "detener_en_error": false}
+
+Los trabajos de un lote se ejecutan uno tras otro en el mismo proceso. El código de
+salida es 0 si todos terminaron bien, 1 si alguno falló, 2 si hay un error de uso
+y 130 si se canceló con Ctrl+C o SIGTERM, que detiene el trabajo en curso entre dos
+archivos (los ya transferidos se quedan en su destino).
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+# Segundos mínimos entre dos eventos de progreso escritos con --progreso
+INTERVALO_PROGRESO_CLI = 1.0
+
+# --- Trabajos ---
+
+def _workers(valor):
+    """Convierte '4' en 4 y deja los perfiles ('ssd', 'hdd', 'nas') como texto."""
+    return int(valor) if isinstance(valor, str) and valor.isdigit() else valor
+
+def _opciones_transferencia(workers_transferencia):
+    return {"max_workers": workers_transferencia} if workers_transferencia else None
+
+def _instrumentacion(medir, traza):
+    """Instrumentacion de core si se pidió medir o una traza (la traza implica medir)."""
+    if not medir and not traza:
+        return None
+    from core import Instrumentacion
+    return Instrumentacion(traza=traza)
+
+def _leer_info(destino):
+    """Devuelve el proyecto_info.json del destino (o None si no se pudo leer)."""
+    try:
+        with open(os.path.join(destino, "proyecto_info.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def organizar_por_tipo(origen, destino, copiar=False, crear_todas=False, readme=False, recursivo=False,
+                       profundidad=None, incluir=None, excluir=None, reanudar=False, incremental=False,
+                       verificar_hash=False, duplicados=None, workers_transferencia=None, medir=False,
+                       traza=None, progreso=None):
+    """
+    Comando 'tipo': organiza por tipo de archivo con procesar_proyecto.
+    
+    Returns:
+        dict: Archivos procesados, tipo de proyecto y el proyecto_info.json generado.
+    """
+    from core import procesar_proyecto
+    log, tipo_proyecto = procesar_proyecto(
+        origen, destino, copiar, crear_todas, readme, recursivo=recursivo, profundidad_max=profundidad,
+        incluir=incluir, excluir=excluir, opciones_transferencia=_opciones_transferencia(workers_transferencia),
+        progreso=progreso, reanudar=reanudar, incremental=incremental, verificar_hash=verificar_hash,
+        duplicados=duplicados, instrumentacion=_instrumentacion(medir, traza)
+    )
+    return {
+        "archivos": len(log) if log else 0,
+        "tipo_proyecto": tipo_proyecto,
+        "proyecto_info": _leer_info(destino) if log is not None else None
+    }
+
+def organizar_por_fecha(origen, destino, nivel="dia", copiar=False, readme=False, workers=None, procesos=False,
+                        cache=True, niveles=None, patrones=None, reanudar=False, incremental=False,
+                        verificar_hash=False, workers_transferencia=None, medir=False, traza=None, progreso=None):
+    """
+    Comando 'fecha': organiza por fecha con procesar_proyecto_por_fecha.
+    
+    Returns:
+        dict: Archivos procesados y el proyecto_info.json generado.
+    """
+    from core import procesar_proyecto_por_fecha
+    log, total_archivos = procesar_proyecto_por_fecha(
+        origen, destino, nivel, copiar, readme, max_workers=_workers(workers), usar_procesos=procesos,
+        cache=cache, niveles=niveles, patrones=patrones,
+        opciones_transferencia=_opciones_transferencia(workers_transferencia), progreso=progreso,
+        reanudar=reanudar, incremental=incremental, verificar_hash=verificar_hash,
+        instrumentacion=_instrumentacion(medir, traza)
+    )
+    return {
+        "archivos": total_archivos,
+        "proyecto_info": _leer_info(destino) if log is not None else None
+    }
+
+def emparejar(carpeta_a, carpeta_b, salida, mover_emparejados=False, workers_transferencia=None, progreso=None):
+    """
+    Comando 'emparejar': mueve los archivos de A sin pareja en B (comparar_y_mover_no_emparejados).
+    
+    Returns:
+        dict: Cuántos archivos de A tienen pareja y cuántos no, y sus nombres.
+    """
+    from core import comparar_y_mover_no_emparejados
+    resultado = comparar_y_mover_no_emparejados(carpeta_a, carpeta_b, salida, mover_emparejados,
+                                                _opciones_transferencia(workers_transferencia), progreso)
+    return {
+        "emparejados": len(resultado["emparejados"]),
+        "sin_pareja": len(resultado["sin_pareja"]),
+        "archivos": resultado
+    }
+
+def separar_sin_pareja(carpeta_a, carpeta_b, salida, workers_transferencia=None, progreso=None):
+    """
+    Comando 'sin-pareja': mueve los archivos sin pareja de las dos carpetas (mover_no_emparejadas_ambas).
+    
+    Returns:
+        dict: Cuántos archivos se movieron y sus nombres.
+    """
+    from core import mover_no_emparejadas_ambas
+    movidos = mover_no_emparejadas_ambas([carpeta_a, carpeta_b], salida,
+                                         _opciones_transferencia(workers_transferencia), progreso)
+    return {"movidos": len(movidos), "archivos": movidos}
+
+def comprimir(carpetas, destino, nombre="nombre", password=None, password_env=None, parte_mb=None,
+              independientes=False, cifrado=None, progreso=None):
+    """
+    Comando 'comprimir': una carpeta con comprimir_carpeta_zip o varias en un solo
+    ZIP con comprimir_varias_carpetas_zip.
+    
+    La contraseña se lee de la variable de entorno 'password_env' para que no quede
+    a la vista en la lista de procesos; 'password' solo se admite en un lote.
+    
+    Returns:
+        dict: Rutas de los ZIP o partes generados y el resumen de la escritura.
+    
+    Raises:
+        ValueError: Si la variable de entorno de la contraseña no está definida.
+    """
+    from core import comprimir_carpeta_zip, comprimir_varias_carpetas_zip
+    if password_env:
+        password = os.environ.get(password_env)
+        if password is None:
+            raise ValueError(f"La variable de entorno {password_env} no está definida")
+    if isinstance(carpetas, str):
+        carpetas = [carpetas]
+    estadisticas = {}
+    if len(carpetas) == 1:
+        partes = comprimir_carpeta_zip(carpetas[0], destino, nombre, password, parte_mb, progreso,
+                                       estadisticas, cifrado, independientes)
+    else:
+        partes = comprimir_varias_carpetas_zip(carpetas, destino, nombre, password, parte_mb, progreso,
+                                               estadisticas, cifrado, independientes)
+    return {"partes": partes, "estadisticas": estadisticas or None}
+
+COMANDOS = {
+    "tipo": organizar_por_tipo,
+    "fecha": organizar_por_fecha,
+    "emparejar": emparejar,
+    "sin-pareja": separar_sin_pareja,
+    "comprimir": comprimir
+}
+
+# --- Ejecución ---
+
+_lock_salida = threading.Lock()
+
+def _escribir_evento(evento):
+    """Escribe un evento de progreso como una línea JSON en la salida de error."""
+    linea = json.dumps(evento, ensure_ascii=False)
+    with _lock_salida:
+        print(linea, file=sys.stderr, flush=True)
+
+def _cancelar_con_senales(reporte):
+    """
+    Hace que Ctrl+C y SIGTERM cancelen 'reporte' entre dos archivos; una segunda
+    señal interrumpe en el acto.
+    
+    Returns:
+        dict: Manejadores anteriores, para restaurarlos al terminar.
+    """
+    def manejar(numero, marco):
+        if reporte.cancelado:
+            raise KeyboardInterrupt
+        reporte.cancelar()
+
+    anteriores = {}
+    for nombre in ("SIGINT", "SIGTERM"):
+        numero = getattr(signal, nombre, None)
+        if numero is not None:
+            anteriores[numero] = signal.signal(numero, manejar)
+    return anteriores
+
+def _validar_opciones(funcion, opciones):
+    """
+    Compara las opciones con los parámetros de la función de un comando (sin
+    inspect, que tarda más en importarse que el resto de la línea de comandos).
+    
+    Returns:
+        str|None: Qué opciones sobran o faltan, o None si son correctas.
+    """
+    codigo = funcion.__code__
+    parametros = codigo.co_varnames[:codigo.co_argcount]
+    obligatorios = parametros[:len(parametros) - len(funcion.__defaults__ or ())]
+    # 'progreso' lo pone ejecutar_trabajo
+    desconocidas = sorted(nombre for nombre in opciones if nombre not in parametros or nombre == "progreso")
+    if desconocidas:
+        return f"opciones desconocidas: {', '.join(desconocidas)}"
+    faltan = [nombre for nombre in obligatorios if nombre not in opciones]
+    if faltan:
+        return f"faltan opciones: {', '.join(faltan)}"
+    return None
+
+def ejecutar_trabajo(comando, opciones, mostrar_progreso=False):
+    """
+    Ejecuta un trabajo y devuelve su resultado; los errores se devuelven, no se lanzan.
+    
+    Args:
+        comando (str): Uno de COMANDOS.
+        opciones (dict): Argumentos de la función del comando.
+        mostrar_progreso (bool): Escribir los eventos de progreso en la salida de error.
+    
+    Returns:
+        dict: 'comando', 'ok', 'segundos' y 'resultado', o 'error' y 'tipo_error'
+            ('cancelado': True si se canceló).
+    """
+    inicio = time.perf_counter()
+    salida = {"comando": comando, "ok": False}
+    funcion = COMANDOS.get(comando)
+    if funcion is None:
+        salida["error"] = f"Comando desconocido: {comando}"
+        salida["tipo_error"] = "ValueError"
+        return salida
+    error = _validar_opciones(funcion, opciones)
+    if error:
+        salida["error"] = f"Opciones no válidas para '{comando}': {error}"
+        salida["tipo_error"] = "TypeError"
+        return salida
+
+    from core import ReporteProgreso, OperacionCancelada
+    reporte = ReporteProgreso(_escribir_evento if mostrar_progreso else (lambda evento: None),
+                              intervalo=INTERVALO_PROGRESO_CLI)
+    anteriores = _cancelar_con_senales(reporte)
+    try:
+        salida["resultado"] = funcion(progreso=reporte, **opciones)
+        salida["ok"] = True
+    except OperacionCancelada as e:
+        salida.update({"error": str(e), "tipo_error": "OperacionCancelada", "cancelado": True})
+    except Exception as e:
+        salida.update({"error": str(e), "tipo_error": type(e).__name__})
+    finally:
+        for numero, manejador in anteriores.items():
+            signal.signal(numero, manejador)
+    salida["segundos"] = round(time.perf_counter() - inicio, 3)
+    return salida
+
+def leer_lote(ruta):
+    """
+    Lee un archivo de trabajos ('-' = entrada estándar).
+    
+    Returns:
+        tuple: (lista de trabajos, detener_en_error).
+    
+    Raises:
+        ValueError: Si el archivo no tiene el formato de un lote.
+    """
+    if ruta == "-":
+        datos = json.load(sys.stdin)
+    else:
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+    detener = False
+    if isinstance(datos, dict):
+        detener = bool(datos.get("detener_en_error", False))
+        datos = datos.get("trabajos")
+    if not isinstance(datos, list) or not all(isinstance(t, dict) and "comando" in t for t in datos):
+        raise ValueError("Un lote es una lista de trabajos, cada uno un objeto con la clave 'comando'")
+    return datos, detener
+
+def ejecutar_lote(trabajos, detener_en_error=False, mostrar_progreso=False):
+    """
+    Ejecuta los trabajos de un lote en orden. Tras una cancelación no se empieza
+    ninguno más, y tampoco tras un fallo si 'detener_en_error'.
+    
+    Returns:
+        dict: 'ok' (todos bien), 'segundos' y 'trabajos' (el resultado de cada uno
+            que se ejecutó, en orden).
+    """
+    inicio = time.perf_counter()
+    resultados = []
+    for trabajo in trabajos:
+        opciones = dict(trabajo)
+        comando = opciones.pop("comando")
+        if mostrar_progreso:
+            _escribir_evento({"tipo": "trabajo", "indice": len(resultados), "comando": comando})
+        resultado = ejecutar_trabajo(comando, opciones, mostrar_progreso)
+        resultados.append(resultado)
+        if resultado.get("cancelado") or (detener_en_error and not resultado["ok"]):
+            break
+    return {
+        "ok": len(resultados) == len(trabajos) and all(r["ok"] for r in resultados),
+        "segundos": round(time.perf_counter() - inicio, 3),
+        "trabajos": resultados
+    }
+
+# --- Línea de Comandos ---
+
+def _agregar_transferencia(parser):
+    """Opciones comunes de las organizaciones por tipo y por fecha."""
+    parser.add_argument("--copiar", action="store_true", help="Copiar en lugar de mover")
+    parser.add_argument("--readme", action="store_true", help="Generar README.md en las carpetas")
+    parser.add_argument("--reanudar", action="store_true", help="Continuar una organización interrumpida")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Solo archivos nuevos o modificados respecto al destino")
+    parser.add_argument("--verificar-hash", action="store_true",
+                        help="En modo incremental, comparar también el contenido")
+    parser.add_argument("--workers-transferencia", type=int, metavar="N", help="Copias simultáneas")
+    parser.add_argument("--medir", action="store_true",
+                        help="Añadir tiempos por fase y archivos más lentos a proyecto_info.json")
+    parser.add_argument("--traza", metavar="RUTA", help="Guardar una traza de Chrome/Perfetto (implica --medir)")
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--progreso", action="store_true",
+                        help="Escribir los eventos de progreso como líneas JSON en la salida de error")
+    subparsers = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+    # Las opciones que no se indican no aparecen y la función usa su valor por defecto
+    def nuevo(nombre, ayuda):
+        return subparsers.add_parser(nombre, help=ayuda, description=ayuda, argument_default=argparse.SUPPRESS)
+
+    tipo = nuevo("tipo", "Organizar por tipo de archivo (JPG, RAW, vídeo)")
+    tipo.add_argument("origen")
+    tipo.add_argument("destino")
+    tipo.add_argument("--crear-todas", action="store_true", help="Crear todas las carpetas, incluso vacías")
+    tipo.add_argument("--recursivo", action="store_true", help="Procesar también las subcarpetas del origen")
+    tipo.add_argument("--profundidad", type=int, metavar="N", help="Niveles de subcarpetas a recorrer")
+    tipo.add_argument("--incluir", action="append", metavar="PATRON", help="Patrón glob a incluir (repetible)")
+    tipo.add_argument("--excluir", action="append", metavar="PATRON", help="Patrón glob a excluir (repetible)")
+    tipo.add_argument("--duplicados", choices=("omitir", "enlazar"),
+                      help="No transferir los duplicados o crearlos como enlaces duros")
+    _agregar_transferencia(tipo)
+
+    fecha = nuevo("fecha", "Organizar por fecha")
+    fecha.add_argument("origen")
+    fecha.add_argument("destino")
+    fecha.add_argument("--nivel", choices=("dia", "semana", "mes", "año"), help="Nivel de organización (dia)")
+    fecha.add_argument("--workers", help="Workers de metadatos: número o 'ssd', 'hdd', 'nas'")
+    fecha.add_argument("--procesos", action="store_true", help="Leer los metadatos con un pool de procesos")
+    fecha.add_argument("--sin-cache", dest="cache", action="store_false", help="No usar la caché de metadatos")
+    fecha.add_argument("--niveles", nargs="+", choices=("nombre", "cabecera", "mtime"),
+                       help="Orden de resolución de las fechas")
+    fecha.add_argument("--patron", dest="patrones", action="append", metavar="REGEX",
+                       help="Patrón de fecha en el nombre (repetible)")
+    _agregar_transferencia(fecha)
+
+    pareja = nuevo("emparejar", "Mover los archivos de A sin pareja (mismo nombre base) en B")
+    pareja.add_argument("carpeta_a")
+    pareja.add_argument("carpeta_b")
+    pareja.add_argument("salida")
+    pareja.add_argument("--mover-emparejados", action="store_true",
+                        help="Mover también los emparejados a 'emparejadas'")
+    pareja.add_argument("--workers-transferencia", type=int, metavar="N", help="Copias simultáneas")
+
+    sin_pareja = nuevo("sin-pareja", "Mover los archivos sin pareja de las dos carpetas")
+    sin_pareja.add_argument("carpeta_a")
+    sin_pareja.add_argument("carpeta_b")
+    sin_pareja.add_argument("salida")
+    sin_pareja.add_argument("--workers-transferencia", type=int, metavar="N", help="Copias simultáneas")
+
+    compresion = nuevo("comprimir", "Comprimir una o varias carpetas en un ZIP")
+    compresion.add_argument("carpetas", nargs="+")
+    compresion.add_argument("--destino", required=True, help="Carpeta donde guardar el ZIP")
+    compresion.add_argument("--nombre", choices=("nombre", "fecha", "editado"), help="Cómo nombrar el ZIP (nombre)")
+    compresion.add_argument("--password-env", metavar="VARIABLE", help="Variable de entorno con la contraseña")
+    compresion.add_argument("--parte-mb", type=int, metavar="MB", help="Dividir en partes de este tamaño")
+    compresion.add_argument("--independientes", action="store_true",
+                      help="Con --parte-mb, cada parte es un ZIP que se extrae por sí solo")
+    compresion.add_argument("--cifrado", choices=("aes", "zipcrypto"), help="Cifrado de los ZIP en partes")
+
+    lote = nuevo("lote", "Ejecutar los trabajos de un archivo JSON ('-' = entrada estándar)")
+    lote.add_argument("archivo")
+    lote.add_argument("--detener-en-error", action="store_true", help="No seguir tras un trabajo fallido")
+    return parser
+
+def main(argv=None):
+    parser = crear_parser()
+    args = vars(parser.parse_args(argv))
+    comando = args.pop("comando")
+    mostrar_progreso = args.pop("progreso")
+    if comando == "lote":
+        try:
+            trabajos, detener = leer_lote(args["archivo"])
+        except (OSError, ValueError) as e:
+            parser.error(f"No se pudo leer el lote: {e}")
+        salida = ejecutar_lote(trabajos, args.get("detener_en_error", detener), mostrar_progreso)
+        resultados = salida["trabajos"]
+    else:
+        salida = ejecutar_trabajo(comando, args, mostrar_progreso)
+        resultados = [salida]
+    print(json.dumps(salida, indent=2, ensure_ascii=False, default=str))
+    if any(r.get("cancelado") for r in resultados):
+        return 130
+    return 0 if salida["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
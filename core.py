@@ -10,15 +10,29 @@ de archivos y la generación de reportes.
 """
 import os
 import shutil
+import errno
 import sys
-import subprocess
 import json
-from datetime import datetime
-from PIL import Image
-import exifread
-import pyminizip
-import zipfile
+import threading
+import fnmatch
+import struct
+import math
+import itertools
+import zlib
+import hmac
+import re
+import hashlib
+import bisect
+import heapq
+from functools import partial
+from collections import namedtuple, deque
+from array import array
+from datetime import datetime, timezone
 import time
+from concurrent.futures import ThreadPoolExecutor
+# Pillow, exifread, pyminizip, zipfile, sqlite3, subprocess y el pool de procesos se importan
+# dentro de las funciones que los usan: importarlos cuesta más que todo lo demás
+# junto y muchas ejecuciones (mover por tipo, la línea de comandos) no los necesitan.
 
 # --- Constantes ---
 # Listas de extensiones para clasificar los archivos.
@@ -35,22 +49,918 @@ README_CONTENT = {
     "fecha": "### 📅 Archivos por Fecha\n\nEn esta carpeta se guardan los archivos organizados por fecha de creación."
 }
 
-# --- Funciones de Análisis y Estructura ---
+# Número de workers sugerido para la lectura de metadatos según el medio de origen.
+# Un HDD sufre con muchas lecturas concurrentes (saltos del cabezal), mientras que
+# un SSD o un NAS aprovechan varias peticiones de E/S en vuelo.
+WORKERS_METADATOS = {
+    "ssd": 8,
+    "hdd": 2,
+    "nas": 16
+}
+WORKERS_METADATOS_POR_DEFECTO = "ssd"
+
+# Máximo de bytes que la lectura rápida de EXIF puede leer de un archivo antes de
+# rendirse y delegar en exifread. Las cabeceras EXIF de JPEG y RAW caben de sobra.
+EXIF_PRESUPUESTO_BYTES = 256 * 1024
+EXIF_BLOQUE_LECTURA = 4 * 1024
+
+# Copias simultáneas cuando un movimiento cruza de dispositivo.
+WORKERS_TRANSFERENCIA = 4
+
+# Tamaño del búfer para la copia por bucle cuando el sistema no ofrece copia en el kernel.
+BUFFER_COPIA = 8 * 1024 * 1024
+
+# Número máximo de entradas que guarda la caché de metadatos antes de expulsar las más antiguas.
+CACHE_MAX_ENTRADAS = 500000
+
+# Segundos mínimos entre dos eventos de progreso por archivo (los intermedios se agrupan).
+INTERVALO_PROGRESO = 0.1
+
+# Archivos más lentos que guarda la instrumentación y máximo de operaciones por
+# archivo en una traza (cada una ocupa unos 200 bytes en el JSON).
+ARCHIVOS_LENTOS = 10
+MAX_EVENTOS_TRAZA = 200000
+
+# Diferencia máxima de fecha de modificación para dar dos archivos por iguales
+# (los sistemas de archivos FAT/exFAT de las tarjetas guardan la hora con 2 s de precisión).
+TOLERANCIA_MTIME_NS = 2_000_000_000
+
+# Tamaño de bloque al calcular el hash de un archivo completo.
+BLOQUE_HASH = 1024 * 1024
+
+# Bytes del principio y del final que lee el hash parcial de la búsqueda de duplicados.
+BLOQUE_HASH_PARCIAL = 64 * 1024
+
+# Bits de diferencia (de 64) hasta los que dos imágenes se consideran la misma foto.
+DISTANCIA_SIMILARES = 8
+
+# Los archivos se comprimen en trozos de este tamaño repartidos entre WORKERS_COMPRESION hilos.
+TROZO_ZIP = 1024 * 1024
+WORKERS_COMPRESION = os.cpu_count() or 1
+# Nivel deflate de los ZIP (el predeterminado de zlib y zipfile).
+NIVEL_ZIP = 6
+
+# Formatos que ya van comprimidos: deflate apenas les quita un 0-2% y cuesta casi tanta CPU
+# como un archivo de texto, así que se guardan tal cual (ZIP_STORED).
+EXT_YA_COMPRIMIDAS = set(
+    ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif', '.avif']
+    + ['.cr2', '.cr3', '.nef', '.arw', '.dng', '.orf', '.rw2', '.pef', '.srw', '.raf']
+    + VIDEO_EXT
+    + ['.mp3', '.aac', '.m4a', '.ogg', '.opus', '.flac']
+    + ['.zip', '.7z', '.rar', '.gz', '.bz2', '.xz', '.zst']
+)
+# Con el resto se comprime (nivel 1) una muestra del primer trozo: si no baja del umbral, se guarda tal cual.
+MUESTRA_COMPRESION = 32 * 1024
+UMBRAL_ALMACENAR = 0.95
+
+# El diario de transferencias se escribe a disco (con fsync) cada tantas entradas o segundos.
+DIARIO_LOTE = 512
+DIARIO_INTERVALO = 1.0
+
+# --- Caché de Metadatos ---
+
+def directorio_cache_usuario():
+    """
+    Devuelve la carpeta de caché del usuario para Flowbooster según el sistema operativo.
+    
+    Returns:
+        str: Ruta a la carpeta de caché (no se crea aquí).
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    elif sys.platform == "darwin": # macOS
+        base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+    else: # linux (XDG)
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, "Flowbooster")
+
+class CacheMetadatos:
+    """
+    Caché persistente (SQLite) de las fechas resueltas por obtener_fecha_archivo.
+    
+    Cada entrada se identifica por la ruta y solo es válida si el tamaño, el mtime
+    y el inodo del archivo coinciden con los guardados; así los archivos sin cambios
+    no vuelven a abrirse. Cuando se supera 'max_entradas' se expulsan las entradas
+    usadas hace más tiempo.
+    
+    La fecha depende de cómo se resolvió (orden de niveles y patrones de nombre),
+    así que cada entrada guarda también esa configuración y solo acierta con la misma.
+    
+    En otra tabla, con las mismas reglas de validez, se guardan los hashes
+    perceptuales de las imágenes (uno por algoritmo).
+    """
+    VERSION_ESQUEMA = 2
+
+    def __init__(self, ruta_db=None, max_entradas=CACHE_MAX_ENTRADAS):
+        if ruta_db is None:
+            ruta_db = os.path.join(directorio_cache_usuario(), "metadatos.sqlite")
+        if ruta_db != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(ruta_db)), exist_ok=True)
+        self.ruta_db = ruta_db
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsadas = 0
+        self._lock = threading.Lock()
+        # La conexión se comparte entre hilos; el lock serializa el acceso
+        import sqlite3
+        self._conn = sqlite3.connect(ruta_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Es una caché: si el esquema guardado es de otra versión se descarta entero
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != self.VERSION_ESQUEMA:
+            self._conn.execute("DROP TABLE IF EXISTS metadatos")
+            self._conn.execute(f"PRAGMA user_version = {self.VERSION_ESQUEMA}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadatos (
+                ruta TEXT PRIMARY KEY,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inodo INTEGER NOT NULL,
+                config TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                ultimo_acceso REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acceso ON metadatos (ultimo_acceso)")
+        # Hashes de 64 bits en hexadecimal: INTEGER de SQLite es con signo
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes_perceptuales (
+                ruta TEXT NOT NULL,
+                algoritmo TEXT NOT NULL,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inodo INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                ultimo_acceso REAL NOT NULL,
+                PRIMARY KEY (ruta, algoritmo)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_hashes_ultimo_acceso ON hashes_perceptuales (ultimo_acceso)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _clave(ruta, stat=None):
+        """Devuelve (ruta absoluta, tamaño, mtime_ns, inodo) para un archivo."""
+        if isinstance(stat, RegistroArchivo):
+            return os.path.abspath(ruta), stat.tamano, stat.mtime_ns, stat.inodo
+        if stat is None:
+            stat = os.stat(ruta)
+        return os.path.abspath(ruta), stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def buscar(self, rutas, stats=None, config=""):
+        """
+        Busca las fechas de varios archivos en la caché.
+        
+        Args:
+            rutas (list): Lista de rutas a los archivos.
+            stats (list|None): Resultados de os.stat o RegistroArchivo ya conocidos, en el mismo orden.
+            config (str): Firma de la configuración con la que se resolvieron las fechas.
+            
+        Returns:
+            dict: Diccionario ruta -> datetime solo con los aciertos.
+        """
+        encontrados = {}
+        if stats is None:
+            stats = [None] * len(rutas)
+        ahora = time.time()
+        with self._lock:
+            tocados = []
+            for ruta, stat in zip(rutas, stats):
+                try:
+                    ruta_abs, tamano, mtime_ns, inodo = self._clave(ruta, stat)
+                except OSError:
+                    self.fallos += 1
+                    continue
+                fila = self._conn.execute(
+                    "SELECT tamano, mtime_ns, inodo, config, fecha FROM metadatos WHERE ruta = ?", (ruta_abs,)
+                ).fetchone()
+                if fila and fila[:4] == (tamano, mtime_ns, inodo, config):
+                    encontrados[ruta] = datetime.fromisoformat(fila[4])
+                    tocados.append((ahora, ruta_abs))
+                    self.aciertos += 1
+                else:
+                    self.fallos += 1
+            if tocados:
+                self._conn.executemany("UPDATE metadatos SET ultimo_acceso = ? WHERE ruta = ?", tocados)
+                self._conn.commit()
+        return encontrados
+
+    def guardar(self, entradas, config=""):
+        """
+        Guarda varias fechas en la caché en una sola transacción.
+        
+        Args:
+            entradas (list): Lista de tuplas (ruta, fecha) o (ruta, fecha, stat|RegistroArchivo).
+            config (str): Firma de la configuración con la que se resolvieron las fechas.
+        """
+        ahora = time.time()
+        filas = []
+        for entrada in entradas:
+            ruta, fecha = entrada[0], entrada[1]
+            stat = entrada[2] if len(entrada) > 2 else None
+            if fecha is None:
+                continue
+            try:
+                ruta_abs, tamano, mtime_ns, inodo = self._clave(ruta, stat)
+            except OSError:
+                continue
+            filas.append((ruta_abs, tamano, mtime_ns, inodo, config, fecha.isoformat(), ahora))
+        if not filas:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO metadatos VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+            self._conn.commit()
+            self._expulsar()
+
+    def buscar_hashes(self, rutas, stats=None, algoritmo="dhash"):
+        """
+        Busca los hashes perceptuales de varias imágenes en la caché.
+        
+        Args:
+            rutas (list): Lista de rutas a las imágenes.
+            stats (list|None): Resultados de os.stat o RegistroArchivo ya conocidos, en el mismo orden.
+            algoritmo (str): Algoritmo con el que se calcularon ('dhash' o 'phash').
+            
+        Returns:
+            dict: Diccionario ruta -> hash (int) solo con los aciertos.
+        """
+        encontrados = {}
+        if stats is None:
+            stats = [None] * len(rutas)
+        ahora = time.time()
+        with self._lock:
+            tocados = []
+            for ruta, stat in zip(rutas, stats):
+                try:
+                    ruta_abs, tamano, mtime_ns, inodo = self._clave(ruta, stat)
+                except OSError:
+                    self.fallos += 1
+                    continue
+                fila = self._conn.execute(
+                    "SELECT tamano, mtime_ns, inodo, hash FROM hashes_perceptuales WHERE ruta = ? AND algoritmo = ?",
+                    (ruta_abs, algoritmo)
+                ).fetchone()
+                if fila and fila[:3] == (tamano, mtime_ns, inodo):
+                    encontrados[ruta] = int(fila[3], 16)
+                    tocados.append((ahora, ruta_abs, algoritmo))
+                    self.aciertos += 1
+                else:
+                    self.fallos += 1
+            if tocados:
+                self._conn.executemany(
+                    "UPDATE hashes_perceptuales SET ultimo_acceso = ? WHERE ruta = ? AND algoritmo = ?", tocados
+                )
+                self._conn.commit()
+        return encontrados
+
+    def guardar_hashes(self, entradas, algoritmo="dhash"):
+        """
+        Guarda varios hashes perceptuales en la caché en una sola transacción.
+        
+        Args:
+            entradas (list): Lista de tuplas (ruta, hash) o (ruta, hash, stat|RegistroArchivo).
+            algoritmo (str): Algoritmo con el que se calcularon.
+        """
+        ahora = time.time()
+        filas = []
+        for entrada in entradas:
+            ruta, valor = entrada[0], entrada[1]
+            stat = entrada[2] if len(entrada) > 2 else None
+            if valor is None:
+                continue
+            try:
+                ruta_abs, tamano, mtime_ns, inodo = self._clave(ruta, stat)
+            except OSError:
+                continue
+            filas.append((ruta_abs, algoritmo, tamano, mtime_ns, inodo, f"{valor:016x}", ahora))
+        if not filas:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO hashes_perceptuales VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+            self._conn.commit()
+            self._expulsar("hashes_perceptuales")
+
+    def _expulsar(self, tabla="metadatos"):
+        """Elimina las entradas menos usadas si la tabla supera el tamaño máximo de la caché."""
+        total = self._conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+        if total <= self.max_entradas:
+            return
+        # Se deja un margen del 10% para no expulsar en cada inserción
+        sobrantes = total - int(self.max_entradas * 0.9)
+        self._conn.execute(
+            f"DELETE FROM {tabla} WHERE rowid IN (SELECT rowid FROM {tabla} ORDER BY ultimo_acceso LIMIT ?)",
+            (sobrantes,)
+        )
+        self._conn.commit()
+        self.expulsadas += sobrantes
+
+    def invalidar(self, ruta=None):
+        """
+        Invalida entradas de la caché.
+        
+        Args:
+            ruta (str|None): Archivo o carpeta a invalidar (incluye su contenido).
+                Si es None se vacía toda la caché.
+        """
+        with self._lock:
+            for tabla in ("metadatos", "hashes_perceptuales"):
+                if ruta is None:
+                    self._conn.execute(f"DELETE FROM {tabla}")
+                else:
+                    ruta_abs = os.path.abspath(ruta)
+                    prefijo = ruta_abs.rstrip(os.sep) + os.sep
+                    self._conn.execute(
+                        f"DELETE FROM {tabla} WHERE ruta = ? OR substr(ruta, 1, ?) = ?",
+                        (ruta_abs, len(prefijo), prefijo)
+                    )
+            self._conn.commit()
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de uso de la caché.
+        
+        Returns:
+            dict: Aciertos, fallos, ratio de aciertos, expulsiones y entradas guardadas.
+        """
+        with self._lock:
+            entradas = self._conn.execute("SELECT COUNT(*) FROM metadatos").fetchone()[0]
+            hashes = self._conn.execute("SELECT COUNT(*) FROM hashes_perceptuales").fetchone()[0]
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "ratio_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            "expulsadas": self.expulsadas,
+            "entradas": entradas,
+            "hashes_perceptuales": hashes
+        }
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos."""
+        with self._lock:
+            self._conn.close()
+
+_cache_por_defecto = None
+
+def obtener_cache_metadatos():
+    """
+    Devuelve la caché de metadatos compartida, ubicada en la carpeta de caché del usuario.
+    
+    Returns:
+        CacheMetadatos|None: La caché o None si no se pudo abrir (p. ej. disco de solo lectura).
+    """
+    global _cache_por_defecto
+    if _cache_por_defecto is None:
+        import sqlite3
+        try:
+            _cache_por_defecto = CacheMetadatos()
+        except (OSError, sqlite3.Error) as e:
+            print(f"No se pudo abrir la caché de metadatos: {e}")
+            return None
+    return _cache_por_defecto
+
+# --- Escáner de Archivos ---
+
+# Registro de un archivo encontrado por el escáner. Los datos de stat salen de la
+# caché de os.DirEntry, así que no hace falta volver a consultar el disco.
+# 'relativa' es la ruta respecto a la carpeta escaneada (igual a 'nombre' en el primer nivel).
+RegistroArchivo = namedtuple("RegistroArchivo", ["nombre", "ruta", "ext", "tamano", "mtime", "mtime_ns", "inodo", "relativa"])
+
+def escanear_carpeta(carpeta, extensiones=None):
+    """
+    Lista los archivos (no carpetas) de una carpeta en una sola pasada con os.scandir.
+    
+    Sustituye al patrón os.listdir + os.path.isfile + os.path.getmtime: cada archivo
+    cuesta como mucho un stat (ninguno en Windows, donde scandir ya lo trae).
+    
+    Args:
+        carpeta (str): Ruta de la carpeta a escanear.
+        extensiones (list|None): Extensiones en minúscula a incluir. None incluye todas.
+        
+    Returns:
+        list: Lista de RegistroArchivo en el orden en que los devuelve el sistema.
+    """
+    registros = []
+    with os.scandir(carpeta) as entradas:
+        for entrada in entradas:
+            try:
+                if not entrada.is_file():
+                    continue # Ignora subcarpetas, solo procesa archivos
+                ext = os.path.splitext(entrada.name)[1].lower()
+                if extensiones is not None and ext not in extensiones:
+                    continue
+                stat = entrada.stat()
+                registros.append(RegistroArchivo(
+                    entrada.name, entrada.path, ext,
+                    stat.st_size, stat.st_mtime, stat.st_mtime_ns, entrada.inode(), entrada.name
+                ))
+            except OSError:
+                continue # El archivo desapareció o no es accesible
+    return registros
+
+def _coincide_patron(relativa, nombre, patrones):
+    """Indica si la ruta relativa o el nombre coinciden con alguno de los patrones glob (sin distinguir mayúsculas)."""
+    relativa = relativa.replace(os.sep, "/").lower()
+    nombre = nombre.lower()
+    return any(fnmatch.fnmatchcase(relativa, p) or fnmatch.fnmatchcase(nombre, p) for p in patrones)
+
+def iterar_archivos(carpeta, profundidad_max=None, incluir=None, excluir=None, extensiones=None,
+                    seguir_enlaces=False, omitir=None):
+    """
+    Recorre una carpeta de forma recursiva y va entregando los archivos a medida que los encuentra.
+    
+    Es un generador: el consumidor puede empezar a trabajar con el primer archivo
+    antes de que termine el recorrido. Cada carpeta se lee entera y se cierra antes
+    de entregar sus archivos, así que la memoria depende del tamaño de la carpeta
+    más grande y de la profundidad, no del tamaño total del árbol.
+    
+    Args:
+        carpeta (str): Ruta de la carpeta raíz.
+        profundidad_max (int|None): Niveles de subcarpetas a recorrer (0 = solo la raíz, None = sin límite).
+        incluir (list|None): Patrones glob de archivos a incluir (p. ej. ['*.jpg', 'DCIM/*']).
+            Se comparan con la ruta relativa y con el nombre. None incluye todos.
+        excluir (list|None): Patrones glob de archivos o carpetas a excluir. Una carpeta
+            excluida no se recorre.
+        extensiones (list|None): Extensiones en minúscula a incluir. None incluye todas.
+        seguir_enlaces (bool): Si es True entra en carpetas que son enlaces simbólicos.
+        omitir (list|None): Rutas de carpetas que no se deben recorrer (p. ej. el destino
+            cuando está dentro del origen).
+        
+    Yields:
+        RegistroArchivo: Un registro por archivo, con 'relativa' respecto a 'carpeta'.
+    """
+    incluir = [p.lower() for p in incluir] if incluir else None
+    excluir = [p.lower() for p in excluir] if excluir else []
+    omitir = {os.path.normcase(os.path.abspath(r)) for r in (omitir or [])}
+
+    def clave_carpeta(ruta):
+        stat = os.stat(ruta)
+        return (stat.st_dev, stat.st_ino)
+
+    # Pila de (ruta, ruta relativa, profundidad, claves de las carpetas ancestro).
+    # Solo se guardan los ancestros de cada rama: basta para detectar ciclos de
+    # enlaces sin recordar todas las carpetas visitadas.
+    pila = [(carpeta, "", 0, frozenset([clave_carpeta(carpeta)]))]
+    while pila:
+        ruta_dir, relativa_dir, profundidad, ancestros = pila.pop()
+        registros = []
+        subcarpetas = []
+        try:
+            with os.scandir(ruta_dir) as entradas:
+                for entrada in entradas:
+                    relativa = os.path.join(relativa_dir, entrada.name) if relativa_dir else entrada.name
+                    try:
+                        if entrada.is_dir(follow_symlinks=seguir_enlaces):
+                            if profundidad_max is not None and profundidad >= profundidad_max:
+                                continue
+                            if excluir and _coincide_patron(relativa, entrada.name, excluir):
+                                continue
+                            if os.path.normcase(os.path.abspath(entrada.path)) in omitir:
+                                continue
+                            subcarpetas.append((entrada.path, relativa))
+                            continue
+                        if not entrada.is_file():
+                            continue
+                        ext = os.path.splitext(entrada.name)[1].lower()
+                        if extensiones is not None and ext not in extensiones:
+                            continue
+                        if excluir and _coincide_patron(relativa, entrada.name, excluir):
+                            continue
+                        if incluir and not _coincide_patron(relativa, entrada.name, incluir):
+                            continue
+                        stat = entrada.stat()
+                        registros.append(RegistroArchivo(
+                            entrada.name, entrada.path, ext,
+                            stat.st_size, stat.st_mtime, stat.st_mtime_ns, entrada.inode(), relativa
+                        ))
+                    except OSError:
+                        continue # El archivo desapareció o no es accesible
+        except OSError:
+            continue # Carpeta sin permisos o eliminada durante el recorrido
+
+        yield from registros
+        del registros
+
+        # Se apilan en orden inverso para recorrer las subcarpetas en el orden del listado
+        for ruta_sub, relativa_sub in reversed(subcarpetas):
+            try:
+                clave = clave_carpeta(ruta_sub)
+            except OSError:
+                continue
+            if clave in ancestros:
+                continue # Ciclo de enlaces: la carpeta ya está en la rama actual
+            pila.append((ruta_sub, relativa_sub, profundidad + 1, ancestros | {clave}))
+
+# --- Lectura Rápida de EXIF ---
+
+class _LectorAcotado:
+    """
+    Lee un archivo por bloques desde el principio sin pasar nunca de un presupuesto de bytes.
+    Lanza ValueError si se pide un rango fuera del presupuesto o del archivo.
+    """
+    def __init__(self, f, presupuesto, bloque=EXIF_BLOQUE_LECTURA):
+        self._f = f
+        self._presupuesto = presupuesto
+        self._bloque = bloque
+        # bytearray: crece sin volver a copiar lo ya leído
+        self._buffer = bytearray()
+
+    @property
+    def bytes_leidos(self):
+        return len(self._buffer)
+
+    def leer(self, offset, n):
+        fin = offset + n
+        if offset < 0 or fin > self._presupuesto:
+            raise ValueError("Fuera del presupuesto de lectura")
+        if fin > len(self._buffer):
+            a_leer = min(max(fin, len(self._buffer) + self._bloque), self._presupuesto) - len(self._buffer)
+            self._buffer.extend(self._f.read(a_leer))
+            if fin > len(self._buffer):
+                raise ValueError("Fin de archivo inesperado")
+        return bytes(self._buffer[offset:fin])
+
+def _leer_entrada_ifd(lector, base, offset_ifd, orden, tag_buscado):
+    """
+    Busca una etiqueta en un IFD de TIFF.
+    
+    Returns:
+        tuple|None: (tipo, cantidad, campo_valor_4_bytes) o None si no está.
+    """
+    n_entradas = struct.unpack(orden + "H", lector.leer(base + offset_ifd, 2))[0]
+    entradas = lector.leer(base + offset_ifd + 2, 12 * n_entradas)
+    for i in range(n_entradas):
+        tag, tipo, cantidad = struct.unpack(orden + "HHI", entradas[i * 12:i * 12 + 8])
+        if tag == tag_buscado:
+            return tipo, cantidad, entradas[i * 12 + 8:i * 12 + 12]
+    return None
+
+def _fecha_desde_tiff(lector, base):
+    """
+    Recorre la cabecera TIFF en 'base' hasta EXIF DateTimeOriginal.
+    
+    Returns:
+        datetime|None: La fecha, o None si el archivo no tiene esa etiqueta.
+    """
+    cabecera = lector.leer(base, 8)
+    if cabecera[:2] == b"II":
+        orden = "<"
+    elif cabecera[:2] == b"MM":
+        orden = ">"
+    else:
+        raise ValueError("Cabecera TIFF no válida")
+    magia, offset_ifd0 = struct.unpack(orden + "HI", cabecera[2:8])
+    # 42 = TIFF estándar (CR2, NEF, ARW, DNG, PEF, SRW); 0x4F52/0x5352 = ORF; 0x55 = RW2
+    if magia not in (42, 0x4F52, 0x5352, 0x55):
+        raise ValueError("Cabecera TIFF no válida")
+
+    entrada_exif = _leer_entrada_ifd(lector, base, offset_ifd0, orden, 0x8769)  # ExifIFDPointer
+    if entrada_exif is None:
+        return None
+    offset_exif = struct.unpack(orden + "I", entrada_exif[2])[0]
+
+    entrada_fecha = _leer_entrada_ifd(lector, base, offset_exif, orden, 0x9003)  # DateTimeOriginal
+    if entrada_fecha is None:
+        return None
+    tipo, cantidad, valor = entrada_fecha
+    if tipo != 2:  # ASCII
+        return None
+    if cantidad <= 4:
+        crudo = valor[:cantidad]
+    else:
+        crudo = lector.leer(base + struct.unpack(orden + "I", valor)[0], cantidad)
+    try:
+        fecha_str = crudo.split(b"\x00", 1)[0].decode("ascii").strip()
+        return datetime.strptime(fecha_str, '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None  # Fecha vacía o mal formada (p. ej. '0000:00:00 00:00:00')
+
+def _fecha_desde_jpeg(lector):
+    """
+    Recorre los segmentos de un JPEG hasta el APP1 'Exif' y lee su cabecera TIFF.
+    
+    Returns:
+        datetime|None: La fecha, o None si el JPEG no tiene EXIF con esa etiqueta.
+    """
+    offset = 2
+    while True:
+        marcador = lector.leer(offset, 2)
+        if marcador[0] != 0xFF:
+            raise ValueError("Segmento JPEG no válido")
+        if marcador[1] == 0xFF:  # Byte de relleno
+            offset += 1
+            continue
+        if marcador[1] in (0xDA, 0xD9):  # Inicio de los datos de imagen o fin: no hay EXIF
+            return None
+        longitud = struct.unpack(">H", lector.leer(offset + 2, 2))[0]
+        if marcador[1] == 0xE1 and lector.leer(offset + 4, 6) == b"Exif\x00\x00":
+            return _fecha_desde_tiff(lector, offset + 10)
+        offset += 2 + longitud
+
+def leer_fecha_exif_rapida(ruta_archivo, presupuesto=None):
+    """
+    Lee EXIF DateTimeOriginal de un JPEG o RAW basado en TIFF leyendo solo la cabecera.
+    
+    Recorre los IFD directamente hasta la etiqueta, sin pasar de 'presupuesto' bytes.
+    
+    Args:
+        ruta_archivo (str): Ruta completa al archivo.
+        presupuesto (int|None): Máximo de bytes a leer (por defecto EXIF_PRESUPUESTO_BYTES).
+        
+    Returns:
+        datetime|None: La fecha, o None si el archivo se pudo leer pero no tiene la etiqueta.
+        
+    Raises:
+        ValueError: Si el formato no es JPEG/TIFF o la cabecera no cabe en el presupuesto.
+    """
+    if presupuesto is None:
+        presupuesto = EXIF_PRESUPUESTO_BYTES
+    with open(ruta_archivo, 'rb') as f:
+        lector = _LectorAcotado(f, presupuesto)
+        try:
+            inicio = lector.leer(0, 4)
+            if inicio[:2] == b"\xff\xd8":
+                return _fecha_desde_jpeg(lector)
+            return _fecha_desde_tiff(lector, 0)
+        except struct.error as e:
+            raise ValueError(f"Cabecera EXIF truncada: {e}")
+
+# Extensiones que intentan primero la lectura rápida de EXIF (JPEG y RAW basados en TIFF).
+EXIF_RAPIDO_EXT = ['.jpg', '.jpeg', '.tiff'] + IMG_RAW_EXT
+
+# --- Fecha de Creación de Videos ---
+
+# Contenedores de video con fecha de creación legible sin decodificar.
+VIDEO_ISOBMFF_EXT = ['.mp4', '.mov', '.m4v', '.3gp']
+VIDEO_EBML_EXT = ['.mkv', '.webm']
+
+# Segundos entre las épocas de cada formato y la época Unix (1970-01-01 UTC).
+_EPOCA_MP4 = 2082844800   # 1904-01-01
+_EPOCA_MKV = 978307200    # 2001-01-01
+
+# Límite de cajas/elementos a recorrer, por si el archivo está corrupto.
+_MAX_ELEMENTOS_CONTENEDOR = 4096
+
+def _leer_exacto(f, n):
+    """Lee exactamente n bytes o lanza ValueError."""
+    datos = f.read(n)
+    if len(datos) != n:
+        raise ValueError("Fin de archivo inesperado")
+    return datos
+
+def _fecha_desde_segundos_utc(segundos):
+    """Convierte segundos Unix UTC a datetime local (como las fechas de mtime). 0 o inválido = None."""
+    if segundos <= 0:
+        return None
+    try:
+        return datetime.fromtimestamp(segundos)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+def _buscar_caja_mp4(f, inicio, fin, tipo_buscado):
+    """
+    Busca una caja (atom) de ISO BMFF entre 'inicio' y 'fin' saltando las demás con seek.
+    
+    Returns:
+        tuple|None: (offset de los datos, offset del final) de la caja o None si no está.
+    """
+    offset = inicio
+    for _ in range(_MAX_ELEMENTOS_CONTENEDOR):
+        if fin is not None and offset + 8 > fin:
+            return None
+        f.seek(offset)
+        cabecera = f.read(8)
+        if len(cabecera) < 8:
+            return None
+        tamano, tipo = struct.unpack(">I4s", cabecera)
+        datos = offset + 8
+        if tamano == 1:  # Tamaño de 64 bits
+            tamano = struct.unpack(">Q", _leer_exacto(f, 8))[0]
+            datos += 8
+        elif tamano == 0:  # La caja llega hasta el final del archivo
+            return (datos, fin) if tipo == tipo_buscado else None
+        if tamano < datos - offset:
+            raise ValueError("Caja MP4 no válida")
+        if tipo == tipo_buscado:
+            return datos, offset + tamano
+        offset += tamano
+    raise ValueError("Demasiadas cajas MP4")
+
+def _fecha_desde_mp4(f):
+    """Lee creation_time de moov/mvhd saltando 'mdat' aunque 'moov' esté al final."""
+    moov = _buscar_caja_mp4(f, 0, None, b"moov")
+    if moov is None:
+        raise ValueError("El archivo no tiene caja moov")
+    mvhd = _buscar_caja_mp4(f, moov[0], moov[1], b"mvhd")
+    if mvhd is None:
+        raise ValueError("El archivo no tiene caja mvhd")
+    f.seek(mvhd[0])
+    version = _leer_exacto(f, 4)[0]
+    if version == 1:
+        creacion = struct.unpack(">Q", _leer_exacto(f, 8))[0]
+    else:
+        creacion = struct.unpack(">I", _leer_exacto(f, 4))[0]
+    if creacion == 0:
+        return None
+    return _fecha_desde_segundos_utc(creacion - _EPOCA_MP4)
+
+def _leer_vint_ebml(f, es_id=False):
+    """
+    Lee un entero de longitud variable de EBML.
+    
+    Returns:
+        tuple: (valor, bytes leídos). Para tamaños desconocidos el valor es None.
+    """
+    primero = _leer_exacto(f, 1)[0]
+    longitud = 1
+    mascara = 0x80
+    while longitud <= 8 and not primero & mascara:
+        mascara >>= 1
+        longitud += 1
+    if longitud > 8:
+        raise ValueError("Entero EBML no válido")
+    resto = _leer_exacto(f, longitud - 1)
+    if es_id:
+        return int.from_bytes(bytes([primero]) + resto, "big"), longitud
+    valor = int.from_bytes(bytes([primero & (mascara - 1)]) + resto, "big")
+    if valor == (1 << (7 * longitud)) - 1:
+        valor = None  # Tamaño desconocido
+    return valor, longitud
+
+def _buscar_elemento_ebml(f, inicio, fin, id_buscado):
+    """
+    Busca un elemento EBML entre 'inicio' y 'fin' saltando los demás con seek.
+    
+    Returns:
+        tuple|None: (offset de los datos, tamaño) del elemento o None si no está.
+    """
+    offset = inicio
+    for _ in range(_MAX_ELEMENTOS_CONTENEDOR):
+        if fin is not None and offset >= fin:
+            return None
+        f.seek(offset)
+        if not f.read(1):
+            return None
+        f.seek(offset)
+        id_elemento, largo_id = _leer_vint_ebml(f, es_id=True)
+        tamano, largo_tamano = _leer_vint_ebml(f)
+        datos = offset + largo_id + largo_tamano
+        if id_elemento == id_buscado:
+            return datos, tamano
+        if tamano is None:
+            raise ValueError("Elemento EBML de tamaño desconocido")
+        offset = datos + tamano
+    raise ValueError("Demasiados elementos EBML")
+
+def _fecha_desde_mkv(f):
+    """Lee Segment/Info/DateUTC de un MKV o WebM."""
+    cabecera = _buscar_elemento_ebml(f, 0, None, 0x1A45DFA3)  # EBML
+    if cabecera is None or cabecera[0] > 16 or cabecera[1] is None:
+        raise ValueError("No es un archivo EBML")
+    segmento = _buscar_elemento_ebml(f, cabecera[0] + cabecera[1], None, 0x18538067)  # Segment
+    if segmento is None:
+        raise ValueError("El archivo no tiene Segment")
+    fin_segmento = segmento[0] + segmento[1] if segmento[1] is not None else None
+    info = _buscar_elemento_ebml(f, segmento[0], fin_segmento, 0x1549A966)  # Info
+    if info is None or info[1] is None:
+        raise ValueError("El archivo no tiene Info")
+    fecha = _buscar_elemento_ebml(f, info[0], info[0] + info[1], 0x4461)  # DateUTC
+    if fecha is None:
+        return None
+    f.seek(fecha[0])
+    nanosegundos = int.from_bytes(_leer_exacto(f, fecha[1]), "big", signed=True)
+    return _fecha_desde_segundos_utc(nanosegundos / 1e9 + _EPOCA_MKV)
+
+def leer_fecha_video(ruta_archivo):
+    """
+    Lee la fecha de creación guardada en el contenedor de un video sin decodificarlo.
+    
+    Para MP4/MOV/M4V/3GP usa moov/mvhd.creation_time y para MKV/WebM Info/DateUTC.
+    Solo se leen las cabeceras de las cajas o elementos necesarios: el resto se
+    salta con seek, así que 'moov' al final de un archivo de varios GB no obliga
+    a leer los datos de video.
+    
+    Args:
+        ruta_archivo (str): Ruta completa al archivo.
+        
+    Returns:
+        datetime|None: La fecha (hora local), o None si el contenedor no la guarda.
+        
+    Raises:
+        ValueError: Si el formato no es compatible o el contenedor está dañado.
+    """
+    ext = os.path.splitext(ruta_archivo)[1].lower()
+    with open(ruta_archivo, 'rb') as f:
+        try:
+            if ext in VIDEO_EBML_EXT:
+                return _fecha_desde_mkv(f)
+            return _fecha_desde_mp4(f)
+        except struct.error as e:
+            raise ValueError(f"Contenedor truncado: {e}")
+
+# --- Resolución de Fechas por Niveles ---
+
+# Patrones de nombre con fecha (grupos y, m, d y opcionalmente H, M, S). Se prueban
+# en orden y no requieren abrir el archivo.
+PATRONES_FECHA_NOMBRE = [
+    # IMG_20240312_143012.jpg, VID_20240312_143012.mp4, Screenshot_20240312-143012.png
+    # (no PXL_..., que va en hora UTC: ver PATRONES_FECHA_NOMBRE_UTC)
+    re.compile(r"(?<!\d)(?<!PXL_)(?P<y>(?:19|20)\d{2})(?P<m>\d{2})(?P<d>\d{2})[_-](?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})"),
+    # DJI_20240312143012_0001_D.MP4
+    re.compile(r"(?<!\d)(?P<y>(?:19|20)\d{2})(?P<m>\d{2})(?P<d>\d{2})(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?!\d)"),
+    # 2024-03-12 14.30.12.jpg, 2024-03-12_14-30-12.mp4
+    re.compile(r"(?<!\d)(?P<y>(?:19|20)\d{2})-(?P<m>\d{2})-(?P<d>\d{2})[ _T](?P<H>\d{2})[.:-](?P<M>\d{2})[.:-](?P<S>\d{2})"),
+    # IMG-20240312-WA0001.jpg (WhatsApp, solo fecha)
+    re.compile(r"-(?P<y>(?:19|20)\d{2})(?P<m>\d{2})(?P<d>\d{2})-WA\d+", re.IGNORECASE),
+]
+
+# Nombres con la hora en UTC, que no coincide con la hora local del EXIF. Solo se
+# usan si la cabecera no da una fecha (o no está entre los niveles).
+PATRONES_FECHA_NOMBRE_UTC = [
+    # PXL_20240312_143012345.jpg (Pixel)
+    re.compile(r"(?<![A-Za-z0-9])PXL_(?P<y>(?:19|20)\d{2})(?P<m>\d{2})(?P<d>\d{2})_(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})"),
+]
+
+# Orden por defecto de los niveles: nombre (sin E/S), cabecera EXIF/contenedor y mtime.
+NIVELES_FECHA = ("nombre", "cabecera", "mtime")
+
+def fecha_desde_nombre(nombre, patrones=None):
+    """
+    Extrae la fecha del nombre de un archivo usando patrones (sin tocar el disco).
+    
+    Args:
+        nombre (str): Nombre del archivo (sin carpeta).
+        patrones (list|None): Expresiones regulares (compiladas o texto) con grupos
+            y, m, d y opcionalmente H, M, S. Por defecto PATRONES_FECHA_NOMBRE.
+        
+    Returns:
+        datetime|None: La fecha o None si ningún patrón da una fecha válida.
+    """
+    for patron in (PATRONES_FECHA_NOMBRE if patrones is None else patrones):
+        coincidencia = re.search(patron, nombre)
+        if not coincidencia:
+            continue
+        grupos = coincidencia.groupdict()
+        try:
+            return datetime(
+                int(grupos["y"]), int(grupos["m"]), int(grupos["d"]),
+                int(grupos.get("H") or 0), int(grupos.get("M") or 0), int(grupos.get("S") or 0)
+            )
+        except ValueError:
+            continue  # Números que parecen una fecha pero no lo son (p. ej. mes 13)
+    return None
+
+def fecha_desde_nombre_utc(nombre):
+    """
+    Extrae la fecha de un nombre con la hora en UTC (PATRONES_FECHA_NOMBRE_UTC) y la
+    pasa a la hora local, como la que guarda el EXIF.
+    
+    Args:
+        nombre (str): Nombre del archivo (sin carpeta).
+        
+    Returns:
+        datetime|None: La fecha en hora local o None si el nombre no la lleva.
+    """
+    fecha = fecha_desde_nombre(nombre, PATRONES_FECHA_NOMBRE_UTC)
+    if fecha is None:
+        return None
+    return datetime.fromtimestamp(fecha.replace(tzinfo=timezone.utc).timestamp())
 
-def obtener_fecha_archivo(ruta_archivo):
+def fecha_desde_cabecera(ruta_archivo):
     """
-    Obtiene la fecha de creación del archivo, intentando extraer EXIF primero.
+    Lee la fecha guardada dentro del archivo: EXIF en imágenes y contenedor en videos.
+    
+    Para JPEG y RAW se usa leer_fecha_exif_rapida; exifread solo se usa si la
+    lectura rápida no entiende el archivo. Para videos se usa leer_fecha_video.
     
     Args:
         ruta_archivo (str): Ruta completa al archivo.
         
     Returns:
-        datetime: Fecha del archivo o fecha de modificación del sistema.
+        datetime|None: La fecha o None si el archivo no la guarda o no se pudo leer.
     """
     try:
         # Intentar extraer fecha EXIF de imágenes
         ext = os.path.splitext(ruta_archivo)[1].lower()
-        if ext in IMG_JPG_EXT + IMG_RAW_EXT:
+        usar_exifread = ext in IMG_JPG_EXT + IMG_RAW_EXT
+        if ext in EXIF_RAPIDO_EXT:
+            try:
+                fecha = leer_fecha_exif_rapida(ruta_archivo)
+                if fecha is not None:
+                    return fecha
+                usar_exifread = False  # Cabecera válida pero sin fecha: exifread no encontraría otra
+            except ValueError:
+                pass
+        if ext in VIDEO_ISOBMFF_EXT + VIDEO_EBML_EXT:
+            try:
+                return leer_fecha_video(ruta_archivo)
+            except ValueError:
+                pass
+        if usar_exifread:
+            import exifread
             with open(ruta_archivo, 'rb') as f:
                 tags = exifread.process_file(f, stop_tag='EXIF DateTimeOriginal')
                 if 'EXIF DateTimeOriginal' in tags:
@@ -58,16 +968,233 @@ def obtener_fecha_archivo(ruta_archivo):
                     return datetime.strptime(fecha_str, '%Y:%m:%d %H:%M:%S')
     except:
         pass
+    return None
+
+def resolver_fecha_archivo(ruta_archivo, mtime=None, niveles=None, patrones=None):
+    """
+    Resuelve la fecha de un archivo probando los niveles en orden, del más barato al más caro.
+    
+    Args:
+        ruta_archivo (str): Ruta completa al archivo.
+        mtime (float|None): Fecha de modificación ya conocida (p. ej. del escáner).
+        niveles (list|None): Orden de niveles a probar: 'nombre', 'cabecera' y 'mtime'.
+            Por defecto NIVELES_FECHA.
+        patrones (list|None): Patrones de nombre para el nivel 'nombre'. Los nombres
+            en hora UTC (PATRONES_FECHA_NOMBRE_UTC) se prueban después de la cabecera.
+        
+    Returns:
+        tuple: (datetime, nivel que la resolvió) o (None, None) si ningún nivel la resolvió.
+    """
+    niveles = NIVELES_FECHA if niveles is None else niveles
+    for nivel in niveles:
+        if nivel == "nombre":
+            fecha = fecha_desde_nombre(os.path.basename(ruta_archivo), patrones)
+        elif nivel == "cabecera":
+            fecha = fecha_desde_cabecera(ruta_archivo)
+        elif nivel == "mtime":
+            if mtime is None:
+                mtime = os.path.getmtime(ruta_archivo)
+            fecha = datetime.fromtimestamp(mtime)
+        else:
+            raise ValueError(f"Nivel de fecha desconocido: {nivel}")
+        if fecha is not None:
+            return fecha, nivel
+        if nivel == ("cabecera" if "cabecera" in niveles else "nombre"):
+            # Nombres en hora UTC: solo cuando la cabecera no dio la hora local
+            fecha = fecha_desde_nombre_utc(os.path.basename(ruta_archivo))
+            if fecha is not None:
+                return fecha, "nombre"
+    return None, None
+
+def firma_niveles(niveles=None, patrones=None):
+    """
+    Devuelve un texto que identifica una configuración de niveles y patrones (para la caché).
+    """
+    niveles = NIVELES_FECHA if niveles is None else niveles
+    patrones = PATRONES_FECHA_NOMBRE if patrones is None else patrones
+    texto_patrones = "\n".join(p if isinstance(p, str) else p.pattern
+                               for p in list(patrones) + PATRONES_FECHA_NOMBRE_UTC)
+    return ",".join(niveles) + "|" + hashlib.sha1(texto_patrones.encode("utf-8")).hexdigest()[:12]
+
+# --- Funciones de Análisis y Estructura ---
+
+def obtener_fecha_archivo(ruta_archivo, mtime=None, niveles=None, patrones=None):
+    """
+    Obtiene la fecha de creación del archivo: primero por el nombre, luego por
+    EXIF o el contenedor de video y por último por la fecha de modificación.
+    
+    Args:
+        ruta_archivo (str): Ruta completa al archivo.
+        mtime (float|None): Fecha de modificación ya conocida (p. ej. del escáner),
+            para no volver a consultarla al disco.
+        niveles (list|None): Orden de niveles a probar (ver resolver_fecha_archivo).
+        patrones (list|None): Patrones de nombre para el nivel 'nombre'.
+        
+    Returns:
+        datetime: Fecha del archivo (None solo si se quitó el nivel 'mtime' y ningún otro la resolvió).
+    """
+    return resolver_fecha_archivo(ruta_archivo, mtime, niveles, patrones)[0]
+
+def _fecha_archivo_o_none(ruta_archivo, mtime=None, niveles=None, patrones=None):
+    """
+    Variante de resolver_fecha_archivo que devuelve (None, None) en lugar de lanzar excepciones.
+    Se define a nivel de módulo para que pueda enviarse a un pool de procesos.
+    """
+    try:
+        return resolver_fecha_archivo(ruta_archivo, mtime, niveles, patrones)
+    except:
+        return None, None
+
+def resolver_workers(max_workers=None):
+    """
+    Traduce el parámetro de workers a un número entero.
+    
+    Args:
+        max_workers (int|str|None): Número de workers, nombre de un perfil de
+            WORKERS_METADATOS ('ssd', 'hdd', 'nas') o None para el perfil por defecto.
+        
+    Returns:
+        int: Número de workers (mínimo 1).
+    """
+    if max_workers is None:
+        max_workers = WORKERS_METADATOS_POR_DEFECTO
+    if isinstance(max_workers, str):
+        if max_workers.lower() not in WORKERS_METADATOS:
+            raise ValueError(f"Perfil de workers desconocido: {max_workers}")
+        max_workers = WORKERS_METADATOS[max_workers.lower()]
+    return max(1, int(max_workers))
+
+def obtener_fechas_archivos(rutas, max_workers=None, usar_procesos=False, cache=None,
+                            niveles=None, patrones=None, estadisticas=None, progreso=None,
+                            instrumentacion=None):
+    """
+    Obtiene la fecha de varios archivos en paralelo.
+    
+    El resultado conserva el orden de 'rutas' y es idéntico al de llamar a
+    obtener_fecha_archivo uno por uno; los archivos que fallan devuelven None.
+    
+    Args:
+        rutas (list): Rutas completas a los archivos o RegistroArchivo del escáner
+            (estos evitan volver a consultar el stat del archivo).
+        max_workers (int|str|None): Workers del pool o perfil ('ssd', 'hdd', 'nas').
+            Con 1 worker se usa el camino secuencial sin crear ningún pool.
+        usar_procesos (bool): Si es True usa un pool de procesos en lugar de hilos.
+        cache (CacheMetadatos|bool|None): Caché de metadatos a consultar antes de leer
+            los archivos. True usa la caché compartida del usuario.
+        niveles (list|None): Orden de niveles de resolución (ver resolver_fecha_archivo).
+        patrones (list|None): Patrones de nombre para el nivel 'nombre'.
+        estadisticas (dict|None): Si se pasa, se suman en él los aciertos de cada nivel
+            ('cache', 'nombre', 'cabecera', 'mtime', 'fallidos').
+        progreso (ReporteProgreso|None): Recibe un aviso por cada archivo leído
+            (los encontrados en la caché se avisan de una vez al principio).
+        instrumentacion (Instrumentacion|None): Recibe el tiempo de cada lectura en la
+            fase 'fechas' (no con procesos: las lecturas ocurren en otro proceso).
+        
+    Returns:
+        list: Lista de datetime (o None) en el mismo orden que 'rutas'.
+    """
+    registros = [r if isinstance(r, RegistroArchivo) else None for r in rutas]
+    rutas = [r.ruta if isinstance(r, RegistroArchivo) else r for r in rutas]
+    if cache is True:
+        cache = obtener_cache_metadatos()
+    config = firma_niveles(niveles, patrones)
+    encontrados = cache.buscar(rutas, registros, config) if cache else {}
+    pendientes = [(ruta, registro) for ruta, registro in zip(rutas, registros) if ruta not in encontrados]
+    rutas_pendientes = [ruta for ruta, _ in pendientes]
+    mtimes_pendientes = [registro.mtime if registro else None for _, registro in pendientes]
+    resolver = partial(_fecha_archivo_o_none, niveles=niveles, patrones=patrones)
+    if instrumentacion is not None and not usar_procesos:
+        resolver = partial(_fecha_cronometrada, instrumentacion, resolver)
+
+    if progreso is not None:
+        for ruta in encontrados:
+            progreso.archivo_hecho(ruta)
+
+    workers = resolver_workers(max_workers)
+    if workers == 1 or len(pendientes) <= 1:
+        resultados = map(resolver, rutas_pendientes, mtimes_pendientes)
+        leidas = _con_progreso(resultados, rutas_pendientes, progreso)
+    else:
+        if usar_procesos:
+            from concurrent.futures import ProcessPoolExecutor as executor_class
+        else:
+            executor_class = ThreadPoolExecutor
+        # Con procesos conviene agrupar las tareas para amortizar la serialización
+        chunksize = max(1, len(pendientes) // (workers * 4)) if usar_procesos else 1
+        with executor_class(max_workers=workers) as executor:
+            # executor.map devuelve los resultados en el orden de entrada
+            resultados = executor.map(resolver, rutas_pendientes, mtimes_pendientes, chunksize=chunksize)
+            leidas = _con_progreso(resultados, rutas_pendientes, progreso)
+
+    if estadisticas is not None:
+        estadisticas["cache"] = estadisticas.get("cache", 0) + len(encontrados)
+        for _, nivel in leidas:
+            clave = nivel or "fallidos"
+            estadisticas[clave] = estadisticas.get(clave, 0) + 1
+
+    fechas = [fecha for fecha, _ in leidas]
+    if cache:
+        cache.guardar([(ruta, fecha, registro) for (ruta, registro), fecha in zip(pendientes, fechas)], config)
+    encontrados.update(zip(rutas_pendientes, fechas))
+    return [encontrados[ruta] for ruta in rutas]
+
+def _fecha_cronometrada(instrumentacion, resolver, ruta, mtime):
+    """Llama a 'resolver' anotando en 'instrumentacion' cuánto tardó y qué nivel dio la fecha."""
+    inicio = time.perf_counter()
+    resultado = resolver(ruta, mtime)
+    instrumentacion.archivo("fechas", ruta, inicio, time.perf_counter(), resultado[1] or "fallido")
+    return resultado
+
+def _con_progreso(resultados, rutas, progreso):
+    """Consume 'resultados' en una lista avisando a 'progreso' de cada ruta terminada."""
+    if progreso is None:
+        return list(resultados)
+    leidas = []
+    for ruta, resultado in zip(rutas, resultados):
+        leidas.append(resultado)
+        progreso.archivo_hecho(ruta)
+        if progreso.cancelado:
+            # Cerrar el iterador de executor.map cancela las lecturas que aún no empezaron
+            if hasattr(resultados, "close"):
+                resultados.close()
+            progreso.comprobar_cancelacion()
+    return leidas
+
+def resumen_niveles(estadisticas):
+    """
+    Prepara las estadísticas de niveles para proyecto_info.json.
     
-    # Si no se puede extraer EXIF, usar fecha de modificación del archivo
-    return datetime.fromtimestamp(os.path.getmtime(ruta_archivo))
+    Args:
+        estadisticas (dict): Aciertos por nivel rellenados por obtener_fechas_archivos.
+        
+    Returns:
+        dict: Aciertos por nivel y número de archivos que no hubo que abrir.
+    """
+    resumen = {nivel: estadisticas.get(nivel, 0) for nivel in ("cache", "nombre", "cabecera", "mtime", "fallidos")}
+    # Los archivos resueltos por caché o por nombre nunca se abrieron
+    resumen["aperturas_evitadas"] = resumen["cache"] + resumen["nombre"]
+    return resumen
 
-def analizar_origen_por_fecha(origen):
+def analizar_origen_por_fecha(origen, max_workers=None, usar_procesos=False, cache=None,
+                              niveles=None, patrones=None, estadisticas=None, tamanos=None, progreso=None,
+                              instrumentacion=None, mtimes_ns=None):
     """
     Analiza la carpeta de origen para detectar archivos y sus fechas.
     
     Args:
         origen (str): La ruta a la carpeta de origen.
+        max_workers (int|str|None): Workers para leer los metadatos o perfil ('ssd', 'hdd', 'nas').
+        usar_procesos (bool): Si es True lee los metadatos con un pool de procesos.
+        cache (CacheMetadatos|bool|None): Caché de metadatos (True = caché del usuario).
+        niveles (list|None): Orden de niveles de resolución de fechas.
+        patrones (list|None): Patrones de nombre para el nivel 'nombre'.
+        estadisticas (dict|None): Diccionario donde sumar los aciertos de cada nivel.
+        tamanos (dict|None): Si se pasa, se guarda en él el tamaño en bytes de cada archivo.
+        progreso (ReporteProgreso|None): Recibe las fases 'analisis' y 'fechas' y un
+            aviso por cada archivo leído.
+        instrumentacion (Instrumentacion|None): Recibe el tiempo de lectura de cada archivo.
+        mtimes_ns (dict|None): Si se pasa, se guarda en él la fecha de modificación
+            (st_mtime_ns) de cada archivo, ya conocida por el escáner.
         
     Returns:
         dict: Un diccionario con el análisis de archivos por fecha.
@@ -75,19 +1202,24 @@ def analizar_origen_por_fecha(origen):
     archivos_por_fecha = {}
     total_archivos = 0
     
-    for archivo in os.listdir(origen):
-        ruta_completa = os.path.join(origen, archivo)
-        if not os.path.isfile(ruta_completa):
+    if progreso is not None:
+        progreso.fase("analisis")
+    registros = escanear_carpeta(origen, IMG_JPG_EXT + IMG_RAW_EXT + VIDEO_EXT)
+    
+    # Leer los metadatos en paralelo, manteniendo el orden del listado
+    if progreso is not None:
+        progreso.fase("fechas", len(registros))
+    fechas = obtener_fechas_archivos(registros, max_workers, usar_procesos, cache, niveles, patrones,
+                                     estadisticas, progreso, instrumentacion)
+    for registro, fecha in zip(registros, fechas):
+        if fecha is None:
             continue
-        
-        ext = os.path.splitext(archivo)[1].lower()
-        if ext in IMG_JPG_EXT + IMG_RAW_EXT + VIDEO_EXT:
-            try:
-                fecha = obtener_fecha_archivo(ruta_completa)
-                archivos_por_fecha[archivo] = fecha
-                total_archivos += 1
-            except:
-                continue
+        archivos_por_fecha[registro.nombre] = fecha
+        if tamanos is not None:
+            tamanos[registro.nombre] = registro.tamano
+        if mtimes_ns is not None:
+            mtimes_ns[registro.nombre] = registro.mtime_ns
+        total_archivos += 1
     
     return archivos_por_fecha, total_archivos
 
@@ -126,7 +1258,46 @@ def crear_estructura_por_fecha(destino, archivos_por_fecha, nivel_organizacion):
     
     return estructura
 
-def analizar_origen(origen):
+def clasificar_extension(ext):
+    """
+    Devuelve el tipo de archivo ('JPG', 'RAW' o 'VIDEO') según su extensión.
+    
+    Args:
+        ext (str): Extensión en minúscula, con el punto.
+        
+    Returns:
+        str|None: El tipo o None si la extensión no es multimedia.
+    """
+    if ext in IMG_JPG_EXT:
+        return "JPG"
+    elif ext in IMG_RAW_EXT:
+        return "RAW"
+    elif ext in VIDEO_EXT:
+        return "VIDEO"
+    return None
+
+def determinar_tipo_proyecto(counts):
+    """
+    Determina el tipo de proyecto a partir del recuento de archivos por tipo.
+    
+    Args:
+        counts (dict): Recuento {'JPG': n, 'RAW': n, 'VIDEO': n}.
+        
+    Returns:
+        str: 'Mixto', 'Fotografía', 'Video' o 'vacio'.
+    """
+    has_images = counts["JPG"] > 0 or counts["RAW"] > 0
+    has_videos = counts["VIDEO"] > 0
+
+    if has_images and has_videos:
+        return "Mixto"
+    elif has_images:
+        return "Fotografía"
+    elif has_videos:
+        return "Video"
+    return "vacio"
+
+def analizar_origen(origen, recursivo=False, profundidad_max=None, incluir=None, excluir=None):
     """
     Analiza la carpeta de origen para detectar tipos y cantidad de archivos.
     
@@ -135,45 +1306,59 @@ def analizar_origen(origen):
     
     Args:
         origen (str): La ruta a la carpeta de origen.
+        recursivo (bool): Si es True también analiza las subcarpetas y las listas
+            de archivos contienen rutas relativas a 'origen'.
+        profundidad_max (int|None): Niveles de subcarpetas a recorrer en modo recursivo.
+        incluir (list|None): Patrones glob de archivos a incluir en modo recursivo.
+        excluir (list|None): Patrones glob de archivos o carpetas a excluir en modo recursivo.
         
     Returns:
-        dict: Un diccionario con el análisis ('tipo_proyecto', 'counts', 'files').
+        dict: Un diccionario con el análisis ('tipo_proyecto', 'counts', 'files' y
+            'tamanos', el tamaño en bytes de cada archivo de 'files').
     """
     analisis = {
         "tipo_proyecto": "vacio",
         "counts": {"JPG": 0, "RAW": 0, "VIDEO": 0},
-        "files": {"JPG": [], "RAW": [], "VIDEO": []}
+        "files": {"JPG": [], "RAW": [], "VIDEO": []},
+        "tamanos": {}
     }
     
-    for archivo in os.listdir(origen):
-        ruta_completa = os.path.join(origen, archivo)
-        if not os.path.isfile(ruta_completa):
-            continue  # Ignora subcarpetas, solo procesa archivos
-        
-        ext = os.path.splitext(archivo)[1].lower()
-        if ext in IMG_JPG_EXT:
-            analisis["counts"]["JPG"] += 1
-            analisis["files"]["JPG"].append(archivo)
-        elif ext in IMG_RAW_EXT:
-            analisis["counts"]["RAW"] += 1
-            analisis["files"]["RAW"].append(archivo)
-        elif ext in VIDEO_EXT:
-            analisis["counts"]["VIDEO"] += 1
-            analisis["files"]["VIDEO"].append(archivo)
-
-    # Determina el tipo de proyecto basado en los archivos encontrados
-    has_images = analisis["counts"]["JPG"] > 0 or analisis["counts"]["RAW"] > 0
-    has_videos = analisis["counts"]["VIDEO"] > 0
+    if recursivo:
+        registros = iterar_archivos(origen, profundidad_max, incluir, excluir)
+    else:
+        registros = escanear_carpeta(origen)
+    
+    for registro in registros:
+        tipo = clasificar_extension(registro.ext)
+        if tipo:
+            analisis["counts"][tipo] += 1
+            analisis["files"][tipo].append(registro.relativa)
+            analisis["tamanos"][registro.relativa] = registro.tamano
 
-    if has_images and has_videos:
-        analisis["tipo_proyecto"] = "Mixto"
-    elif has_images:
-        analisis["tipo_proyecto"] = "Fotografía"
-    elif has_videos:
-        analisis["tipo_proyecto"] = "Video"
+    # Determina el tipo de proyecto basado en los archivos encontrados
+    analisis["tipo_proyecto"] = determinar_tipo_proyecto(analisis["counts"])
         
     return analisis
 
+def rutas_estructura(destino):
+    """
+    Devuelve las rutas de la estructura por tipo dentro del destino.
+    
+    Args:
+        destino (str): Ruta a la carpeta de destino principal.
+        
+    Returns:
+        dict: Diccionario que mapea 'jpg', 'raw' y 'videos' a su ruta.
+    """
+    return {
+        "jpg": os.path.join(destino, "img", "jpg"),
+        "raw": os.path.join(destino, "img", "raw"),
+        "videos": os.path.join(destino, "videos")
+    }
+
+# Clave de rutas_estructura() que corresponde a cada tipo de archivo.
+CARPETA_POR_TIPO = {"JPG": "jpg", "RAW": "raw", "VIDEO": "videos"}
+
 def crear_estructura(destino, analisis, crear_todas):
     """
     Crea la estructura de carpetas en el destino.
@@ -192,11 +1377,7 @@ def crear_estructura(destino, analisis, crear_todas):
     rutas_a_crear = []
     rutas_creadas = []
     
-    rutas_posibles = {
-        "jpg": os.path.join(destino, "img", "jpg"),
-        "raw": os.path.join(destino, "img", "raw"),
-        "videos": os.path.join(destino, "videos")
-    }
+    rutas_posibles = rutas_estructura(destino)
 
     if crear_todas:
         rutas_a_crear.extend(rutas_posibles.values())
@@ -241,111 +1422,1907 @@ def generar_log(destino, log):
         for linea in log:
             f.write(f"{linea}\n")
 
-def generar_json_info(destino, origen, analisis):
+def generar_json_info(destino, origen, analisis, transferencia=None, duplicados=None, instrumentacion=None):
+    """
+    Genera un archivo proyecto_info.json con metadatos del proyecto.
+    
+    Args:
+        destino (str): Ruta a la carpeta de destino.
+        origen (str): Ruta a la carpeta de origen.
+        analisis (dict): El diccionario resultado de analizar_origen().
+        transferencia (dict|None): Resumen de MotorTransferencia.resumen().
+        duplicados (dict|None): Modo y contadores de la búsqueda de duplicados.
+        instrumentacion (dict|None): Medidas de Instrumentacion.resumen().
+    """
+    info = {
+        "tipo_proyecto": analisis["tipo_proyecto"],
+        "fecha_creacion": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "rutas": {
+            "origen": origen,
+            "destino": destino
+        },
+        "cantidad_archivos": analisis["counts"]
+    }
+    if transferencia is not None:
+        info["transferencia"] = transferencia
+    if duplicados is not None:
+        info["duplicados"] = duplicados
+    if instrumentacion is not None:
+        info["instrumentacion"] = instrumentacion
+    ruta = os.path.join(destino, "proyecto_info.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        # Escribe el JSON con indentación para que sea legible por humanos
+        json.dump(info, f, indent=4, ensure_ascii=False)
+
+# --- Copia Acelerada por el Kernel ---
+
+# Errores que indican que un mecanismo de copia no está disponible para este par de
+# archivos (otro sistema de archivos, sin soporte, etc.) y hay que probar el siguiente.
+_ERRNOS_SIN_SOPORTE = {
+    getattr(errno, nombre) for nombre in
+    ("EXDEV", "EOPNOTSUPP", "ENOTSUP", "ENOTTY", "EINVAL", "ENOSYS", "EBADF", "ETXTBSY", "EPERM", "ENODEV")
+    if hasattr(errno, nombre)
+}
+
+# FICLONE = _IOW(0x94, 9, int): clona todos los bloques de un archivo (btrfs, XFS, bcachefs...)
+_FICLONE = 0x40049409
+_clonefile_macos = None
+
+def _clonar_macos(origen, destino):
+    """Intenta clonefile() de APFS. Devuelve True si lo consiguió."""
+    global _clonefile_macos
+    if _clonefile_macos is None:
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            _clonefile_macos = libc.clonefile
+            _clonefile_macos.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        except (OSError, AttributeError):
+            _clonefile_macos = False
+    if not _clonefile_macos:
+        return False
+    if os.path.lexists(destino):
+        os.remove(destino)  # clonefile exige que el destino no exista
+    return _clonefile_macos(os.fsencode(origen), os.fsencode(destino), 0) == 0
+
+def _reiniciar_destino(fd_origen, fd_destino):
+    """Deja el destino vacío y ambos descriptores al principio para probar otro mecanismo."""
+    os.ftruncate(fd_destino, 0)
+    os.lseek(fd_destino, 0, os.SEEK_SET)
+    os.lseek(fd_origen, 0, os.SEEK_SET)
+
+def _copiar_contenido(fd_origen, fd_destino):
+    """
+    Copia el contenido entre dos descriptores con el mecanismo más rápido disponible.
+    
+    Las vías rápidas solo se dan por buenas si copiaron tantos bytes como tiene el
+    origen: algunos sistemas (FUSE, overlay, núcleos antiguos entre sistemas de
+    archivos) devuelven 0 en copy_file_range sin copiar nada. Si no, se deja el
+    destino vacío y se prueba la siguiente, como hace shutil.
+    
+    Returns:
+        str: 'reflink', 'copy_file_range', 'sendfile' o 'bucle'.
+    """
+    tamano = os.fstat(fd_origen).st_size
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+            fcntl.ioctl(fd_destino, _FICLONE, fd_origen)
+            if os.fstat(fd_destino).st_size == tamano:
+                return "reflink"
+            _reiniciar_destino(fd_origen, fd_destino)
+        except (ImportError, OSError) as e:
+            if isinstance(e, OSError) and e.errno not in _ERRNOS_SIN_SOPORTE:
+                raise
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            # En btrfs/XFS copy_file_range también puede compartir bloques sin copiarlos
+            copiados = 0
+            while True:
+                enviados = os.copy_file_range(fd_origen, fd_destino, 1 << 30)
+                if not enviados:
+                    break
+                copiados += enviados
+            if copiados == tamano:
+                return "copy_file_range"
+        except OSError as e:
+            if e.errno not in _ERRNOS_SIN_SOPORTE:
+                raise
+        _reiniciar_destino(fd_origen, fd_destino)
+
+    # En macOS sendfile solo admite sockets como destino
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        try:
+            offset = 0
+            while True:
+                enviados = os.sendfile(fd_destino, fd_origen, offset, 1 << 30)
+                if not enviados:
+                    break
+                offset += enviados
+            if offset == tamano:
+                return "sendfile"
+        except OSError as e:
+            if e.errno not in _ERRNOS_SIN_SOPORTE:
+                raise
+        _reiniciar_destino(fd_origen, fd_destino)
+
+    buffer = bytearray(BUFFER_COPIA)
+    vista = memoryview(buffer)
+    with open(fd_origen, 'rb', buffering=0, closefd=False) as f_origen:
+        while True:
+            leidos = f_origen.readinto(buffer)
+            if not leidos:
+                break
+            escritos = 0
+            while escritos < leidos:
+                escritos += os.write(fd_destino, vista[escritos:leidos])
+    return "bucle"
+
+def copiar_archivo_rapido(origen, destino):
+    """
+    Copia un archivo con sus metadatos (como shutil.copy2) usando la vía más rápida del sistema.
+    
+    Se prueba, en orden: clonado de bloques (reflink en btrfs/XFS, clonefile en
+    APFS), os.copy_file_range, os.sendfile y un bucle con un búfer grande. Un
+    clonado es casi instantáneo y no ocupa espacio extra hasta que se modifique
+    alguna de las dos copias.
+    
+    Args:
+        origen (str): Ruta del archivo de origen.
+        destino (str): Ruta del archivo de destino (se sobrescribe si existe).
+        
+    Returns:
+        str: El mecanismo usado: 'reflink', 'copy_file_range', 'sendfile' o 'bucle'.
+    """
+    if sys.platform == "darwin" and _clonar_macos(origen, destino):
+        mecanismo = "reflink"
+    else:
+        fd_origen = os.open(origen, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            fd_destino = os.open(destino, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+            try:
+                mecanismo = _copiar_contenido(fd_origen, fd_destino)
+            finally:
+                os.close(fd_destino)
+        finally:
+            os.close(fd_origen)
+    shutil.copystat(origen, destino)
+    return mecanismo
+
+# --- Progreso ---
+
+class OperacionCancelada(Exception):
+    """Se lanza entre dos archivos cuando se ha pedido cancelar una operación."""
+
+class ReporteProgreso:
+    """
+    Envía eventos de progreso a una función, agrupando los eventos por archivo.
+    
+    Cada evento es un diccionario con:
+        - 'tipo': 'fase' (empieza una fase), 'progreso' (avance dentro de la fase)
+          o 'fin' (terminó todo el proceso).
+        - 'fase': nombre de la fase ('analisis', 'fechas', 'estructura',
+          'transferencia', 'reportes').
+        - 'archivos_hechos', 'archivos_totales', 'bytes_hechos', 'bytes_totales':
+          avance de la fase. Los totales son None si no se conocen de antemano
+          (p. ej. al recorrer el origen como un flujo).
+        - 'archivos_por_segundo', 'bytes_por_segundo', 'segundos': velocidad media
+          y tiempo desde el inicio de la fase.
+        - 'archivo': último archivo terminado (o None).
+    
+    Los eventos de archivo se emiten como mucho cada 'intervalo' segundos, más el
+    último de cada fase, así que el coste por archivo es un contador y una lectura
+    del reloj. La función puede llamarse desde los hilos de copia: una interfaz
+    gráfica debe pasar el evento a su hilo principal (p. ej. con una señal de Qt).
+    
+    También sirve para cancelar: tras llamar a cancelar() (desde cualquier hilo), la
+    operación lanza OperacionCancelada antes de empezar el siguiente archivo. Los
+    archivos ya terminados se quedan en su destino y nunca queda uno a medias.
+    """
+
+    def __init__(self, funcion, intervalo=INTERVALO_PROGRESO):
+        """
+        Args:
+            funcion (callable): Función que recibe cada evento (un dict).
+            intervalo (float): Segundos mínimos entre dos eventos de progreso.
+        """
+        self.funcion = funcion
+        self.intervalo = intervalo
+        self._cancelar = threading.Event()
+        self._lock = threading.Lock()
+        self._fase = None
+        self._observadores = []
+        self._iniciar_fase(None, None, None)
+
+    def _iniciar_fase(self, nombre, archivos_totales, bytes_totales):
+        self._fase = nombre
+        self._archivos_totales = archivos_totales
+        self._bytes_totales = bytes_totales
+        self._archivos = 0
+        self._bytes = 0
+        self._ultimo_archivo = None
+        self._inicio = time.perf_counter()
+        self._ultimo_evento = self._inicio
+        self._pendiente = False
+
+    def _evento(self, tipo, ahora):
+        segundos = ahora - self._inicio
+        return {
+            "tipo": tipo,
+            "fase": self._fase,
+            "archivos_hechos": self._archivos,
+            "archivos_totales": self._archivos_totales,
+            "bytes_hechos": self._bytes,
+            "bytes_totales": self._bytes_totales,
+            "archivos_por_segundo": round(self._archivos / segundos, 2) if segundos else None,
+            "bytes_por_segundo": round(self._bytes / segundos) if segundos else None,
+            "segundos": round(segundos, 4),
+            "archivo": self._ultimo_archivo
+        }
+
+    def observar(self, funcion):
+        """Añade otra función que recibe los mismos eventos (p. ej. una Instrumentacion)."""
+        self._observadores.append(funcion)
+
+    def _emitir(self, evento):
+        self.funcion(evento)
+        for funcion in self._observadores:
+            funcion(evento)
+
+    def _vaciar(self):
+        """Emite el progreso acumulado que aún no se haya enviado."""
+        with self._lock:
+            if not self._pendiente:
+                return
+            self._pendiente = False
+            evento = self._evento("progreso", time.perf_counter())
+        self._emitir(evento)
+
+    def fase(self, nombre, archivos_totales=None, bytes_totales=None):
+        """
+        Cierra la fase anterior y empieza una nueva.
+        
+        Args:
+            nombre (str): Nombre de la fase.
+            archivos_totales (int|None): Archivos que se procesarán en la fase.
+            bytes_totales (int|None): Bytes que se procesarán en la fase.
+        """
+        self._vaciar()
+        with self._lock:
+            self._iniciar_fase(nombre, archivos_totales, bytes_totales)
+            evento = self._evento("fase", self._inicio)
+        self._emitir(evento)
+
+    def archivo_hecho(self, ruta, tamano=0):
+        """
+        Registra un archivo terminado en la fase actual (se puede llamar desde varios hilos).
+        
+        Args:
+            ruta (str): Ruta del archivo terminado.
+            tamano (int): Bytes procesados.
+        """
+        with self._lock:
+            self._archivos += 1
+            self._bytes += tamano
+            self._ultimo_archivo = ruta
+            ahora = time.perf_counter()
+            if ahora - self._ultimo_evento < self.intervalo and self._archivos != self._archivos_totales:
+                self._pendiente = True
+                return
+            self._ultimo_evento = ahora
+            self._pendiente = False
+            evento = self._evento("progreso", ahora)
+        self._emitir(evento)
+
+    def cancelar(self):
+        """Pide que la operación se detenga antes del siguiente archivo."""
+        self._cancelar.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelar.is_set()
+
+    def comprobar_cancelacion(self):
+        """Lanza OperacionCancelada si se ha pedido cancelar."""
+        if self._cancelar.is_set():
+            raise OperacionCancelada("Operación cancelada")
+
+    def terminar(self):
+        """Emite el progreso pendiente y el evento 'fin'."""
+        self._vaciar()
+        with self._lock:
+            evento = self._evento("fin", time.perf_counter())
+        self._emitir(evento)
+
+def _reporte_progreso(progreso):
+    """Acepta una función o un ReporteProgreso y devuelve un ReporteProgreso (o None)."""
+    if progreso is None or isinstance(progreso, ReporteProgreso):
+        return progreso
+    return ReporteProgreso(progreso)
+
+# --- Instrumentación ---
+
+def contadores_io():
+    """
+    Lee los contadores de E/S que el sistema operativo lleva para este proceso.
+    
+    En Linux son los de /proc/self/io: llamadas read/write al kernel ('lecturas',
+    'escrituras'), bytes que pasaron por ellas y bytes que llegaron de verdad al
+    disco (lo que vino de la caché de páginas no cuenta). En Windows son los de
+    GetProcessIoCounters, que además cuentan las otras operaciones (abrir, stat,
+    renombrar...). Si hay getrusage se añaden los fallos de página mayores y los
+    cambios de contexto voluntarios, que suben cuando los hilos esperan al disco.
+    
+    Returns:
+        dict: Contadores acumulados desde que empezó el proceso ({} si no hay ninguno).
+    """
+    contadores = {}
+    if sys.platform.startswith("linux"):
+        nombres = {"syscr": "lecturas", "syscw": "escrituras", "rchar": "bytes_leidos",
+                   "wchar": "bytes_escritos", "read_bytes": "bytes_leidos_disco",
+                   "write_bytes": "bytes_escritos_disco"}
+        try:
+            with open("/proc/self/io", encoding="ascii") as f:
+                for linea in f:
+                    clave, _, valor = linea.partition(":")
+                    if clave in nombres:
+                        contadores[nombres[clave]] = int(valor)
+        except (OSError, ValueError):
+            pass
+    elif sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(nombre, ctypes.c_ulonglong) for nombre in (
+                "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+                "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+        io = IO_COUNTERS()
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if kernel32.GetProcessIoCounters(kernel32.GetCurrentProcess(), ctypes.byref(io)):
+            contadores.update({
+                "lecturas": io.ReadOperationCount,
+                "escrituras": io.WriteOperationCount,
+                "otras_operaciones": io.OtherOperationCount,
+                "bytes_leidos": io.ReadTransferCount,
+                "bytes_escritos": io.WriteTransferCount
+            })
+    try:
+        import resource
+    except ImportError:
+        return contadores
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    contadores["fallos_pagina_mayores"] = uso.ru_majflt
+    contadores["esperas_voluntarias"] = uso.ru_nvcsw
+    if not sys.platform.startswith("linux"):
+        contadores["bloques_leidos"] = uso.ru_inblock
+        contadores["bloques_escritos"] = uso.ru_oublock
+    return contadores
+
+class Instrumentacion:
+    """
+    Mide una ejecución de procesar_proyecto o procesar_proyecto_por_fecha fase a fase.
+    
+    Se engancha al ReporteProgreso de la ejecución (ReporteProgreso.observar) y, por
+    cada fase ('analisis', 'fechas', 'estructura', 'transferencia', 'reportes'...),
+    guarda el tiempo de reloj y de CPU, los archivos y bytes procesados y cuánto
+    subieron los contadores_io. Una fase 'fechas' con mucha más espera que CPU y
+    muchos bytes leídos del disco apunta al disco; con la CPU casi igual al reloj,
+    al análisis de los metadatos.
+    
+    Las operaciones por archivo (leer su fecha, renombrarlo o copiarlo) se anotan con
+    archivo(): se conservan las 'archivos_lentos' más lentas y, si se pide 'traza', se
+    guardan todas para escribir al terminar un JSON en el formato de Chrome trace, que
+    se abre en https://ui.perfetto.dev o en chrome://tracing con un carril por hilo.
+    
+    Cada Instrumentacion sirve para una sola ejecución.
+    """
+
+    def __init__(self, archivos_lentos=ARCHIVOS_LENTOS, traza=None):
+        """
+        Args:
+            archivos_lentos (int): Cuántos de los archivos más lentos se conservan.
+            traza (str|None): Ruta donde escribir la traza al terminar (None = sin traza).
+        """
+        self.archivos_lentos = archivos_lentos
+        self.traza = traza
+        self.contadores = {"errores": 0}
+        self._lock = threading.Lock()
+        self._origen = time.perf_counter()
+        self._fases = []
+        self._actual = None
+        self._lentos = []  # montículo de (segundos, orden, fase, ruta, detalle)
+        self._orden = itertools.count()
+        self._eventos = []
+        self._descartados = 0
+        self._hilos = {}
+
+    def __call__(self, evento):
+        """Recibe los eventos del ReporteProgreso."""
+        if evento["tipo"] == "progreso":
+            if self._actual is not None:
+                self._actual["archivos"] = evento["archivos_hechos"]
+                self._actual["bytes"] = evento["bytes_hechos"]
+            return
+        self._cerrar_fase()
+        if evento["tipo"] == "fase":
+            self._actual = {"fase": evento["fase"], "inicio": time.perf_counter(), "cpu": time.process_time(),
+                            "io": contadores_io(), "archivos": 0, "bytes": 0}
+        elif self.traza:
+            self.exportar_traza(self.traza)
+
+    def _medir_fase(self, fase):
+        """Devuelve las medidas de una fase hasta ahora."""
+        segundos = time.perf_counter() - fase["inicio"]
+        io = contadores_io()
+        return {
+            "fase": fase["fase"],
+            "inicio_s": round(fase["inicio"] - self._origen, 6),
+            "segundos": round(segundos, 6),
+            "cpu_s": round(time.process_time() - fase["cpu"], 6),
+            "archivos": fase["archivos"],
+            "bytes": fase["bytes"],
+            "archivos_por_segundo": round(fase["archivos"] / segundos, 2) if segundos else None,
+            "io": {clave: valor - fase["io"][clave] for clave, valor in io.items() if clave in fase["io"]}
+        }
+
+    def _cerrar_fase(self):
+        if self._actual is not None:
+            self._fases.append(self._medir_fase(self._actual))
+            self._actual = None
+
+    def archivo(self, fase, ruta, inicio, fin, detalle=None):
+        """
+        Anota una operación sobre un archivo (se puede llamar desde varios hilos).
+        
+        Args:
+            fase (str): Fase a la que pertenece ('fechas', 'transferencia'...).
+            ruta (str): Archivo procesado.
+            inicio (float): time.perf_counter() al empezar.
+            fin (float): time.perf_counter() al terminar.
+            detalle (str|None): Qué se hizo (nivel que dio la fecha, camino de la transferencia...).
+        """
+        segundos = fin - inicio
+        with self._lock:
+            elemento = (segundos, next(self._orden), fase, ruta, detalle)
+            if len(self._lentos) < self.archivos_lentos:
+                heapq.heappush(self._lentos, elemento)
+            elif self._lentos and segundos > self._lentos[0][0]:
+                heapq.heapreplace(self._lentos, elemento)
+            if self.traza:
+                if len(self._eventos) < MAX_EVENTOS_TRAZA:
+                    self._eventos.append((fase, ruta, inicio, fin, detalle, threading.get_ident()))
+                else:
+                    self._descartados += 1
+
+    def contar(self, clave, cantidad=1):
+        """Suma 'cantidad' al contador 'clave' (se puede llamar desde varios hilos)."""
+        with self._lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + cantidad
+
+    def resumen(self):
+        """
+        Devuelve las medidas para proyecto_info.json.
+        
+        La fase en curso (normalmente 'reportes', que es cuando se escribe el JSON) se
+        incluye con lo medido hasta ahora y 'en_curso': True.
+        
+        Returns:
+            dict: 'fases' (reloj, CPU, archivos, bytes y contadores de E/S de cada una),
+                'segundos' en total, 'contadores', 'io_total', 'archivos_lentos' (del más
+                lento al más rápido) y, si hay traza, su ruta.
+        """
+        fases = list(self._fases)
+        if self._actual is not None:
+            fases.append({**self._medir_fase(self._actual), "en_curso": True})
+        io_total = {}
+        for fase in fases:
+            for clave, valor in fase["io"].items():
+                io_total[clave] = io_total.get(clave, 0) + valor
+        with self._lock:
+            lentos = sorted(self._lentos, reverse=True)
+            contadores = dict(self.contadores)
+        resumen = {
+            "segundos": round(time.perf_counter() - self._origen, 6),
+            "fases": fases,
+            "contadores": contadores,
+            "io_total": io_total,
+            "archivos_lentos": [{"fase": fase, "archivo": ruta, "segundos": round(segundos, 6), "detalle": detalle}
+                                for segundos, _, fase, ruta, detalle in lentos]
+        }
+        if self.traza:
+            resumen["traza"] = self.traza
+        return resumen
+
+    def _hilo(self, ident):
+        """Numera los hilos por orden de aparición (el carril 0 es el de las fases)."""
+        if ident not in self._hilos:
+            self._hilos[ident] = len(self._hilos) + 1
+        return self._hilos[ident]
+
+    def exportar_traza(self, ruta):
+        """
+        Escribe las fases y las operaciones por archivo en formato Chrome trace (JSON).
+        
+        Args:
+            ruta (str): Archivo de salida.
+        """
+        def micros(instante):
+            return round((instante - self._origen) * 1e6, 1)
+
+        eventos = [
+            {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "Flowbooster"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "Fases"}}
+        ]
+        for fase in self._fases:
+            args = {clave: fase[clave] for clave in ("archivos", "bytes", "cpu_s")}
+            args.update(fase["io"])
+            eventos.append({"name": fase["fase"], "cat": "fase", "ph": "X", "pid": 1, "tid": 0,
+                            "ts": round(fase["inicio_s"] * 1e6, 1), "dur": round(fase["segundos"] * 1e6, 1),
+                            "args": args})
+        with self._lock:
+            operaciones = list(self._eventos)
+            descartados = self._descartados
+        for fase, ruta_archivo, inicio, fin, detalle, ident in operaciones:
+            args = {"ruta": ruta_archivo}
+            if detalle is not None:
+                args["detalle"] = detalle
+            eventos.append({"name": os.path.basename(ruta_archivo), "cat": fase, "ph": "X", "pid": 1,
+                            "tid": self._hilo(ident), "ts": micros(inicio), "dur": round((fin - inicio) * 1e6, 1),
+                            "args": args})
+        for ident, numero in self._hilos.items():
+            eventos.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": numero,
+                            "args": {"name": f"Hilo {numero}"}})
+        traza = {"traceEvents": eventos, "displayTimeUnit": "ms",
+                 "otherData": {"eventos_descartados": descartados}}
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(traza, f, ensure_ascii=False)
+
+def _instrumentar(progreso, instrumentacion):
+    """
+    Prepara la instrumentación de una ejecución: acepta una Instrumentacion, True
+    (una con las opciones por defecto) o None, y la engancha al ReporteProgreso,
+    creando uno sin función si no había.
+    
+    Returns:
+        tuple: (progreso, instrumentacion).
+    """
+    if instrumentacion is True:
+        instrumentacion = Instrumentacion()
+    if not instrumentacion:
+        return progreso, None
+    if progreso is None:
+        progreso = ReporteProgreso(lambda evento: None)
+    progreso.observar(instrumentacion)
+    return progreso, instrumentacion
+
+# --- Sincronización Incremental ---
+
+def mismos_metadatos(tamano_a, mtime_ns_a, tamano_b, mtime_ns_b):
+    """
+    Indica si dos archivos tienen el mismo tamaño y la misma fecha de modificación
+    (con TOLERANCIA_MTIME_NS de margen), que es lo que conserva una copia.
+    """
+    return tamano_a == tamano_b and abs(mtime_ns_a - mtime_ns_b) <= TOLERANCIA_MTIME_NS
+
+def hash_archivo(ruta, algoritmo="blake2b"):
+    """
+    Calcula el hash del contenido completo de un archivo.
+    
+    Args:
+        ruta (str): Ruta del archivo.
+        algoritmo (str): Algoritmo de hashlib.
+        
+    Returns:
+        str: El hash en hexadecimal.
+    """
+    h = hashlib.new(algoritmo)
+    buffer = bytearray(BLOQUE_HASH)
+    vista = memoryview(buffer)
+    with open(ruta, "rb", buffering=0) as f:
+        while True:
+            leidos = f.readinto(buffer)
+            if not leidos:
+                break
+            h.update(vista[:leidos])
+    return h.hexdigest()
+
+def indexar_destino(carpeta):
+    """
+    Construye un índice de los archivos que ya hay en una carpeta de destino.
+    
+    Se recorre el árbol una sola vez con el escáner (un os.scandir por carpeta,
+    sin stat extra), para después decidir con una búsqueda en memoria si cada
+    archivo que llega ya está copiado.
+    
+    Args:
+        carpeta (str): Carpeta de destino (puede no existir todavía).
+        
+    Returns:
+        dict: Ruta normalizada -> (tamaño, mtime_ns).
+    """
+    if not os.path.isdir(carpeta):
+        return {}
+    return {os.path.normpath(r.ruta): (r.tamano, r.mtime_ns) for r in iterar_archivos(carpeta)}
+
+# --- Búsqueda de Duplicados ---
+
+def hash_parcial(ruta, tamano, bloque=BLOQUE_HASH_PARCIAL):
+    """
+    Calcula un hash barato con el primer y el último bloque de un archivo.
+    
+    Si el archivo cabe en dos bloques se lee entero, así que en ese caso el hash
+    parcial ya identifica el contenido completo.
+    """
+    h = hashlib.blake2b()
+    with open(ruta, "rb") as f:
+        if tamano <= 2 * bloque:
+            h.update(f.read())
+        else:
+            h.update(f.read(bloque))
+            f.seek(-bloque, os.SEEK_END)
+            h.update(f.read(bloque))
+    return h.hexdigest()
+
+def _agrupar_por(grupos, funcion, max_workers, progreso=None):
+    """
+    Subdivide cada grupo de registros según el valor de 'funcion(registro)', calculado
+    en paralelo, y devuelve solo los subgrupos con más de un registro.
+    """
+    candidatos = [registro for grupo in grupos for registro in grupo]
+    if not candidatos:
+        return []
+    workers = resolver_workers(max_workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = executor.map(funcion, candidatos)
+        claves = _con_progreso(resultados, [r.ruta for r in candidatos], progreso)
+    subgrupos = {}
+    for registro, clave in zip(candidatos, claves):
+        if clave is not None:
+            subgrupos.setdefault((registro.tamano, clave), []).append(registro)
+    return [grupo for grupo in subgrupos.values() if len(grupo) > 1]
+
+def _clave_o_none(funcion, registro):
+    try:
+        return funcion(registro)
+    except OSError:
+        return None  # Archivo ilegible o borrado durante la búsqueda: no cuenta como duplicado
+
+def agrupar_duplicados(registros, max_workers=None, progreso=None, estadisticas=None):
+    """
+    Agrupa archivos con el mismo contenido byte a byte, aunque tengan distinto nombre.
+    
+    Se filtra por etapas para leer lo mínimo: primero por tamaño (sin leer nada),
+    después por un hash del primer y del último bloque y solo los que siguen
+    coincidiendo se leen enteros para el hash completo. Los hashes se calculan en
+    paralelo. Los archivos vacíos no se consideran duplicados.
+    
+    Args:
+        registros (iterable): RegistroArchivo a comparar (p. ej. de iterar_archivos).
+        max_workers (int|str|None): Workers para los hashes o perfil ('ssd', 'hdd', 'nas').
+        progreso (ReporteProgreso|None): Recibe las fases 'hash_parcial' y 'hash_completo'.
+        estadisticas (dict|None): Si se pasa, se guardan en él los contadores de cada etapa.
+        
+    Returns:
+        list: Grupos de duplicados; cada grupo es una lista de RegistroArchivo en el
+            orden en que llegaron.
+    """
+    por_tamano = {}
+    total = 0
+    for registro in registros:
+        total += 1
+        if registro.tamano > 0:
+            por_tamano.setdefault(registro.tamano, []).append(registro)
+    grupos = [grupo for grupo in por_tamano.values() if len(grupo) > 1]
+    candidatos_tamano = sum(len(grupo) for grupo in grupos)
+
+    if progreso is not None:
+        progreso.fase("hash_parcial", candidatos_tamano)
+    grupos = _agrupar_por(grupos, partial(_clave_o_none, lambda r: hash_parcial(r.ruta, r.tamano)),
+                          max_workers, progreso)
+
+    # Los archivos que caben en dos bloques ya se leyeron enteros en el hash parcial
+    completos = [grupo for grupo in grupos if grupo[0].tamano <= 2 * BLOQUE_HASH_PARCIAL]
+    pendientes = [grupo for grupo in grupos if grupo[0].tamano > 2 * BLOQUE_HASH_PARCIAL]
+    candidatos_completos = sum(len(grupo) for grupo in pendientes)
+    if progreso is not None:
+        progreso.fase("hash_completo", candidatos_completos)
+    completos += _agrupar_por(pendientes, partial(_clave_o_none, lambda r: hash_archivo(r.ruta)),
+                              max_workers, progreso)
+
+    if estadisticas is not None:
+        estadisticas.update({
+            "archivos": total,
+            "candidatos_por_tamano": candidatos_tamano,
+            "hashes_completos": candidatos_completos,
+            "grupos": len(completos),
+            "archivos_duplicados": sum(len(grupo) - 1 for grupo in completos),
+            "bytes_duplicados": sum(grupo[0].tamano * (len(grupo) - 1) for grupo in completos)
+        })
+    return completos
+
+def buscar_duplicados(carpetas, recursivo=True, extensiones=None, max_workers=None, progreso=None,
+                      estadisticas=None):
+    """
+    Busca archivos idénticos en una o varias carpetas.
+    
+    Args:
+        carpetas (list): Rutas de las carpetas donde buscar.
+        recursivo (bool): Si es True también busca en las subcarpetas.
+        extensiones (list|None): Extensiones en minúscula a incluir. None incluye todas.
+        max_workers (int|str|None): Workers para los hashes o perfil ('ssd', 'hdd', 'nas').
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
+        estadisticas (dict|None): Si se pasa, se guardan en él los contadores de cada etapa.
+        
+    Returns:
+        list: Grupos de rutas de archivos con el mismo contenido.
+    """
+    progreso = _reporte_progreso(progreso)
+    if progreso is not None:
+        progreso.fase("analisis")
+    registros = []
+    for carpeta in carpetas:
+        if recursivo:
+            registros.extend(iterar_archivos(carpeta, extensiones=extensiones))
+        else:
+            registros.extend(escanear_carpeta(carpeta, extensiones))
+    grupos = agrupar_duplicados(registros, max_workers, progreso, estadisticas)
+    if progreso is not None:
+        progreso.terminar()
+    return [[registro.ruta for registro in grupo] for grupo in grupos]
+
+def generar_reporte_duplicados(carpeta, grupos, estadisticas=None):
+    """
+    Genera un archivo duplicados.md con los grupos de archivos idénticos.
+    
+    Args:
+        carpeta (str): Carpeta donde guardar el reporte.
+        grupos (list): Grupos de rutas (el primero de cada grupo es el que se conserva).
+        estadisticas (dict|None): Contadores de agrupar_duplicados.
+        
+    Returns:
+        str: Ruta del reporte.
+    """
+    ruta = os.path.join(carpeta, "duplicados.md")
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("# Archivos duplicados\n\n")
+        f.write(f"🔍 Búsqueda realizada el {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        if estadisticas:
+            f.write(f"- Archivos revisados: {estadisticas['archivos']}\n")
+            f.write(f"- Grupos de duplicados: {estadisticas['grupos']}\n")
+            f.write(f"- Copias sobrantes: {estadisticas['archivos_duplicados']} "
+                    f"({estadisticas['bytes_duplicados'] / 1048576:.1f} MB)\n")
+            f.write(f"- Archivos leídos enteros: {estadisticas['hashes_completos']}\n\n")
+        for i, grupo in enumerate(grupos, 1):
+            f.write(f"## Grupo {i}\n")
+            for j, ruta_archivo in enumerate(grupo):
+                f.write(f"- `{ruta_archivo}`{' (se conserva)' if j == 0 else ''}\n")
+            f.write("\n")
+    return ruta
+
+def _mapa_duplicados(registros_origen, destino, progreso=None):
+    """
+    Busca, entre los archivos del origen y los que ya hay en el destino, los del
+    origen que repiten contenido.
+    
+    Returns:
+        tuple: (mapa, grupos, estadisticas). 'mapa' va de la ruta normalizada de cada
+            archivo sobrante del origen a la ruta del archivo que se conserva (uno del
+            destino si ya existe allí, o el primero del origen).
+    """
+    registros_destino = []
+    if os.path.isdir(destino):
+        registros_destino = list(iterar_archivos(destino, extensiones=IMG_JPG_EXT + IMG_RAW_EXT + VIDEO_EXT))
+    # Primero el destino, para que el archivo que se conserve sea el que ya está allí
+    vistos = set()
+    registros = []
+    for registro in registros_destino + list(registros_origen):
+        clave = os.path.normpath(registro.ruta)
+        if clave not in vistos:
+            vistos.add(clave)
+            registros.append(registro)
+    estadisticas = {}
+    grupos = agrupar_duplicados(registros, progreso=progreso, estadisticas=estadisticas)
+    mapa = {}
+    for grupo in grupos:
+        for registro in grupo[1:]:
+            mapa[os.path.normpath(registro.ruta)] = grupo[0].ruta
+    return mapa, [[registro.ruta for registro in grupo] for grupo in grupos], estadisticas
+
+def _enlazar_duplicado(objetivo, nueva_ruta, ruta_origen, copiar):
+    """
+    Crea 'nueva_ruta' como enlace duro a 'objetivo' (o como copia si el sistema de
+    archivos no admite enlaces) y, si se está moviendo, borra el duplicado del origen.
+    """
+    if os.path.normpath(objetivo) != os.path.normpath(nueva_ruta):
+        temporal = nueva_ruta + ".flowbooster-tmp"
+        try:
+            os.link(objetivo, temporal)
+        except OSError:
+            copiar_archivo_rapido(objetivo, temporal)
+        os.replace(temporal, nueva_ruta)
+    if not copiar:
+        os.unlink(ruta_origen)
+
+# --- Imágenes Similares ---
+
+# Coseno de la DCT-II de 32 puntos, solo para las 8 frecuencias más bajas que usa pHash
+_COSENOS_DCT = [[math.cos(math.pi * (2 * n + 1) * k / 64) for n in range(32)] for k in range(8)]
+
+def _bits_a_entero(bits):
+    valor = 0
+    for bit in bits:
+        valor = (valor << 1) | bit
+    return valor
+
+def hash_perceptual(ruta, algoritmo="dhash"):
+    """
+    Calcula un hash perceptual de 64 bits de una imagen.
+    
+    Las imágenes casi iguales (ráfagas, reexportaciones, otra calidad JPEG o
+    tamaño) dan hashes a pocos bits de distancia. En JPEG se usa el modo borrador
+    de Pillow, que decodifica directamente a 1/2, 1/4 o 1/8 de la resolución, así
+    que nunca se descomprime la imagen completa.
+    
+    Args:
+        ruta (str): Ruta de la imagen.
+        algoritmo (str): 'dhash' (gradiente horizontal, el más rápido) o 'phash'
+            (frecuencias bajas de la DCT, más tolerante a cambios de brillo y contraste).
+        
+    Returns:
+        int: Hash de 64 bits.
+        
+    Raises:
+        OSError: Si la imagen no se puede leer.
+        ValueError: Si el algoritmo no existe.
+    """
+    if algoritmo == "dhash":
+        lado_x, lado_y = 9, 8
+    elif algoritmo == "phash":
+        lado_x = lado_y = 32
+    else:
+        raise ValueError(f"Algoritmo de hash perceptual desconocido: {algoritmo}")
+    from PIL import Image, ImageOps
+    with Image.open(ruta) as imagen:
+        imagen.draft("L", (lado_x * 4, lado_y * 4))
+        # La orientación EXIF se aplica para que una foto girada al reexportar siga coincidiendo
+        imagen = ImageOps.exif_transpose(imagen).convert("L").resize((lado_x, lado_y), Image.Resampling.BOX)
+        pixeles = imagen.tobytes()
+    if algoritmo == "dhash":
+        return _bits_a_entero(
+            pixeles[y * 9 + x] > pixeles[y * 9 + x + 1] for y in range(8) for x in range(8)
+        )
+    # DCT separable: primero cada fila y luego cada columna, guardando solo 8x8 coeficientes
+    filas = [[sum(c * p for c, p in zip(cosenos, pixeles[y * 32:(y + 1) * 32])) for cosenos in _COSENOS_DCT]
+             for y in range(32)]
+    coeficientes = [sum(cosenos[y] * filas[y][u] for y in range(32)) for cosenos in _COSENOS_DCT for u in range(8)]
+    # El primer coeficiente (brillo medio) queda fuera de la mediana
+    mediana = sorted(coeficientes[1:])[31]
+    return _bits_a_entero(c > mediana for c in coeficientes)
+
+def distancia_hamming(a, b):
+    """Número de bits distintos entre dos hashes."""
+    return bin(a ^ b).count("1")
+
+class IndiceHashes:
+    """
+    Índice de hashes de 64 bits para buscar los que están a poca distancia de Hamming
+    (hashing multi-índice).
+    
+    Cada hash se parte en 'm' trozos y cada trozo se indexa en su propia tabla. Si
+    dos hashes difieren en 'd' bits o menos, por el principio del palomar al menos
+    uno de sus trozos difiere en d // m bits o menos, así que basta con consultar
+    en cada tabla los trozos vecinos del buscado y verificar solo esos candidatos en
+    lugar de comparar con todo el índice. El número de trozos se elige según la
+    cantidad de hashes y la distancia para minimizar el trabajo por consulta.
+    """
+
+    def __init__(self, valores, distancia_max):
+        """
+        Args:
+            valores (iterable): Hashes a indexar (los repetidos se indexan una vez).
+            distancia_max (int): Distancia máxima de las búsquedas.
+        """
+        self.valores = set(valores)
+        self.distancia_max = distancia_max
+        self.comparaciones = 0
+        total = max(1, len(self.valores))
+
+        def anchos(m):
+            return [64 // m + (1 if i < 64 % m else 0) for i in range(m)]
+
+        def coste(m):
+            radio = distancia_max // m
+            return sum(self._vecinos(ancho, radio) * (1 + total / 2 ** ancho) for ancho in anchos(m))
+
+        self.trozos = min(range(1, min(64, distancia_max + 1) + 1), key=coste)
+        self.radio = distancia_max // self.trozos
+        # (desplazamiento, máscara del trozo, máscaras de los vecinos, tabla trozo -> hashes)
+        self._tablas = []
+        desplazamiento = 0
+        for ancho in anchos(self.trozos):
+            mascaras = [sum(1 << bit for bit in bits)
+                        for radio in range(self.radio + 1)
+                        for bits in itertools.combinations(range(ancho), radio)]
+            tabla = {}
+            for valor in self.valores:
+                tabla.setdefault((valor >> desplazamiento) & ((1 << ancho) - 1), []).append(valor)
+            self._tablas.append((desplazamiento, (1 << ancho) - 1, mascaras, tabla))
+            desplazamiento += ancho
+
+    @staticmethod
+    def _vecinos(ancho, radio):
+        """Cantidad de trozos de 'ancho' bits a 'radio' bits o menos de uno dado."""
+        return sum(math.comb(ancho, r) for r in range(radio + 1))
+
+    def buscar(self, valor):
+        """
+        Busca los hashes indexados a 'distancia_max' bits o menos de 'valor'.
+        
+        Args:
+            valor (int): Hash de referencia.
+            
+        Returns:
+            list: Tuplas (distancia, hash), incluido el propio valor si está indexado.
+        """
+        resultados = []
+        vistos = set()
+        for desplazamiento, mascara_trozo, mascaras, tabla in self._tablas:
+            trozo = (valor >> desplazamiento) & mascara_trozo
+            for mascara in mascaras:
+                candidatos = tabla.get(trozo ^ mascara)
+                if not candidatos:
+                    continue
+                for candidato in candidatos:
+                    if candidato in vistos:
+                        continue
+                    vistos.add(candidato)
+                    distancia = distancia_hamming(valor, candidato)
+                    if distancia <= self.distancia_max:
+                        resultados.append((distancia, candidato))
+        self.comparaciones += len(vistos)
+        return resultados
+
+def _hash_o_none(algoritmo, ruta):
+    from PIL import Image
+    try:
+        return hash_perceptual(ruta, algoritmo)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None  # No es una imagen que Pillow sepa abrir o está dañada
+
+def buscar_similares(carpetas, distancia_max=DISTANCIA_SIMILARES, algoritmo="dhash", recursivo=True,
+                     max_workers=None, cache=None, progreso=None, estadisticas=None):
+    """
+    Agrupa imágenes casi iguales (ráfagas, reexportaciones, copias redimensionadas).
+    
+    Se calcula un hash perceptual por imagen (reutilizando la caché de metadatos
+    si se pasa) y los hashes se indexan con IndiceHashes, de modo que cada imagen
+    solo se compara con las pocas que comparten algún trozo de hash y no con todas.
+    Dos imágenes van al mismo grupo si están a 'distancia_max' bits o menos, también
+    a través de otras del grupo (una ráfaga larga queda en un solo grupo).
+    
+    Args:
+        carpetas (list): Rutas de las carpetas donde buscar.
+        distancia_max (int): Bits de diferencia (de 64) tolerados entre dos imágenes.
+        algoritmo (str): 'dhash' o 'phash' (ver hash_perceptual).
+        recursivo (bool): Si es True también busca en las subcarpetas.
+        max_workers (int|str|None): Workers para los hashes o perfil ('ssd', 'hdd', 'nas').
+        cache (CacheMetadatos|bool|None): Caché donde consultar y guardar los hashes (True = caché del usuario).
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
+        estadisticas (dict|None): Si se pasa, se guardan en él los contadores de la búsqueda.
+        
+    Returns:
+        list: Grupos de rutas de imágenes parecidas, ordenados por ruta.
+    """
+    progreso = _reporte_progreso(progreso)
+    if progreso is not None:
+        progreso.fase("analisis")
+    registros = []
+    for carpeta in carpetas:
+        if recursivo:
+            registros.extend(iterar_archivos(carpeta, extensiones=IMG_JPG_EXT))
+        else:
+            registros.extend(escanear_carpeta(carpeta, IMG_JPG_EXT))
+    rutas = [registro.ruta for registro in registros]
+
+    if cache is True:
+        cache = obtener_cache_metadatos()
+    hashes = cache.buscar_hashes(rutas, registros, algoritmo) if cache else {}
+    pendientes = [registro for registro in registros if registro.ruta not in hashes]
+    if progreso is not None:
+        progreso.fase("hash_perceptual", len(pendientes), sum(registro.tamano for registro in pendientes))
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=resolver_workers(max_workers)) as executor:
+            resultados = executor.map(partial(_hash_o_none, algoritmo), [r.ruta for r in pendientes])
+            calculados = _con_progreso(resultados, [r.ruta for r in pendientes], progreso)
+        hashes.update((r.ruta, valor) for r, valor in zip(pendientes, calculados) if valor is not None)
+        if cache:
+            cache.guardar_hashes([(r.ruta, valor, r) for r, valor in zip(pendientes, calculados)], algoritmo)
+
+    # Las imágenes con el mismo hash se agrupan directamente; cada hash distinto se busca una vez
+    por_hash = {}
+    for ruta in rutas:
+        if ruta in hashes:
+            por_hash.setdefault(hashes[ruta], []).append(ruta)
+    # Unión de conjuntos entre hashes cercanos
+    indice = IndiceHashes(por_hash, distancia_max)
+    padres = {valor: valor for valor in por_hash}
+
+    def raiz(valor):
+        while padres[valor] != valor:
+            padres[valor] = padres[padres[valor]]
+            valor = padres[valor]
+        return valor
+
+    if progreso is not None:
+        progreso.fase("similares", len(por_hash))
+    for valor, rutas_valor in por_hash.items():
+        for _, vecino in indice.buscar(valor):
+            a, b = raiz(valor), raiz(vecino)
+            if a != b:
+                padres[b] = a
+        if progreso is not None:
+            progreso.archivo_hecho(rutas_valor[0])
+            progreso.comprobar_cancelacion()
+
+    conjuntos = {}
+    for valor, rutas_valor in por_hash.items():
+        conjuntos.setdefault(raiz(valor), []).extend(rutas_valor)
+    grupos = sorted(sorted(grupo) for grupo in conjuntos.values() if len(grupo) > 1)
+
+    if estadisticas is not None:
+        estadisticas.update({
+            "imagenes": len(registros),
+            "hashes_en_cache": len(registros) - len(pendientes),
+            "hashes_calculados": len(pendientes),
+            "ilegibles": len(registros) - len(hashes),
+            "comparaciones": indice.comparaciones,
+            "grupos": len(grupos),
+            "imagenes_agrupadas": sum(len(grupo) for grupo in grupos)
+        })
+    if progreso is not None:
+        progreso.terminar()
+    return grupos
+
+def generar_reporte_similares(carpeta, grupos, estadisticas=None):
+    """
+    Genera un archivo similares.md con los grupos de imágenes casi iguales.
+    
+    Args:
+        carpeta (str): Carpeta donde guardar el reporte.
+        grupos (list): Grupos de rutas devueltos por buscar_similares.
+        estadisticas (dict|None): Contadores de buscar_similares.
+        
+    Returns:
+        str: Ruta del reporte.
+    """
+    ruta = os.path.join(carpeta, "similares.md")
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("# Imágenes similares\n\n")
+        f.write(f"🔍 Búsqueda realizada el {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        if estadisticas:
+            f.write(f"- Imágenes revisadas: {estadisticas['imagenes']}\n")
+            f.write(f"- Grupos de imágenes similares: {estadisticas['grupos']}\n")
+            f.write(f"- Imágenes agrupadas: {estadisticas['imagenes_agrupadas']}\n")
+            f.write(f"- Hashes reutilizados de la caché: {estadisticas['hashes_en_cache']}\n\n")
+        for i, grupo in enumerate(grupos, 1):
+            f.write(f"## Grupo {i}\n")
+            for ruta_archivo in grupo:
+                f.write(f"- `{ruta_archivo}`\n")
+            f.write("\n")
+    return ruta
+
+# --- Diario de Transferencias ---
+
+class DiarioTransferencias:
+    """
+    Diario de solo añadido, en la carpeta de destino, con las transferencias de una ejecución.
+    
+    Cada línea es un JSON: 'inicio' (nueva ejecución), 'reanudacion', 'plan' (origen,
+    destino y tamaño de un archivo antes de transferirlo), 'hecho' (el archivo ya está
+    en su destino) y 'fin'. Las entradas se acumulan en memoria y se escriben con un
+    fsync cada DIARIO_LOTE entradas o DIARIO_INTERVALO segundos, así que un corte puede
+    perder como mucho las últimas. Un 'plan' anterior a un renombrado se escribe al
+    momento, porque el archivo desaparece del origen en cuanto se renombra; al
+    reanudar, un archivo planificado cuyo destino ya
+    tiene el tamaño y la fecha de modificación del origen se da por hecho sin leerlo.
+    
+    El diario solo existe mientras una ejecución está a medias: al cerrarlo
+    completado se borra, y una ejecución nueva (sin reanudar) empieza uno vacío. Al
+    reanudar se cargan las entradas desde el último 'inicio' y se continúa esa
+    misma ejecución, salvo que ya terminara con 'fin'.
+    """
+    NOMBRE = ".flowbooster-diario.jsonl"
+
+    def __init__(self, destino, reanudar=False, lote=DIARIO_LOTE, intervalo=DIARIO_INTERVALO, **datos):
+        """
+        Args:
+            destino (str): Carpeta de destino donde se guarda el diario.
+            reanudar (bool): Si es True carga la ejecución anterior para continuarla.
+            lote (int): Entradas acumuladas que fuerzan una escritura a disco.
+            intervalo (float): Segundos máximos entre dos escrituras a disco.
+            **datos: Datos extra que se guardan en la entrada de 'inicio'.
+        """
+        self.ruta = os.path.join(destino, self.NOMBRE)
+        self.lote = lote
+        self.intervalo = intervalo
+        # Ejecución anterior: origen -> entrada 'plan', y destinos ya hechos
+        self.planificadas = {}
+        self.hechas = set()
+        if reanudar:
+            self._cargar()
+        self._lock = threading.Lock()
+        self._pendientes = []
+        self._ultima_escritura = time.monotonic()
+        os.makedirs(destino, exist_ok=True)
+        self._archivo = open(self.ruta, "a" if reanudar else "w", encoding="utf-8")
+        if reanudar and self._termina_cortado():
+            self._archivo.write("\n")  # Separar la línea cortada de las nuevas
+        if reanudar:
+            self._anotar({"op": "reanudacion", "fecha": datetime.now().isoformat(timespec="seconds")})
+        else:
+            self._anotar({"op": "inicio", "fecha": datetime.now().isoformat(timespec="seconds"), **datos})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        self.cerrar(completado=tipo_exc is None)
+
+    def _cargar(self):
+        try:
+            f = open(self.ruta, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except ValueError:
+                    continue  # Última línea cortada por un apagado
+                op = entrada.get("op")
+                if op in ("inicio", "fin"):
+                    # Una ejecución terminada no se reanuda
+                    self.planificadas.clear()
+                    self.hechas.clear()
+                elif op == "plan":
+                    self.planificadas[entrada["origen"]] = entrada
+                elif op == "hecho":
+                    self.hechas.add(entrada["destino"])
+
+    def _termina_cortado(self):
+        """Indica si el diario termina con una línea sin salto (escritura interrumpida)."""
+        with open(self.ruta, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _anotar(self, entrada, sincronizar=False):
+        linea = json.dumps(entrada, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._pendientes.append(linea)
+            if (not sincronizar and len(self._pendientes) < self.lote
+                    and time.monotonic() - self._ultima_escritura < self.intervalo):
+                return
+            self._escribir()
+
+    def _escribir(self):
+        """Escribe las entradas pendientes y hace fsync (con el lock tomado)."""
+        if self._pendientes:
+            self._archivo.write("".join(self._pendientes))
+            self._pendientes.clear()
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+        self._ultima_escritura = time.monotonic()
+
+    def planificar(self, origen, destino, tamano, sincronizar=False, **datos):
+        """
+        Anota que 'origen' se va a transferir a 'destino' (datos extra: tipo, línea del log...).
+        
+        Con sincronizar=True la entrada llega a disco (fsync) antes de volver: para los
+        renombrados, que un corte no puede dejar a medias pero sí sin anotar.
+        """
+        self._anotar({"op": "plan", "origen": origen, "destino": destino, "tamano": tamano, **datos},
+                     sincronizar)
+
+    def hecho(self, destino):
+        """Anota que el archivo ya está completo en 'destino'."""
+        self._anotar({"op": "hecho", "destino": destino})
+
+    def destino_planificado(self, origen):
+        """Devuelve el destino que la ejecución anterior asignó a 'origen' (o None)."""
+        entrada = self.planificadas.get(origen)
+        return entrada["destino"] if entrada else None
+
+    def ya_transferido(self, origen, destino):
+        """
+        Indica si la ejecución anterior ya dejó 'origen' completo en 'destino'.
+        
+        Solo se consultan los metadatos: el destino debe tener el tamaño del origen
+        y, si el diario no llegó a anotarlo como hecho, también su fecha de modificación
+        (que la copia conserva). No se lee el contenido de ningún archivo.
+        """
+        entrada = self.planificadas.get(origen)
+        if entrada is None or entrada["destino"] != destino:
+            return False
+        try:
+            stat_origen = os.stat(origen)
+            stat_destino = os.stat(destino)
+        except OSError:
+            return False
+        if stat_destino.st_size != stat_origen.st_size:
+            return False
+        if destino in self.hechas:
+            return True
+        return mismos_metadatos(stat_origen.st_size, stat_origen.st_mtime_ns,
+                                stat_destino.st_size, stat_destino.st_mtime_ns)
+
+    def previas(self, vistos):
+        """
+        Devuelve las entradas 'plan' de la ejecución anterior cuyo origen no está en
+        'vistos' y cuyo destino existe: archivos movidos antes de la interrupción, que
+        ya no aparecen en el origen pero deben contar en el log y en el resumen.
+        """
+        return [entrada for origen, entrada in self.planificadas.items()
+                if origen not in vistos and os.path.exists(entrada["destino"])]
+
+    def cerrar(self, completado=True):
+        """
+        Escribe las entradas pendientes y cierra el diario.
+        
+        Args:
+            completado (bool): Si es True la ejecución terminó: se anota el 'fin' y se
+                borra el diario, que ya no hace falta para reanudar.
+        """
+        if completado:
+            self._anotar({"op": "fin", "fecha": datetime.now().isoformat(timespec="seconds")})
+        with self._lock:
+            if self._archivo.closed:
+                return
+            self._escribir()
+            self._archivo.close()
+            if completado:
+                try:
+                    os.remove(self.ruta)
+                except FileNotFoundError:
+                    pass
+
+# --- Motor de Transferencia ---
+
+class MotorTransferencia:
     """
-    Genera un archivo proyecto_info.json con metadatos del proyecto.
+    Mueve o copia archivos eligiendo el camino más rápido para cada uno.
     
-    Args:
-        destino (str): Ruta a la carpeta de destino.
-        origen (str): Ruta a la carpeta de origen.
-        analisis (dict): El diccionario resultado de analizar_origen().
+    Al mover, si origen y destino están en el mismo sistema de archivos se hace un
+    os.replace (instantáneo). El resto de operaciones (copias, y movimientos entre
+    dispositivos) se envían a un pool de hilos que copia con copiar_archivo_rapido
+    (reflink, copy_file_range, sendfile o bucle, con los metadatos de shutil.copy2) a un
+    temporal, comprueba que tiene el tamaño del origen, lo renombra al nombre final y,
+    si se está moviendo, borra el original.
+    Así las copias van en paralelo y nunca queda un archivo a medias con el nombre final.
+    
+    La concurrencia se puede limitar por dispositivo: cada copia ocupa un hueco del
+    dispositivo de origen y otro del de destino (p. ej. 1 para un HDD, 8 para un NVMe).
+    El resumen indica cuántos archivos tomó cada camino y su velocidad.
+    
+    Con un DiarioTransferencias cada archivo se anota antes de transferirlo y al
+    terminar, y los que una ejecución anterior ya dejó en su destino se omiten.
+    Con un índice del destino (indexar_destino) los archivos que ya están allí con
+    el mismo tamaño y fecha (y, si se pide, el mismo hash) tampoco se transfieren.
+    
+    Se usa como gestor de contexto: al salir espera las copias pendientes y relanza
+    el primer error que haya ocurrido en ellas.
     """
-    info = {
-        "tipo_proyecto": analisis["tipo_proyecto"],
-        "fecha_creacion": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        "rutas": {
-            "origen": origen,
-            "destino": destino
-        },
-        "cantidad_archivos": analisis["counts"]
-    }
-    ruta = os.path.join(destino, "proyecto_info.json")
-    with open(ruta, "w", encoding="utf-8") as f:
-        # Escribe el JSON con indentación para que sea legible por humanos
-        json.dump(info, f, indent=4, ensure_ascii=False)
+    CAMINOS = ("renombrado", "copia_y_borrado", "copia")
+
+    def __init__(self, copiar=False, max_workers=WORKERS_TRANSFERENCIA, limites_dispositivo=None,
+                 limite_por_dispositivo=None, progreso=None, diario=None, indice_destino=None,
+                 verificar_hash=False, instrumentacion=None):
+        """
+        Args:
+            copiar (bool): Si es True copia los archivos. Si es False los mueve.
+            max_workers (int): Copias simultáneas en total.
+            limites_dispositivo (dict|None): Copias simultáneas por dispositivo, indicado
+                con cualquier ruta que esté en él (p. ej. {'/media/tarjeta': 2, '/mnt/nas': 8}).
+            limite_por_dispositivo (int|None): Límite para los dispositivos que no están en
+                'limites_dispositivo'. None = sin límite aparte del de max_workers.
+            progreso (ReporteProgreso|None): Recibe un aviso por cada archivo terminado.
+            diario (DiarioTransferencias|None): Diario donde anotar las transferencias.
+            indice_destino (dict|None): Índice de indexar_destino para transferir solo
+                los archivos nuevos o modificados.
+            verificar_hash (bool): Si es True, un archivo del índice con el mismo tamaño
+                y fecha solo se omite si además su contenido tiene el mismo hash.
+            instrumentacion (Instrumentacion|None): Recibe el tiempo de cada renombrado
+                o copia en la fase 'transferencia'.
+        """
+        self.copiar = copiar
+        self.progreso = progreso
+        self.diario = diario
+        self.omitidos = 0
+        self.indice_destino = indice_destino
+        self.verificar_hash = verificar_hash
+        self.instrumentacion = instrumentacion
+        self.sin_cambios = 0
+        self.max_workers = max(1, max_workers)
+        self.limite_por_dispositivo = limite_por_dispositivo
+        self._dispositivos = {}
+        self._semaforos = {}
+        for ruta, limite in (limites_dispositivo or {}).items():
+            self._semaforos[os.stat(ruta).st_dev] = threading.BoundedSemaphore(max(1, limite))
+        self._lock = threading.Lock()
+        self._estadisticas = {camino: {"archivos": 0, "bytes": 0, "segundos": 0.0} for camino in self.CAMINOS}
+        self._ventanas = {}
+        # Mecanismo de copia usado para cada archivo copiado (ruta final -> mecanismo)
+        self.mecanismos = {}
+        self._executor = None
+        self._errores = []
+        # Limita las copias en cola para que la memoria no crezca con el número de archivos
+        self._hueco = threading.BoundedSemaphore(self.max_workers * 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        self.cerrar(relanzar=tipo_exc is None)
+
+    def _dispositivo(self, carpeta):
+        """Devuelve el st_dev de una carpeta, consultándolo una sola vez por carpeta."""
+        if carpeta not in self._dispositivos:
+            self._dispositivos[carpeta] = os.stat(carpeta).st_dev
+        return self._dispositivos[carpeta]
+
+    def mismo_dispositivo(self, origen, destino):
+        """Indica si un archivo y la carpeta de su destino están en el mismo sistema de archivos."""
+        return (self._dispositivo(os.path.dirname(os.path.abspath(origen)))
+                == self._dispositivo(os.path.dirname(os.path.abspath(destino))))
+
+    def _semaforos_para(self, dispositivos):
+        """
+        Devuelve los semáforos de los dispositivos implicados, sin repetir y ordenados
+        por dispositivo para que dos copias en sentidos opuestos no se bloqueen entre sí.
+        """
+        semaforos = []
+        for dispositivo in sorted(set(dispositivos)):
+            if dispositivo not in self._semaforos:
+                if self.limite_por_dispositivo is None:
+                    continue
+                self._semaforos[dispositivo] = threading.BoundedSemaphore(max(1, self.limite_por_dispositivo))
+            semaforos.append(self._semaforos[dispositivo])
+        return semaforos
+
+    def _sumar(self, camino, tamano, segundos):
+        with self._lock:
+            estadisticas = self._estadisticas[camino]
+            estadisticas["archivos"] += 1
+            estadisticas["bytes"] += tamano
+            estadisticas["segundos"] += segundos
+
+    def sin_cambios_en_destino(self, origen, destino, tamano, mtime_ns=None):
+        """
+        Indica si el índice del destino ya tiene este archivo sin cambios.
+        
+        Args:
+            origen (str): Ruta del archivo de origen.
+            destino (str): Ruta final del archivo.
+            tamano (int): Tamaño del origen.
+            mtime_ns (int|None): Fecha de modificación del origen si ya se conoce.
+        """
+        existente = self.indice_destino.get(os.path.normpath(destino))
+        if existente is None or existente[0] != tamano:
+            return False
+        if mtime_ns is None:
+            mtime_ns = os.stat(origen).st_mtime_ns
+        if not mismos_metadatos(tamano, mtime_ns, *existente):
+            return False
+        return not self.verificar_hash or hash_archivo(origen) == hash_archivo(destino)
+
+    def transferir(self, origen, destino, tamano=None, datos_diario=None, mtime_ns=None):
+        """
+        Mueve o copia un archivo (sobrescribe el destino si ya existe, como shutil.move).
+        
+        Args:
+            origen (str): Ruta del archivo de origen.
+            destino (str): Ruta final del archivo (su carpeta debe existir).
+            tamano (int|None): Tamaño en bytes si ya se conoce (evita un stat).
+            datos_diario (dict|None): Datos extra para la entrada 'plan' del diario.
+            mtime_ns (int|None): Fecha de modificación del origen si ya se conoce (evita
+                un stat al comparar con el índice del destino).
+            
+        Returns:
+            str: El camino tomado: 'renombrado', o 'copia_y_borrado'/'copia' (en segundo plano),
+                'omitido' si el diario indica que ya se transfirió en una ejecución anterior,
+                o 'sin_cambios' si el índice del destino ya lo tiene igual. Al mover, un
+                archivo sin cambios se deja también en el origen.
+            
+        Raises:
+            OperacionCancelada: Si se pidió cancelar en el ReporteProgreso del motor.
+        """
+        self._revisar_errores()
+        if self.progreso is not None:
+            self.progreso.comprobar_cancelacion()
+        if tamano is None:
+            tamano = os.stat(origen).st_size
+        if self.indice_destino is not None and self.sin_cambios_en_destino(origen, destino, tamano, mtime_ns):
+            self.sin_cambios += 1
+            if self.progreso is not None:
+                self.progreso.archivo_hecho(destino, tamano)
+            return "sin_cambios"
+        if self.diario is not None:
+            if self.diario.ya_transferido(origen, destino):
+                if not self.copiar:
+                    # La copia llegó entera pero el original no se llegó a borrar
+                    os.unlink(origen)
+                self.omitidos += 1
+                if self.progreso is not None:
+                    self.progreso.archivo_hecho(destino, tamano)
+                return "omitido"
+        dispositivo_origen = self._dispositivo(os.path.dirname(os.path.abspath(origen)))
+        dispositivo_destino = self._dispositivo(os.path.dirname(os.path.abspath(destino)))
+        renombrar = not self.copiar and dispositivo_origen == dispositivo_destino
+        if self.diario is not None:
+            # El renombrado es inmediato: su 'plan' debe estar en disco antes
+            self.diario.planificar(origen, destino, tamano, sincronizar=renombrar, **(datos_diario or {}))
+        if renombrar:
+            inicio = time.perf_counter()
+            try:
+                os.replace(origen, destino)
+                fin = time.perf_counter()
+                self._sumar("renombrado", tamano, fin - inicio)
+                if self.instrumentacion is not None:
+                    self.instrumentacion.archivo("transferencia", destino, inicio, fin, "renombrado")
+                if self.diario is not None:
+                    self.diario.hecho(destino)
+                if self.progreso is not None:
+                    self.progreso.archivo_hecho(destino, tamano)
+                return "renombrado"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Mismo st_dev pero distinto montaje (bind mounts, overlay): se copia
+        camino = "copia" if self.copiar else "copia_y_borrado"
+        semaforos = self._semaforos_para([dispositivo_origen, dispositivo_destino])
+        self._enviar_copia(origen, destino, tamano, camino, semaforos)
+        return camino
+
+    def _enviar_copia(self, origen, destino, tamano, camino, semaforos):
+        self._hueco.acquire()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futuro = self._executor.submit(self._copiar, origen, destino, tamano, camino, semaforos)
+        except BaseException:
+            self._hueco.release()
+            raise
+        futuro.add_done_callback(self._copia_terminada)
+
+    def _copia_terminada(self, futuro):
+        self._hueco.release()
+        if futuro.cancelled():
+            return
+        if futuro.exception() is not None:
+            with self._lock:
+                self._errores.append(futuro.exception())
+            if self.instrumentacion is not None:
+                self.instrumentacion.contar("errores")
+
+    def _copiar(self, origen, destino, tamano, camino, semaforos):
+        for semaforo in semaforos:
+            semaforo.acquire()
+        try:
+            inicio = time.perf_counter()
+            temporal = destino + ".flowbooster-tmp"
+            try:
+                mecanismo = copiar_archivo_rapido(origen, temporal)
+                # Una copia incompleta no llega al nombre final ni se borra el original
+                copiado = os.path.getsize(temporal)
+                if copiado != tamano:
+                    raise OSError(errno.EIO, f"Copia incompleta: {copiado} de {tamano} bytes", origen)
+                os.replace(temporal, destino)
+            except BaseException:
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+                raise
+            if camino == "copia_y_borrado":
+                os.unlink(origen)
+            fin = time.perf_counter()
+            if self.diario is not None:
+                self.diario.hecho(destino)
+        finally:
+            for semaforo in reversed(semaforos):
+                semaforo.release()
+        self._sumar(camino, tamano, fin - inicio)
+        if self.instrumentacion is not None:
+            self.instrumentacion.archivo("transferencia", destino, inicio, fin, mecanismo)
+        with self._lock:
+            self.mecanismos[destino] = mecanismo
+            ventana = self._ventanas.setdefault(camino, [inicio, fin])
+            ventana[0] = min(ventana[0], inicio)
+            ventana[1] = max(ventana[1], fin)
+        if self.progreso is not None:
+            self.progreso.archivo_hecho(destino, tamano)
+
+    def _revisar_errores(self):
+        with self._lock:
+            if self._errores:
+                raise self._errores[0]
+
+    def cerrar(self, relanzar=True):
+        """
+        Espera a que terminen las copias pendientes.
+        
+        Args:
+            relanzar (bool): Si es True relanza el primer error ocurrido en una copia.
+                Si es False (se sale por un error o una cancelación) las copias que aún
+                no habían empezado se descartan y solo se esperan las que están en curso.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=not relanzar)
+            self._executor = None
+        if relanzar:
+            self._revisar_errores()
+
+    def resumen(self):
+        """
+        Devuelve cuántos archivos y bytes tomó cada camino y su velocidad.
+        
+        Para los caminos en paralelo los segundos son los de reloj entre la primera y
+        la última copia (las copias se solapan), no la suma de todas.
+        
+        Returns:
+            dict: Un diccionario por camino con archivos, bytes, segundos, bytes_por_segundo,
+                mb_por_segundo y archivos_por_segundo, más 'mecanismos_copia' con cuántos
+                archivos se copiaron con cada mecanismo y, si hay diario o índice del destino,
+                'omitidos_al_reanudar' y 'sin_cambios'.
+        """
+        resumen = {}
+        with self._lock:
+            for camino, estadisticas in self._estadisticas.items():
+                segundos = estadisticas["segundos"]
+                if camino in self._ventanas:
+                    segundos = self._ventanas[camino][1] - self._ventanas[camino][0]
+                resumen[camino] = {
+                    "archivos": estadisticas["archivos"],
+                    "bytes": estadisticas["bytes"],
+                    "segundos": round(segundos, 4),
+                    "bytes_por_segundo": round(estadisticas["bytes"] / segundos) if segundos else None,
+                    "mb_por_segundo": round(estadisticas["bytes"] / 1048576 / segundos, 2) if segundos else None,
+                    "archivos_por_segundo": round(estadisticas["archivos"] / segundos, 2) if segundos else None
+                }
+            mecanismos = {}
+            for mecanismo in self.mecanismos.values():
+                mecanismos[mecanismo] = mecanismos.get(mecanismo, 0) + 1
+        resumen["mecanismos_copia"] = mecanismos
+        if self.diario is not None:
+            resumen["omitidos_al_reanudar"] = self.omitidos
+        if self.indice_destino is not None:
+            resumen["sin_cambios"] = self.sin_cambios
+        return resumen
 
 # --- Función Principal de Procesamiento ---
 
-def procesar_proyecto(origen, destino, copiar=False, crear_todas=False, incluir_readme=False):
+def _ruta_sin_colision(ruta, usadas):
+    """
+    Devuelve una ruta de destino que no se haya usado antes en la misma ejecución,
+    añadiendo un sufijo numérico al nombre si hace falta (IMG_0001_1.JPG, ...).
+    """
+    if ruta not in usadas:
+        return ruta
+    base, ext = os.path.splitext(ruta)
+    n = 1
+    while f"{base}_{n}{ext}" in usadas:
+        n += 1
+    return f"{base}_{n}{ext}"
+
+def _contar_transferencia(instrumentacion, transferencia):
+    """Pasa a los contadores de la instrumentación los totales de MotorTransferencia.resumen()."""
+    for camino in MotorTransferencia.CAMINOS:
+        instrumentacion.contar("archivos_transferidos", transferencia[camino]["archivos"])
+        instrumentacion.contar("bytes_transferidos", transferencia[camino]["bytes"])
+    for clave in ("sin_cambios", "omitidos_al_reanudar"):
+        if clave in transferencia:
+            instrumentacion.contar(clave, transferencia[clave])
+
+def procesar_proyecto(origen, destino, copiar=False, crear_todas=False, incluir_readme=False,
+                      recursivo=False, profundidad_max=None, incluir=None, excluir=None,
+                      opciones_transferencia=None, progreso=None, reanudar=False, incremental=False,
+                      verificar_hash=False, duplicados=None, instrumentacion=None):
     """
     Función principal que orquesta todo el proceso de organización.
     
+    En modo recursivo el origen se recorre como un flujo: cada archivo se mueve o
+    copia en cuanto se encuentra, sin esperar a que termine el recorrido del árbol
+    (por eso en ese modo los totales de la fase 'transferencia' no se conocen).
+    
+    Las transferencias se anotan en un DiarioTransferencias dentro del destino. Si la
+    ejecución se interrumpe (cierre, tarjeta extraída, apagón), volver a llamarla con
+    reanudar=True omite los archivos que ya llegaron y termina el resto.
+    
+    En modo incremental se indexa el destino una vez y solo se transfieren los
+    archivos nuevos o modificados, así que volver a importar una tarjeta que ya
+    estaba casi toda importada solo copia lo que falta.
+    
+    Con 'duplicados' se buscan antes los archivos del origen con el mismo contenido
+    que otro del origen o del destino (aunque tengan otro nombre); solo se transfiere
+    una copia y el resto se omite o se convierte en enlace duro. Los grupos se
+    documentan en duplicados.md.
+    
     Args:
         origen (str): Ruta de la carpeta origen.
         destino (str): Ruta de la carpeta destino.
         copiar (bool): Si es True, copia los archivos. Si es False, los mueve.
         crear_todas (bool): Si es True, crea toda la estructura de carpetas.
         incluir_readme (bool): Si es True, genera los archivos README.md.
+        recursivo (bool): Si es True también procesa las subcarpetas del origen
+            (p. ej. DCIM/100CANON). Los nombres repetidos reciben un sufijo numérico.
+        profundidad_max (int|None): Niveles de subcarpetas a recorrer (None = sin límite).
+        incluir (list|None): Patrones glob de archivos a incluir (modo recursivo).
+        excluir (list|None): Patrones glob de archivos o carpetas a excluir (modo recursivo).
+        opciones_transferencia (dict|None): Argumentos extra para MotorTransferencia
+            (max_workers, limites_dispositivo, limite_por_dispositivo).
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de
+            progreso (fases y archivos terminados, ver ReporteProgreso).
+        reanudar (bool): Si es True continúa la ejecución anterior anotada en el diario
+            del destino (con los mismos origen, destino y opciones).
+        incremental (bool): Si es True omite los archivos que ya están en el destino con
+            el mismo tamaño y fecha de modificación.
+        verificar_hash (bool): En modo incremental, confirma además que el contenido
+            tenga el mismo hash antes de omitir un archivo.
+        duplicados (str|None): 'omitir' para no transferir los duplicados (al mover se
+            quedan en el origen) o 'enlazar' para crearlos en el destino como enlaces
+            duros al archivo que se conserva. None no busca duplicados.
+        instrumentacion (Instrumentacion|bool|None): Mide cada fase, cuenta E/S, bytes y
+            errores y guarda los archivos más lentos en la clave 'instrumentacion' de
+            proyecto_info.json (True = opciones por defecto; ver Instrumentacion).
         
     Returns:
         tuple: (log, tipo_proyecto) o (None, "vacio") si no hay archivos.
+        
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar(). Los archivos ya
+            transferidos se quedan en el destino.
     """
-    # 1. Analizar el contenido
-    analisis = analizar_origen(origen)
-    if analisis["tipo_proyecto"] == "vacio":
-        return None, "vacio"
+    progreso, instrumentacion = _instrumentar(_reporte_progreso(progreso), instrumentacion)
+    if recursivo:
+        # 1. Recorrer el origen como un flujo; la estructura se crea a medida que aparecen tipos
+        analisis = {
+            "tipo_proyecto": "vacio",
+            "counts": {"JPG": 0, "RAW": 0, "VIDEO": 0},
+            "files": {"JPG": [], "RAW": [], "VIDEO": []}
+        }
+        rutas_posibles = rutas_estructura(destino)
+        # Las carpetas de la estructura no se recorren por si el destino está dentro del origen
+        registros = iterar_archivos(origen, profundidad_max, incluir, excluir,
+                                    IMG_JPG_EXT + IMG_RAW_EXT + VIDEO_EXT, omitir=rutas_posibles.values())
+        if duplicados:
+            # Para comparar contenidos hace falta el recorrido completo antes de transferir
+            registros = list(registros)
+            registros_origen = registros
+        pendientes = ((clasificar_extension(r.ext), r.relativa, r.tamano, r.mtime_ns) for r in registros)
+    else:
+        # 1. Analizar el contenido
+        if progreso is not None:
+            progreso.fase("analisis")
+        analisis = analizar_origen(origen)
+        # Al reanudar un movimiento el origen puede haber quedado vacío: se sigue para cerrar el diario
+        if analisis["tipo_proyecto"] == "vacio" and not reanudar:
+            if progreso is not None:
+                progreso.terminar()
+            return None, "vacio"
 
-    # 2. Crear la estructura de carpetas
-    carpetas_creadas, rutas_posibles = crear_estructura(destino, analisis, crear_todas)
-    
-    # 3. Generar README.md en todas las carpetas posibles si se solicita
-    if incluir_readme:
-        generar_readme(rutas_posibles)
+        # 2. Crear la estructura de carpetas
+        if progreso is not None:
+            progreso.fase("estructura")
+        carpetas_creadas, rutas_posibles = crear_estructura(destino, analisis, crear_todas)
+        
+        # 3. Generar README.md en todas las carpetas posibles si se solicita
+        if incluir_readme:
+            generar_readme(rutas_posibles)
+        tamanos = analisis["tamanos"]
+        pendientes = ((tipo, archivo, tamanos[archivo], None)
+                      for tipo, archivos in analisis["files"].items() for archivo in archivos)
+        if duplicados:
+            registros_origen = escanear_carpeta(origen, IMG_JPG_EXT + IMG_RAW_EXT + VIDEO_EXT)
+
+    duplicado_de = {}
+    if duplicados:
+        if duplicados not in ("omitir", "enlazar"):
+            raise ValueError(f"Modo de duplicados desconocido: {duplicados}")
+        duplicado_de, grupos_duplicados, estadisticas_duplicados = _mapa_duplicados(
+            registros_origen, destino, progreso)
+    enlaces = []
+    destino_de = {}
 
     log = []
     accion_str = "Copiado" if copiar else "Movido"
+    carpetas_listas = set()
+    diario = DiarioTransferencias(destino, reanudar, origen=origen, copiar=copiar)
+    # Los nombres ya asignados en la ejecución anterior no se reparten otra vez
+    rutas_usadas = {entrada["destino"] for entrada in diario.planificadas.values()}
+    vistos = set()
+    indice = None
+    if incremental:
+        if progreso is not None:
+            progreso.fase("indice")
+        indice = indexar_destino(destino)
+    motor = MotorTransferencia(copiar, progreso=progreso, diario=diario, indice_destino=indice,
+                               verificar_hash=verificar_hash, instrumentacion=instrumentacion,
+                               **(opciones_transferencia or {}))
     
     # 4. Mover o copiar los archivos a sus nuevas carpetas
-    for tipo, archivos in analisis["files"].items():
-        if not archivos: continue # Si no hay archivos de este tipo, saltar
-            
-        # Determinar la ruta de destino según el tipo
-        if tipo == "JPG":
-            ruta_destino_tipo = rutas_posibles["jpg"]
-        elif tipo == "RAW":
-            ruta_destino_tipo = rutas_posibles["raw"]
-        elif tipo == "VIDEO":
-            ruta_destino_tipo = rutas_posibles["videos"]
-
-        for archivo in archivos:
-            ruta_origen_archivo = os.path.join(origen, archivo)
-            nueva_ruta_archivo = os.path.join(ruta_destino_tipo, archivo)
-            
-            # Ejecutar la acción
-            if copiar:
-                shutil.copy2(ruta_origen_archivo, nueva_ruta_archivo)
-            else:
-                shutil.move(ruta_origen_archivo, nueva_ruta_archivo)
-            
-            # Registrar en el log
-            log.append(f"- `{archivo}` → **{tipo}** ({accion_str})")
+    if progreso is not None:
+        if recursivo:
+            progreso.fase("transferencia")
+        else:
+            progreso.fase("transferencia", len(analisis["tamanos"]), sum(analisis["tamanos"].values()))
+    try:
+        with motor:
+            for tipo, archivo, tamano, mtime_ns in pendientes:
+                # Determinar la ruta de destino según el tipo
+                ruta_destino_tipo = rutas_posibles[CARPETA_POR_TIPO[tipo]]
+
+                if recursivo:
+                    if not carpetas_listas:
+                        # Primer archivo encontrado: preparar la estructura común
+                        if crear_todas:
+                            crear_estructura(destino, analisis, True)
+                        if incluir_readme:
+                            generar_readme(rutas_posibles)
+                    if ruta_destino_tipo not in carpetas_listas:
+                        os.makedirs(ruta_destino_tipo, exist_ok=True)
+                        carpetas_listas.add(ruta_destino_tipo)
+                    analisis["counts"][tipo] += 1
+
+                ruta_origen_archivo = os.path.join(origen, archivo)
+                nueva_ruta_archivo = diario.destino_planificado(ruta_origen_archivo)
+                if nueva_ruta_archivo is None:
+                    nueva_ruta_archivo = os.path.join(ruta_destino_tipo, os.path.basename(archivo))
+                    if recursivo:
+                        nueva_ruta_archivo = _ruta_sin_colision(nueva_ruta_archivo, rutas_usadas)
+                        rutas_usadas.add(nueva_ruta_archivo)
+                if reanudar:
+                    vistos.add(ruta_origen_archivo)
+                if duplicado_de:
+                    clave = os.path.normpath(ruta_origen_archivo)
+                    canonico = duplicado_de.get(clave)
+                    if canonico is not None:
+                        # Duplicado: no se transfiere; el enlace se crea cuando el original ya esté en el destino
+                        if duplicados == "enlazar":
+                            linea_log = f"- `{archivo}` → **{tipo}** (Enlace a `{os.path.basename(canonico)}`)"
+                            enlaces.append((canonico, nueva_ruta_archivo, ruta_origen_archivo, tamano,
+                                            {"tipo": tipo, "log": linea_log}))
+                            log.append(linea_log)
+                        else:
+                            log.append(f"- `{archivo}` → **{tipo}** (Duplicado de `{os.path.basename(canonico)}`, omitido)")
+                        if progreso is not None:
+                            progreso.archivo_hecho(ruta_origen_archivo, tamano)
+                        continue
+                    destino_de[clave] = nueva_ruta_archivo
+                linea_log = f"- `{archivo}` → **{tipo}** ({accion_str})"
+                
+                # Ejecutar la acción (renombrado, copia en paralelo entre dispositivos o copia)
+                camino = motor.transferir(ruta_origen_archivo, nueva_ruta_archivo, tamano,
+                                          {"tipo": tipo, "log": linea_log}, mtime_ns)
+                if camino == "sin_cambios":
+                    linea_log = f"- `{archivo}` → **{tipo}** (Sin cambios)"
+                
+                # Registrar en el log
+                log.append(linea_log)
+        for canonico, nueva_ruta_archivo, ruta_origen_archivo, tamano, datos_diario in enlaces:
+            if diario.ya_transferido(ruta_origen_archivo, nueva_ruta_archivo):
+                if not copiar:
+                    os.unlink(ruta_origen_archivo)
+                continue
+            objetivo = destino_de.get(os.path.normpath(canonico), canonico)
+            # Como un renombrado: al mover, el 'plan' debe estar en disco antes de borrar el duplicado
+            diario.planificar(ruta_origen_archivo, nueva_ruta_archivo, tamano, sincronizar=not copiar,
+                              **datos_diario)
+            _enlazar_duplicado(objetivo, nueva_ruta_archivo, ruta_origen_archivo, copiar)
+            diario.hecho(nueva_ruta_archivo)
+    except BaseException:
+        diario.cerrar(completado=False)
+        raise
+
+    if reanudar:
+        # Archivos que la ejecución anterior ya movió y no están en el origen
+        for entrada in diario.previas(vistos):
+            analisis["counts"][entrada["tipo"]] += 1
+            log.append(entrada["log"])
+
+    if recursivo or reanudar:
+        analisis["tipo_proyecto"] = determinar_tipo_proyecto(analisis["counts"])
+        if analisis["tipo_proyecto"] == "vacio":
+            diario.cerrar()
+            if progreso is not None:
+                progreso.terminar()
+            return None, "vacio"
 
     # 5. Generar los archivos de reporte
+    if progreso is not None:
+        progreso.fase("reportes")
     generar_log(destino, log)
-    generar_json_info(destino, origen, analisis)
+    info_duplicados = None
+    if duplicados:
+        generar_reporte_duplicados(destino, grupos_duplicados, estadisticas_duplicados)
+        info_duplicados = {"modo": duplicados, **estadisticas_duplicados}
+    transferencia = motor.resumen()
+    medidas = None
+    if instrumentacion is not None:
+        _contar_transferencia(instrumentacion, transferencia)
+        medidas = instrumentacion.resumen()
+    generar_json_info(destino, origen, analisis, transferencia, info_duplicados, medidas)
+    diario.cerrar()
+    if progreso is not None:
+        progreso.terminar()
     
     return log, analisis["tipo_proyecto"]
 
-def procesar_proyecto_por_fecha(origen, destino, nivel_organizacion, copiar=False, incluir_readme=False):
+def procesar_proyecto_por_fecha(origen, destino, nivel_organizacion, copiar=False, incluir_readme=False,
+                                max_workers=None, usar_procesos=False, cache=None, niveles=None, patrones=None,
+                                opciones_transferencia=None, progreso=None, reanudar=False, incremental=False,
+                                verificar_hash=False, instrumentacion=None):
     """
     Función principal para organizar archivos por fecha.
     
+    Igual que procesar_proyecto, anota las transferencias en el diario del destino,
+    con reanudar=True termina una ejecución interrumpida y con incremental=True solo
+    transfiere los archivos nuevos o modificados.
+    
     Args:
         origen (str): Ruta de la carpeta origen.
         destino (str): Ruta de la carpeta destino.
         nivel_organizacion (str): Nivel de organización ('dia', 'semana', 'mes', 'año').
         copiar (bool): Si es True, copia los archivos. Si es False, los mueve.
         incluir_readme (bool): Si es True, genera los archivos README.md.
+        max_workers (int|str|None): Workers para leer los metadatos o perfil ('ssd', 'hdd', 'nas').
+        usar_procesos (bool): Si es True lee los metadatos con un pool de procesos.
+        cache (CacheMetadatos|bool|None): Caché de metadatos (True = caché del usuario).
+        niveles (list|None): Orden de niveles de resolución de fechas ('nombre', 'cabecera', 'mtime').
+        patrones (list|None): Patrones de nombre para el nivel 'nombre'.
+        opciones_transferencia (dict|None): Argumentos extra para MotorTransferencia
+            (max_workers, limites_dispositivo, limite_por_dispositivo).
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de
+            progreso (fases y archivos terminados, ver ReporteProgreso).
+        reanudar (bool): Si es True continúa la ejecución anterior anotada en el diario
+            del destino (con los mismos origen, destino y opciones).
+        incremental (bool): Si es True omite los archivos que ya están en el destino con
+            el mismo tamaño y fecha de modificación.
+        verificar_hash (bool): En modo incremental, confirma además el hash del contenido.
+        instrumentacion (Instrumentacion|bool|None): Mide cada fase, cuenta E/S, bytes,
+            aciertos de la caché y errores y guarda los archivos más lentos en la clave
+            'instrumentacion' de proyecto_info.json (True = opciones por defecto).
         
     Returns:
         tuple: (log, total_archivos) o (None, 0) si no hay archivos.
+        
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar(). Los archivos ya
+            transferidos se quedan en el destino.
     """
+    progreso, instrumentacion = _instrumentar(_reporte_progreso(progreso), instrumentacion)
+    
     # 1. Analizar el contenido por fecha
-    archivos_por_fecha, total_archivos = analizar_origen_por_fecha(origen)
-    if total_archivos == 0:
+    estadisticas_niveles = {}
+    tamanos = {}
+    mtimes_ns = {}
+    archivos_por_fecha, total_archivos = analizar_origen_por_fecha(
+        origen, max_workers, usar_procesos, cache, niveles, patrones, estadisticas_niveles, tamanos, progreso,
+        instrumentacion, mtimes_ns
+    )
+    if total_archivos == 0 and not reanudar:
+        if progreso is not None:
+            progreso.terminar()
         return None, 0
 
     # 2. Crear la estructura de carpetas por fecha
+    if progreso is not None:
+        progreso.fase("estructura")
     estructura = crear_estructura_por_fecha(destino, archivos_por_fecha, nivel_organizacion)
     
     # 3. Generar README.md si se solicita
@@ -357,24 +3334,57 @@ def procesar_proyecto_por_fecha(origen, destino, nivel_organizacion, copiar=Fals
 
     log = []
     accion_str = "Copiado" if copiar else "Movido"
+    diario = DiarioTransferencias(destino, reanudar, origen=origen, copiar=copiar, nivel=nivel_organizacion)
+    vistos = set()
+    indice = None
+    if incremental:
+        if progreso is not None:
+            progreso.fase("indice")
+        indice = indexar_destino(destino)
+    motor = MotorTransferencia(copiar, progreso=progreso, diario=diario, indice_destino=indice,
+                               verificar_hash=verificar_hash, instrumentacion=instrumentacion,
+                               **(opciones_transferencia or {}))
     
     # 4. Mover o copiar los archivos a sus carpetas por fecha
-    for ruta_carpeta, archivos in estructura.items():
-        for archivo in archivos:
-            ruta_origen_archivo = os.path.join(origen, archivo)
-            nueva_ruta_archivo = os.path.join(ruta_carpeta, archivo)
-            
-            # Ejecutar la acción
-            if copiar:
-                shutil.copy2(ruta_origen_archivo, nueva_ruta_archivo)
-            else:
-                shutil.move(ruta_origen_archivo, nueva_ruta_archivo)
-            
-            # Registrar en el log
-            fecha_archivo = archivos_por_fecha[archivo]
-            log.append(f"- `{archivo}` → **{os.path.basename(ruta_carpeta)}** ({accion_str}) - {fecha_archivo.strftime('%Y-%m-%d %H:%M')}")
+    if progreso is not None:
+        progreso.fase("transferencia", total_archivos, sum(tamanos.values()))
+    try:
+        with motor:
+            for ruta_carpeta, archivos in estructura.items():
+                for archivo in archivos:
+                    ruta_origen_archivo = os.path.join(origen, archivo)
+                    nueva_ruta_archivo = os.path.join(ruta_carpeta, archivo)
+                    if reanudar:
+                        vistos.add(ruta_origen_archivo)
+                    fecha_archivo = archivos_por_fecha[archivo]
+                    linea_log = f"- `{archivo}` → **{os.path.basename(ruta_carpeta)}** ({accion_str}) - {fecha_archivo.strftime('%Y-%m-%d %H:%M')}"
+                    
+                    # Ejecutar la acción (renombrado, copia en paralelo entre dispositivos o copia)
+                    camino = motor.transferir(ruta_origen_archivo, nueva_ruta_archivo, tamanos[archivo],
+                                              {"log": linea_log}, mtimes_ns[archivo])
+                    if camino == "sin_cambios":
+                        linea_log = f"- `{archivo}` → **{os.path.basename(ruta_carpeta)}** (Sin cambios) - {fecha_archivo.strftime('%Y-%m-%d %H:%M')}"
+                    
+                    # Registrar en el log
+                    log.append(linea_log)
+    except BaseException:
+        diario.cerrar(completado=False)
+        raise
+
+    if reanudar:
+        # Archivos que la ejecución anterior ya movió y no están en el origen
+        previas = diario.previas(vistos)
+        log.extend(entrada["log"] for entrada in previas)
+        total_archivos += len(previas)
+        if total_archivos == 0:
+            diario.cerrar()
+            if progreso is not None:
+                progreso.terminar()
+            return None, 0
 
     # 5. Generar los archivos de reporte
+    if progreso is not None:
+        progreso.fase("reportes")
     generar_log(destino, log)
     
     # Crear info específica para organización por fecha
@@ -387,14 +3397,1049 @@ def procesar_proyecto_por_fecha(origen, destino, nivel_organizacion, copiar=Fals
         },
         "nivel_organizacion": nivel_organizacion,
         "total_archivos": total_archivos,
-        "carpetas_creadas": len(estructura)
+        "carpetas_creadas": len(estructura),
+        "resolucion_fechas": resumen_niveles(estadisticas_niveles),
+        "transferencia": motor.resumen()
     }
+    if instrumentacion is not None:
+        instrumentacion.contar("aciertos_cache", estadisticas_niveles.get("cache", 0))
+        instrumentacion.contar("errores", estadisticas_niveles.get("fallidos", 0))
+        _contar_transferencia(instrumentacion, info["transferencia"])
+        info["instrumentacion"] = instrumentacion.resumen()
     ruta = os.path.join(destino, "proyecto_info.json")
     with open(ruta, "w", encoding="utf-8") as f:
         json.dump(info, f, indent=4, ensure_ascii=False)
+    diario.cerrar()
+    if progreso is not None:
+        progreso.terminar()
     
     return log, total_archivos
 
+# --- Escritura de ZIP en Paralelo ---
+
+# Formatos de las estructuras del ZIP (APPNOTE de PKWARE), iguales a los de zipfile
+_ZIP_CABECERA_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_ZIP_CABECERA_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_ZIP_FIN = struct.Struct("<4s4H2LH")
+_ZIP64_FIN = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_LOCALIZADOR = struct.Struct("<4sLQL")
+# Igual que zipfile: a partir de 2 GiB se usa ZIP64 por los lectores que leen los campos con signo
+LIMITE_ZIP64 = (1 << 31) - 1
+LIMITE_MIEMBROS_ZIP = (1 << 16) - 1
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+def _fecha_dos(mtime):
+    """Convierte un mtime en la fecha y hora de MS-DOS que usa el ZIP (1980-2107)."""
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1  # 1980-01-01 00:00:00
+    if t.tm_year > 2107:
+        return (23 << 11) | (59 << 5) | 29, (127 << 9) | (12 << 5) | 31
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+class CifradoZipCrypto:
+    """
+    Cifrado tradicional de PKWARE (ZipCrypto), el que abre cualquier descompresor,
+    incluido el explorador de Windows. Es débil y, al ir byte a byte en Python, lento:
+    solo conviene cuando el destinatario no puede abrir AES.
+    """
+    banderas = 0x1
+    version = 20
+
+    def __init__(self, password, hora):
+        self._claves = [0x12345678, 0x23456789, 0x34567890]
+        for byte in password.encode("utf-8"):
+            self._actualizar(byte)
+        # Los 11 primeros bytes son aleatorios; el último se comprueba al descifrar
+        # (con descriptor de datos se usa el byte alto de la hora en lugar del CRC)
+        self.cabecera = self.cifrar(os.urandom(11) + bytes([hora >> 8]))
+
+    def _actualizar(self, byte):
+        clave0, clave1, clave2 = self._claves
+        clave0 = _TABLA_CRC[(clave0 ^ byte) & 0xFF] ^ (clave0 >> 8)
+        clave1 = ((clave1 + (clave0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        clave2 = _TABLA_CRC[(clave2 ^ (clave1 >> 24)) & 0xFF] ^ (clave2 >> 8)
+        self._claves = [clave0, clave1, clave2]
+
+    def cifrar(self, datos):
+        clave0, clave1, clave2 = self._claves
+        tabla = _TABLA_CRC
+        salida = bytearray(len(datos))
+        for i, byte in enumerate(datos):
+            temporal = (clave2 | 2) & 0xFFFF
+            salida[i] = byte ^ (((temporal * (temporal ^ 1)) >> 8) & 0xFF)
+            clave0 = tabla[(clave0 ^ byte) & 0xFF] ^ (clave0 >> 8)
+            clave1 = ((clave1 + (clave0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            clave2 = tabla[(clave2 ^ (clave1 >> 24)) & 0xFF] ^ (clave2 >> 8)
+        self._claves = [clave0, clave1, clave2]
+        return bytes(salida)
+
+    def metodo(self, metodo):
+        return metodo
+
+    def extra(self, metodo):
+        return b""
+
+    def crc(self, crc):
+        return crc
+
+    def final(self):
+        return b""
+
+def _tabla_crc():
+    tabla = []
+    for n in range(256):
+        c = n
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        tabla.append(c)
+    return tabla
+
+_TABLA_CRC = _tabla_crc()
+
+class CifradoAES:
+    """
+    Cifrado AES-256 de WinZip (AE-2), el que usan 7-Zip, WinZip y WinRAR.
+    
+    La clave se deriva con PBKDF2-HMAC-SHA1 y una sal aleatoria por miembro; los
+    datos se cifran con AES en modo contador (contador de 128 bits little-endian
+    que empieza en 1) y se autentican con HMAC-SHA1. Necesita el paquete
+    'cryptography'.
+    """
+    banderas = 0x1
+    version = 51
+
+    def __init__(self, password, hora, sal=None):
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        sal = sal or os.urandom(16)
+        claves = hashlib.pbkdf2_hmac("sha1", password.encode("utf-8"), sal, 1000, 66)
+        # ECB sobre los bloques del contador: el CTR de la librería usa contador big-endian
+        self._aes = Cipher(algorithms.AES(claves[:32]), modes.ECB()).encryptor()
+        self._hmac = hmac.new(claves[32:64], digestmod="sha1")
+        self._contador = 1
+        self._resto = b""
+        self.cabecera = sal + claves[64:]
+
+    def _aplicar_flujo(self, datos):
+        # Flujo de clave de los bloques necesarios; lo que sobra del último se guarda para el siguiente trozo
+        faltan = len(datos) - len(self._resto)
+        bloques = max(0, -(-faltan // 16))
+        # Contador de 128 bits: la mitad baja cuenta y la alta queda a cero
+        contadores = array("Q", bytes(16 * bloques))
+        contadores[0::2] = array("Q", range(self._contador, self._contador + bloques))
+        if sys.byteorder == "big":
+            contadores.byteswap()
+        self._contador += bloques
+        flujo = self._resto + self._aes.update(contadores.tobytes())
+        self._resto = flujo[len(datos):]
+        return (int.from_bytes(datos, "little") ^ int.from_bytes(flujo[:len(datos)], "little")).to_bytes(
+            len(datos), "little")
+
+    def cifrar(self, datos):
+        if not datos:
+            return b""
+        cifrado = self._aplicar_flujo(datos)
+        self._hmac.update(cifrado)
+        return cifrado
+
+    def descifrar(self, datos):
+        """Inverso de cifrar (con la sal del miembro); el HMAC se calcula igual, sobre los datos cifrados."""
+        if not datos:
+            return b""
+        self._hmac.update(datos)
+        return self._aplicar_flujo(datos)
+
+    def metodo(self, metodo):
+        return 99
+
+    def extra(self, metodo):
+        # Versión AE-2, proveedor 'AE', AES-256 y el método real de compresión
+        return struct.pack("<3H2sBH", 0x9901, 7, 2, b"AE", 3, metodo)
+
+    def crc(self, crc):
+        return 0  # AE-2 no guarda el CRC: la integridad la garantiza el HMAC
+
+    def final(self):
+        return self._hmac.digest()[:10]
+
+def _clase_cifrado(cifrado=None):
+    """
+    Devuelve la clase de cifrado para 'aes', 'zipcrypto' o None (AES si está
+    instalado 'cryptography' y, si no, ZipCrypto).
+    """
+    if cifrado is None:
+        try:
+            import cryptography  # noqa: F401
+        except ImportError:
+            return CifradoZipCrypto
+        return CifradoAES
+    if cifrado == "aes":
+        return CifradoAES
+    if cifrado == "zipcrypto":
+        return CifradoZipCrypto
+    raise ValueError(f"Cifrado desconocido: {cifrado}")
+
+class EscritorZip:
+    """
+    Escribe un archivo ZIP estándar miembro a miembro.
+    
+    Cada miembro se abre con iniciar_miembro, su contenido (ya comprimido) se añade
+    en trozos con escribir y se cierra con terminar_miembro. Las extensiones ZIP64
+    se usan solo cuando un tamaño, un desplazamiento o el número de miembros no
+    caben en los campos clásicos, así que los ZIP pequeños son idénticos a los de
+    cualquier otra herramienta.
+    
+    La cabecera local se completa al terminar cada miembro volviendo atrás en el
+    archivo. Con 'tamano_parte' se escribe un ZIP dividido (spanned) estándar, con
+    la misma estructura que 'zip -s': archivo.z01, archivo.z02, ... y archivo.zip
+    como última parte, de 'tamano_parte' bytes como máximo. Los datos de un miembro
+    pueden cruzar de parte, pero ninguna cabecera queda partida, y cada miembro
+    guarda en el directorio central la parte donde empieza.
+    
+    Con 'password' todos los miembros se cifran (ver CifradoAES y CifradoZipCrypto).
+    """
+
+    def __init__(self, ruta, tamano_parte=None, password=None, cifrado=None):
+        if tamano_parte is not None and tamano_parte < 64 * 1024:
+            raise ValueError("Las partes deben ser de al menos 64 KiB")
+        self.ruta = ruta
+        self.tamano_parte = tamano_parte
+        self.password = password
+        self._clase_cifrado = _clase_cifrado(cifrado) if password else None
+        self.miembros = []
+        self.partes = []
+        self._miembro = None
+        self._disco = 0
+        self._f = open(self._ruta_parte(0), "wb")
+        if tamano_parte:
+            self._f.write(b"PK\x07\x08")  # Firma de archivo dividido al principio de la primera parte
+
+    def _ruta_parte(self, disco):
+        """Las partes se escriben como .zNN; la última se renombra a .zip al cerrar."""
+        if not self.tamano_parte:
+            return self.ruta
+        return f"{os.path.splitext(self.ruta)[0]}.z{disco + 1:02d}"
+
+    def _nueva_parte(self):
+        self._f.close()
+        self.partes.append(self._ruta_parte(self._disco))
+        self._disco += 1
+        self._f = open(self._ruta_parte(self._disco), "wb")
+
+    def _reservar(self, tamano):
+        """Pasa a la parte siguiente si en la actual no caben 'tamano' bytes."""
+        if self.tamano_parte and self._f.tell() + tamano > self.tamano_parte:
+            self._nueva_parte()
+
+    def _escribir_registro(self, datos):
+        """
+        Escribe una cabecera entera en la parte actual o, si no cabe, en la siguiente.
+        
+        Returns:
+            int: Desplazamiento del registro dentro de su parte.
+        """
+        self._reservar(len(datos))
+        posicion = self._f.tell()
+        self._f.write(datos)
+        return posicion
+
+    def _escribir_datos(self, datos):
+        """Escribe datos repartiéndolos entre partes si hace falta."""
+        if not self.tamano_parte:
+            self._f.write(datos)
+            return
+        vista = memoryview(datos)
+        while vista:
+            libre = self.tamano_parte - self._f.tell()
+            if libre <= 0:
+                self._nueva_parte()
+                continue
+            self._f.write(vista[:libre])
+            vista = vista[libre:]
+
+    def _parchear(self, disco, posicion, datos):
+        """Sobrescribe bytes ya escritos, aunque estén en una parte anterior."""
+        if disco == self._disco:
+            final = self._f.tell()
+            self._f.seek(posicion)
+            self._f.write(datos)
+            self._f.seek(final)
+        else:
+            with open(self._ruta_parte(disco), "r+b") as f:
+                f.seek(posicion)
+                f.write(datos)
+
+    def iniciar_miembro(self, nombre, tamano, mtime, modo=0o644, metodo=ZIP_DEFLATED):
+        """
+        Escribe la cabecera local de un miembro nuevo.
+        
+        Args:
+            nombre (str): Ruta dentro del ZIP (se normaliza con '/').
+            tamano (int): Tamaño previsto sin comprimir (decide si hace falta ZIP64).
+            mtime (float): Fecha de modificación del archivo.
+            modo (int): st_mode del archivo (permisos Unix al extraer).
+            metodo (int): ZIP_STORED o ZIP_DEFLATED.
+        """
+        nombre_bytes = nombre.replace(os.sep, "/").encode("utf-8")
+        hora, fecha = _fecha_dos(mtime)
+        cifrador = self._clase_cifrado(self.password, hora) if self._clase_cifrado else None
+        # Bit 11: nombre en UTF-8 (solo si no es ASCII, como zipfile); bit 3: descriptor de datos
+        banderas = 0x800 if not nombre.isascii() else 0
+        descriptor = isinstance(cifrador, CifradoZipCrypto)
+        if descriptor:
+            banderas |= 0x8
+        version = 20
+        metodo_cabecera = metodo
+        extra_cifrado = b""
+        if cifrador is not None:
+            banderas |= cifrador.banderas
+            version = cifrador.version
+            metodo_cabecera = cifrador.metodo(metodo)
+            extra_cifrado = cifrador.extra(metodo)
+        # Deflate puede agrandar un poco los datos incompresibles: mismo margen que zipfile
+        zip64 = tamano * 1.05 > LIMITE_ZIP64
+        extra = (struct.pack("<2H2Q", 1, 16, 0, 0) if zip64 else b"") + extra_cifrado
+        if zip64:
+            version = max(version, 45)
+        relleno = 0xFFFFFFFF if zip64 else 0
+        desplazamiento = self._escribir_registro(_ZIP_CABECERA_LOCAL.pack(
+            b"PK\x03\x04", version, 0, banderas, metodo_cabecera, hora, fecha, 0, relleno, relleno,
+            len(nombre_bytes), len(extra)) + nombre_bytes + extra)
+        self._miembro = {
+            "nombre": nombre_bytes, "banderas": banderas, "metodo": metodo_cabecera, "hora": hora,
+            "fecha": fecha, "modo": modo, "zip64": zip64, "version": version, "extra": extra_cifrado,
+            "disco": self._disco, "desplazamiento": desplazamiento,
+            "descriptor": descriptor, "cifrador": cifrador, "comprimido": 0
+        }
+        if cifrador is not None:
+            self._escribir_datos(cifrador.cabecera)
+            self._miembro["comprimido"] += len(cifrador.cabecera)
+
+    def escribir(self, datos):
+        """Añade un trozo del contenido (ya comprimido) del miembro en curso."""
+        cifrador = self._miembro["cifrador"]
+        if cifrador is not None:
+            datos = cifrador.cifrar(bytes(datos))
+        self._escribir_datos(datos)
+        self._miembro["comprimido"] += len(datos)
+
+    def terminar_miembro(self, crc, tamano):
+        """
+        Completa el miembro en curso (cabecera local o descriptor de datos).
+        
+        Args:
+            crc (int): CRC-32 del contenido sin comprimir.
+            tamano (int): Tamaño real sin comprimir.
+            
+        Raises:
+            RuntimeError: Si el miembro superó el límite sin haber reservado ZIP64
+                (el archivo creció mientras se comprimía).
+        """
+        miembro = self._miembro
+        cifrador = miembro.pop("cifrador")
+        if cifrador is not None:
+            final_cifrado = cifrador.final()
+            self._escribir_datos(final_cifrado)
+            miembro["comprimido"] += len(final_cifrado)
+            crc = cifrador.crc(crc)
+        comprimido = miembro["comprimido"]
+        if not miembro["zip64"] and max(tamano, comprimido) > LIMITE_ZIP64:
+            raise RuntimeError(f"El archivo creció durante la compresión: {miembro['nombre'].decode('utf-8')}")
+        if miembro["descriptor"]:
+            formato = "<4sL2Q" if miembro["zip64"] else "<4s3L"
+            self._escribir_registro(struct.pack(formato, b"PK\x07\x08", crc, comprimido, tamano))
+        elif miembro["zip64"]:
+            self._parchear(miembro["disco"], miembro["desplazamiento"] + 14, struct.pack("<L", crc))
+            self._parchear(miembro["disco"], miembro["desplazamiento"] + 30 + len(miembro["nombre"]) + 4,
+                           struct.pack("<2Q", tamano, comprimido))
+        else:
+            self._parchear(miembro["disco"], miembro["desplazamiento"] + 14,
+                           struct.pack("<3L", crc, comprimido, tamano))
+        miembro.update(crc=crc, tamano=tamano)
+        self.miembros.append(miembro)
+        self._miembro = None
+
+    def cerrar(self):
+        """
+        Escribe el directorio central y cierra el archivo.
+        
+        Returns:
+            list: Rutas de las partes en el orden en que se leen (una sola sin particionado).
+        """
+        disco_central = inicio_central = None
+        tamano_central = 0
+        registros_por_disco = {}
+        sistema = 0 if sys.platform == "win32" else 3
+        for miembro in self.miembros:
+            tamano, comprimido, desplazamiento = miembro["tamano"], miembro["comprimido"], miembro["desplazamiento"]
+            extra = []
+            if tamano > LIMITE_ZIP64 or comprimido > LIMITE_ZIP64:
+                extra += [tamano, comprimido]
+                tamano = comprimido = 0xFFFFFFFF
+            if desplazamiento > LIMITE_ZIP64:
+                extra.append(desplazamiento)
+                desplazamiento = 0xFFFFFFFF
+            extra_bytes = struct.pack(f"<2H{len(extra)}Q", 1, 8 * len(extra), *extra) if extra else b""
+            extra_bytes += miembro["extra"]
+            version = max(miembro["version"], 45 if extra else 20)
+            registro = _ZIP_CABECERA_CENTRAL.pack(
+                b"PK\x01\x02", version, sistema, version, 0, miembro["banderas"], miembro["metodo"],
+                miembro["hora"], miembro["fecha"], miembro["crc"], comprimido, tamano,
+                len(miembro["nombre"]), len(extra_bytes), 0, miembro["disco"], 0,
+                (miembro["modo"] & 0xFFFF) << 16, desplazamiento) + miembro["nombre"] + extra_bytes
+            posicion = self._escribir_registro(registro)
+            if inicio_central is None:
+                disco_central, inicio_central = self._disco, posicion
+            registros_por_disco[self._disco] = registros_por_disco.get(self._disco, 0) + 1
+            tamano_central += len(registro)
+        if inicio_central is None:
+            disco_central, inicio_central = self._disco, self._f.tell()
+        total = len(self.miembros)
+        zip64 = (total >= LIMITE_MIEMBROS_ZIP or tamano_central > LIMITE_ZIP64 or inicio_central > LIMITE_ZIP64
+                 or self._disco >= 0xFFFF)
+        # Los registros finales van juntos: el localizador debe quedar justo antes del fin
+        self._reservar(_ZIP_FIN.size + (_ZIP64_FIN.size + _ZIP64_LOCALIZADOR.size if zip64 else 0))
+        en_disco = registros_por_disco.get(self._disco, 0)
+        cola = b""
+        if zip64:
+            posicion64 = self._f.tell()
+            cola += _ZIP64_FIN.pack(b"PK\x06\x06", 44, 45, 45, self._disco, disco_central, en_disco, total,
+                                    tamano_central, inicio_central)
+            cola += _ZIP64_LOCALIZADOR.pack(b"PK\x06\x07", self._disco, posicion64, self._disco + 1)
+        cola += _ZIP_FIN.pack(b"PK\x05\x06", min(self._disco, 0xFFFF), min(disco_central, 0xFFFF),
+                              min(en_disco, 0xFFFF), min(total, 0xFFFF), min(tamano_central, 0xFFFFFFFF),
+                              min(inicio_central, 0xFFFFFFFF), 0)
+        self._f.write(cola)
+        self._f.close()
+        if self.tamano_parte:
+            if self._disco == 0:
+                # Todo cupo en una parte: la firma pasa a ser la de "dividido en un solo segmento"
+                with open(self._ruta_parte(0), "r+b") as f:
+                    f.write(b"PK00")
+            os.replace(self._ruta_parte(self._disco), self.ruta)
+        self.partes.append(self.ruta)
+        return list(self.partes)
+
+    def abortar(self):
+        """Cierra y borra el ZIP (o las partes) a medias."""
+        self._f.close()
+        for disco in range(self._disco + 1):
+            try:
+                os.remove(self._ruta_parte(disco))
+            except FileNotFoundError:
+                pass
+
+def _deflate_trozo(datos, nivel, diccionario, final):
+    """
+    Comprime un trozo como deflate crudo. Los trozos intermedios terminan con
+    Z_SYNC_FLUSH (alineados a byte y sin marca de fin), así que concatenados forman
+    un único flujo deflate válido; 'diccionario' son los últimos 32 KiB del trozo
+    anterior para no perder compresión en las fronteras.
+    
+    Returns:
+        tuple: (datos comprimidos, segundos de CPU usados).
+    """
+    inicio = time.thread_time()
+    if diccionario:
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, -15, zdict=diccionario)
+    else:
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, -15)
+    comprimido = compresor.compress(datos) + compresor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+    return comprimido, time.thread_time() - inicio
+
+def _ratio_muestra(datos):
+    """
+    Proporción que ocupa, comprimida a nivel 1, una muestra del centro de 'datos'
+    (el centro evita cabeceras y miniaturas, que se comprimen mejor que el resto).
+    """
+    inicio = max(0, len(datos) // 2 - MUESTRA_COMPRESION // 2)
+    muestra = datos[inicio:inicio + MUESTRA_COMPRESION]
+    if not muestra:
+        return 1.0
+    return len(zlib.compress(muestra, 1)) / len(muestra)
+
+_cpu_por_byte = {}
+
+def _cpu_por_byte_deflate(nivel):
+    """Segundos de CPU por byte que cuesta deflate con datos incompresibles (se mide una vez por nivel)."""
+    if nivel not in _cpu_por_byte:
+        datos = os.urandom(TROZO_ZIP)
+        _cpu_por_byte[nivel] = _deflate_trozo(datos, nivel, None, True)[1] / len(datos)
+    return _cpu_por_byte[nivel]
+
+def _metodo_miembro(ruta, primer_trozo, metodo):
+    """
+    Elige el método de un miembro.
+    
+    Returns:
+        tuple: (ZIP_STORED o ZIP_DEFLATED, proporción estimada de deflate o None).
+    """
+    if metodo != "auto":
+        return metodo, None
+    ratio = _ratio_muestra(primer_trozo)
+    if os.path.splitext(ruta)[1].lower() in EXT_YA_COMPRIMIDAS or ratio >= UMBRAL_ALMACENAR:
+        return ZIP_STORED, ratio
+    return ZIP_DEFLATED, ratio
+
+def _escribir_almacenado(escritor, f, primer_trozo, progreso=None):
+    """
+    Copia un archivo sin comprimir al ZIP: el primer trozo ya leído y el resto en
+    bloques grandes sobre un único búfer reutilizado.
+    
+    Returns:
+        tuple: (crc, bytes copiados).
+    """
+    crc = zlib.crc32(primer_trozo)
+    escritor.escribir(primer_trozo)
+    copiados = len(primer_trozo)
+    if len(primer_trozo) < TROZO_ZIP:
+        return crc, copiados
+    bufer = bytearray(BUFFER_COPIA)
+    vista = memoryview(bufer)
+    while True:
+        if progreso is not None:
+            progreso.comprobar_cancelacion()
+        leidos = f.readinto(bufer)
+        if not leidos:
+            return crc, copiados
+        crc = zlib.crc32(vista[:leidos], crc)
+        escritor.escribir(vista[:leidos])
+        copiados += leidos
+
+class _TramoArchivo:
+    """Lee solo 'longitud' bytes de un archivo abierto a partir de su posición actual."""
+
+    def __init__(self, f, longitud):
+        self._f = f
+        self._restante = longitud
+
+    def read(self, n):
+        datos = self._f.read(min(n, self._restante))
+        self._restante -= len(datos)
+        return datos
+
+    def readinto(self, bufer):
+        leidos = self._f.readinto(memoryview(bufer)[:self._restante])
+        self._restante -= leidos
+        return leidos
+
+def _escribir_entradas(escritor, entradas, nivel, workers, progreso, metodo):
+    """
+    Comprime y añade a 'escritor' una lista de entradas (ruta absoluta, ruta en el
+    ZIP, tramo), donde tramo es None (el archivo entero) o (inicio, longitud).
+    
+    Returns:
+        tuple: (segundos de CPU de deflate, política de almacenamiento de escribir_zip).
+    """
+    # Cola ordenada de acciones: ('inicio', ...), ('trozo', futuro) y ('fin', ...)
+    pendientes = deque()
+    cpu_deflate = [0.0]
+    politica = {"almacenados": 0, "bytes_almacenados": 0, "cpu_ahorrada_s": 0.0, "bytes_ahorrados": 0}
+
+    def procesar(accion):
+        if accion[0] == "trozo":
+            comprimido, cpu = accion[1].result()
+            escritor.escribir(comprimido)
+            cpu_deflate[0] += cpu
+        elif accion[0] == "inicio":
+            _, nombre, tamano, stat = accion
+            escritor.iniciar_miembro(nombre, tamano, stat.st_mtime, stat.st_mode, ZIP_DEFLATED)
+        else:
+            _, nombre, crc, leidos = accion
+            escritor.terminar_miembro(crc, leidos)
+            if progreso is not None:
+                progreso.archivo_hecho(nombre, leidos)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for abs_path, rel_path, tramo in entradas:
+            with open(abs_path, "rb") as archivo:
+                stat = os.fstat(archivo.fileno())
+                tamano = stat.st_size
+                f = archivo
+                if tramo is not None:
+                    archivo.seek(tramo[0])
+                    tamano = tramo[1]
+                    f = _TramoArchivo(archivo, tamano)
+                actual = f.read(TROZO_ZIP)
+                metodo_miembro, ratio = _metodo_miembro(abs_path, actual, metodo)
+                if metodo_miembro == ZIP_STORED:
+                    # Se vacía la cola para respetar el orden y se copia directamente
+                    while pendientes:
+                        procesar(pendientes.popleft())
+                    escritor.iniciar_miembro(rel_path, tamano, stat.st_mtime, stat.st_mode, ZIP_STORED)
+                    crc, leidos = _escribir_almacenado(escritor, f, actual, progreso)
+                    escritor.terminar_miembro(crc, leidos)
+                    if progreso is not None:
+                        progreso.archivo_hecho(rel_path, leidos)
+                    if ratio is not None:
+                        politica["almacenados"] += 1
+                        politica["bytes_almacenados"] += leidos
+                        politica["bytes_ahorrados"] += round(leidos * ratio) - leidos
+                    continue
+                pendientes.append(("inicio", rel_path, tamano, stat))
+                crc = leidos = 0
+                diccionario = None
+                while True:
+                    if progreso is not None:
+                        progreso.comprobar_cancelacion()
+                    # Se lee uno por delante para saber cuál es el último trozo
+                    siguiente = f.read(TROZO_ZIP) if len(actual) == TROZO_ZIP else b""
+                    crc = zlib.crc32(actual, crc)
+                    leidos += len(actual)
+                    pendientes.append(("trozo", executor.submit(
+                        _deflate_trozo, actual, nivel, diccionario, not siguiente)))
+                    while len(pendientes) > workers * 4:
+                        procesar(pendientes.popleft())
+                    if not siguiente:
+                        break
+                    diccionario = actual[-32768:]
+                    actual = siguiente
+            pendientes.append(("fin", rel_path, crc, leidos))
+        while pendientes:
+            procesar(pendientes.popleft())
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return cpu_deflate[0], politica
+
+def _resumen_zip(partes, escritores, inicio, cpu_deflate, politica, nivel):
+    """Resumen que devuelven escribir_zip y escribir_zip_independiente."""
+    if politica["bytes_almacenados"]:
+        politica["cpu_ahorrada_s"] = round(politica["bytes_almacenados"] * _cpu_por_byte_deflate(nivel), 3)
+    miembros = [miembro for escritor in escritores for miembro in escritor.miembros]
+    return {
+        "partes": partes,
+        "miembros": len(miembros),
+        "bytes_originales": sum(m["tamano"] for m in miembros),
+        "bytes_comprimidos": sum(m["comprimido"] for m in miembros),
+        "segundos": round(time.perf_counter() - inicio, 3),
+        "cpu_deflate_s": round(cpu_deflate, 3),
+        "politica": politica
+    }
+
+def escribir_zip(zip_path, files, rel_files, nivel=NIVEL_ZIP, max_workers=None, progreso=None, metodo="auto",
+                 tamano_parte=None, password=None, cifrado=None):
+    """
+    Escribe un ZIP comprimiendo en paralelo y sin recomprimir lo que ya va comprimido.
+    
+    Cada archivo se parte en trozos de TROZO_ZIP que se comprimen en un pool de
+    hilos (zlib libera el GIL), tanto los de un archivo grande como los de muchos
+    archivos pequeños seguidos. Los resultados se escriben en el mismo orden que
+    los archivos, con una ventana limitada de trozos en vuelo para acotar la memoria.
+    
+    Con metodo='auto', los formatos de EXT_YA_COMPRIMIDAS y los archivos cuya
+    muestra no se comprime se guardan con ZIP_STORED, copiados en bloques grandes
+    sin pasar por el pool.
+    
+    Con 'tamano_parte' el ZIP se divide en partes de ese tamaño mientras se escribe
+    y con 'password' cada miembro se cifra (ver EscritorZip).
+    
+    Args:
+        zip_path (str): Ruta del ZIP a crear.
+        files (list): Rutas absolutas de los archivos.
+        rel_files (list): Rutas de cada archivo dentro del ZIP.
+        nivel (int): Nivel de compresión deflate (1-9).
+        max_workers (int|None): Hilos de compresión (por defecto, uno por núcleo).
+        progreso (ReporteProgreso|None): Recibe la fase 'compresion' y cada archivo terminado.
+        metodo (str|int): 'auto' (decide por miembro), ZIP_DEFLATED o ZIP_STORED.
+        tamano_parte (int|None): Tamaño máximo de cada parte en bytes (None = un solo archivo).
+        password (str|None): Contraseña para cifrar los miembros.
+        cifrado (str|None): 'aes', 'zipcrypto' o None (AES si está instalado 'cryptography').
+    
+    Returns:
+        dict: Partes generadas, miembros, bytes originales y comprimidos, segundos, CPU de deflate y,
+            en 'politica', cuántos miembros se guardaron sin comprimir y la CPU y el
+            tamaño estimados que eso ahorró (negativo si deflate habría ocupado menos).
+    
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar() (el ZIP a medias se borra).
+    """
+    inicio = time.perf_counter()
+    if progreso is not None:
+        progreso.fase("compresion", len(files), sum(os.path.getsize(f) for f in files))
+    escritor = EscritorZip(zip_path, tamano_parte, password, cifrado)
+    try:
+        cpu_deflate, politica = _escribir_entradas(
+            escritor, [(f, r, None) for f, r in zip(files, rel_files)], nivel,
+            max_workers or WORKERS_COMPRESION, progreso, metodo)
+        partes = escritor.cerrar()
+    except BaseException:
+        escritor.abortar()
+        raise
+    return _resumen_zip(partes, [escritor], inicio, cpu_deflate, politica, nivel)
+
+# --- Partes Independientes ---
+
+# Directorio central final de cada parte (con ZIP64 por si acaso)
+_RESERVA_FIN_ZIP = _ZIP_FIN.size + _ZIP64_FIN.size + _ZIP64_LOCALIZADOR.size
+
+def _cota_miembro(nombre, tamano):
+    """
+    Bytes que puede ocupar como máximo un miembro dentro de un ZIP: cabeceras local
+    y central con ZIP64 y cifrado, cabecera y cierre del cifrado, descriptor de
+    datos y el contenido en el peor caso de deflate (menos de un 0,1 % más).
+    """
+    return tamano + (tamano >> 10) + 2 * len(nombre.encode("utf-8")) + 256
+
+def _estimar_miembro(ruta, nombre, tamano, metodo):
+    """
+    Lo que ocupará previsiblemente un miembro: la cota del peor caso si se guardará
+    sin comprimir y, si no, lo que indica una muestra comprimida, con un 10 % de margen.
+    """
+    cota = _cota_miembro(nombre, tamano)
+    if metodo == ZIP_STORED or (metodo == "auto" and os.path.splitext(ruta)[1].lower() in EXT_YA_COMPRIMIDAS):
+        return cota
+    # La misma muestra que mirará _metodo_miembro: el centro del primer trozo
+    with open(ruta, "rb") as f:
+        f.seek(max(0, min(tamano, TROZO_ZIP) // 2 - MUESTRA_COMPRESION // 2))
+        ratio = _ratio_muestra(f.read(MUESTRA_COMPRESION))
+    if metodo == "auto" and ratio >= UMBRAL_ALMACENAR:
+        return cota
+    return min(cota, round(tamano * ratio * 1.1) + _cota_miembro(nombre, 0))
+
+def _repartir(elementos, capacidad, huecos=()):
+    """
+    Best-fit decreasing: cada elemento (tamaño, orden, trozo, entrada) va a la parte
+    con menos hueco libre donde quepa, empezando por los más grandes. 'huecos' es el
+    espacio libre de partes ya empezadas, que son las primeras de la lista devuelta
+    (aunque se queden vacías).
+    
+    Returns:
+        list: Partes, cada una con sus entradas (orden, trozo, entrada) en el orden original.
+    """
+    partes = [[] for _ in huecos]
+    # (espacio libre, índice de parte), ordenada para buscar con bisect
+    libres = sorted((libre, indice) for indice, libre in enumerate(huecos) if libre >= _cota_miembro("", 0))
+    for elemento in sorted(elementos, key=lambda e: e[0], reverse=True):
+        posicion = bisect.bisect_left(libres, (elemento[0], -1))
+        if posicion < len(libres):
+            libre, indice = libres.pop(posicion)
+        else:
+            libre, indice = capacidad, len(partes)
+            partes.append([])
+        partes[indice].append(elemento)
+        libre -= elemento[0]
+        if libre >= _cota_miembro("", 0):
+            bisect.insort(libres, (libre, indice))
+    for parte in partes:
+        parte.sort(key=lambda e: (e[1], e[2]))
+    nuevas = sorted(partes[len(huecos):], key=lambda parte: (parte[0][1], parte[0][2]))
+    return [[(e[1], e[2], e[3]) for e in parte] for parte in partes[:len(huecos)] + nuevas]
+
+def _longitud_trozo(nombre, capacidad, ratio=None):
+    """
+    Bytes de un archivo que caben en el trozo 'nombre' de una parte con 'capacidad'
+    libre: los que caben aunque no se compriman o, si se da 'ratio' (comprimido entre
+    original) y es menor que 1, los que se estima que caben comprimidos.
+    """
+    hueco = capacidad - _cota_miembro(nombre, 0)
+    longitud = hueco * 1024 // 1025
+    while longitud > 0 and _cota_miembro(nombre, longitud) > capacidad:
+        longitud -= 1
+    if ratio is not None and 0 < ratio < 1:
+        longitud = max(longitud, int(hueco / ratio))
+    return longitud
+
+def _planificar_partes(files, rel_files, tamanos, tamano_parte, estimaciones):
+    """
+    Reparte los archivos en partes de 'tamano_parte' según lo que se estima que
+    ocupará cada uno comprimido. Solo se trocea un archivo que no cabe comprimido
+    ni en una parte vacía: sus trozos, medidos también con la estimación, van en
+    partes consecutivas, y los demás archivos se reparten después con best-fit
+    decreasing, empezando por el hueco que deja el último trozo de cada troceado.
+    
+    Returns:
+        tuple: (troceados, partes). Cada troceado es (orden, ruta absoluta, ruta en
+            el ZIP, tamaño, longitud de los trozos, cola), con cola la lista de
+            archivos que van en la parte de su último trozo; cada parte es una lista
+            de (orden, 0, entrada) con entrada = (ruta absoluta, ruta en el ZIP, None).
+    
+    Raises:
+        ValueError: Si un nombre es tan largo que no cabe ni un byte en una parte.
+    """
+    capacidad = tamano_parte - _RESERVA_FIN_ZIP
+    elementos = []
+    troceados = []
+    huecos = []
+    for orden, (abs_path, rel_path, tamano) in enumerate(zip(files, rel_files, tamanos)):
+        if estimaciones[orden] <= capacidad:
+            elementos.append((estimaciones[orden], orden, 0, (abs_path, rel_path, None)))
+            continue
+        nombre_largo = rel_path + ".000000"
+        ratio = (estimaciones[orden] - _cota_miembro(rel_path, 0)) / tamano
+        longitud = _longitud_trozo(nombre_largo, capacidad, ratio)
+        if longitud <= 0:
+            raise ValueError(f"Las partes son demasiado pequeñas para {rel_path}")
+        resto = tamano - (-(-tamano // longitud) - 1) * longitud
+        ultimo = _cota_miembro(nombre_largo, resto)
+        if ratio < 1:
+            ultimo = min(ultimo, round(resto * ratio) + _cota_miembro(nombre_largo, 0))
+        troceados.append((orden, abs_path, rel_path, tamano, longitud))
+        huecos.append(capacidad - ultimo)
+    partes = _repartir(elementos, capacidad, huecos)
+    troceados = [troceado + (cola,) for troceado, cola in zip(troceados, partes)]
+    return troceados, partes[len(troceados):]
+
+def escribir_zip_independiente(zip_path, files, rel_files, tamano_parte, nivel=NIVEL_ZIP, max_workers=None,
+                               progreso=None, metodo="auto", password=None, cifrado=None, verificar=True):
+    """
+    Escribe un ZIP en partes independientes: cada parte es un ZIP completo que se
+    abre y se extrae sin las demás, así que perder una no estropea el resto y se
+    puede empezar a extraer la primera mientras las otras siguen subiendo.
+    
+    Todo se decide con lo que se estima que ocupará cada archivo comprimido (una
+    muestra, como la que decide el método). Solo se trocea un archivo que ni así
+    cabe en una parte vacía: sus trozos se guardan como 'nombre.001', 'nombre.002',
+    ..., en partes consecutivas, y 7-Zip los une al abrir el primero (también 'cat'
+    o 'copy /b'). Los demás archivos se reparten con best-fit decreasing, empezando
+    por el hueco que deja el último trozo, y dentro de cada parte conservan su
+    orden original. Si una parte se pasa de 'tamano_parte' porque la muestra
+    engañó, se reparte de nuevo con los tamaños comprimidos reales (un trozo se
+    acorta; un archivo que no cabe ni solo se trocea), así que ninguna parte supera
+    el límite.
+    
+    Las partes se escriben a la vez, repartiendo entre ellas los hilos de
+    compresión (los trozos de un mismo archivo, uno tras otro), y cada una se
+    comprueba con verificar_zip en cuanto se cierra.
+    
+    Args:
+        zip_path (str): Ruta del ZIP; con varias partes se llaman 'nombre_parte01.zip', ...
+        files (list): Rutas absolutas de los archivos.
+        rel_files (list): Rutas de cada archivo dentro del ZIP.
+        tamano_parte (int): Tamaño máximo de cada parte en bytes (al menos 64 KiB).
+        nivel (int): Nivel de compresión deflate (1-9).
+        max_workers (int|None): Hilos de compresión en total (por defecto, uno por núcleo).
+        progreso (ReporteProgreso|None): Recibe la fase 'compresion' y cada miembro terminado.
+        metodo (str|int): 'auto' (decide por miembro), ZIP_DEFLATED o ZIP_STORED.
+        password (str|None): Contraseña para cifrar los miembros.
+        cifrado (str|None): 'aes', 'zipcrypto' o None (AES si está instalado 'cryptography').
+        verificar (bool): Releer y comprobar cada parte al terminarla.
+    
+    Returns:
+        dict: Lo mismo que escribir_zip, más 'divididos' (archivos troceados entre
+            partes), 'repartidas' (partes que hubo que volver a escribir porque se
+            pasaban) y 'verificadas' (partes comprobadas).
+    
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar() (se borran todas las partes).
+        zipfile.BadZipFile: Si una parte no supera la verificación (se borran todas las partes).
+    """
+    if tamano_parte < 64 * 1024:
+        raise ValueError("Las partes deben ser de al menos 64 KiB")
+    inicio = time.perf_counter()
+    workers = max_workers or WORKERS_COMPRESION
+    tamanos = [os.path.getsize(f) for f in files]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        estimaciones = list(executor.map(partial(_estimar_miembro, metodo=metodo), files, rel_files, tamanos))
+    troceados, planes = _planificar_partes(files, rel_files, tamanos, tamano_parte, estimaciones)
+    if not troceados and not planes:
+        planes = [[]]
+    if progreso is not None:
+        miembros = sum(len(plan) for plan in planes) + sum(-(-t[3] // t[4]) + len(t[5]) for t in troceados)
+        progreso.fase("compresion", miembros, sum(tamanos))
+    capacidad = tamano_parte - _RESERVA_FIN_ZIP
+    concurrentes = min(len(troceados) + len(planes), workers)
+    hilos_por_parte = max(1, workers // concurrentes)
+    # Se escriben con nombres provisionales: una parte repartida de nuevo cambia la numeración
+    provisionales = []
+    contadores = {"divididos": len(troceados), "repartidas": 0}
+    lock = threading.Lock()
+
+    def nueva_parte(entradas):
+        with lock:
+            ruta = f"{zip_path}.{len(provisionales)}.tmp"
+            provisionales.append(ruta)
+        escritor = EscritorZip(ruta, password=password, cifrado=cifrado)
+        try:
+            cpu, politica = _escribir_entradas(escritor, entradas, nivel, hilos_por_parte, progreso, metodo)
+            escritor.cerrar()
+        except BaseException:
+            escritor.abortar()
+            raise
+        if os.path.getsize(ruta) > tamano_parte:
+            os.remove(ruta)
+            with lock:
+                contadores["repartidas"] += 1
+            return None, escritor
+        if verificar:
+            verificar_zip(ruta, password)
+        return (ruta, escritor, cpu, politica), escritor
+
+    def repartir_de_nuevo(plan, miembros):
+        # Con lo que ocupa de verdad cada miembro; el que no cabe ni solo se trocea
+        elementos = []
+        hechas = []
+        for (orden, trozo, entrada), miembro in zip(plan, miembros):
+            ocupa = miembro["comprimido"] + _cota_miembro(entrada[1], 0)
+            if ocupa <= capacidad:
+                elementos.append((ocupa, orden, trozo, entrada))
+                continue
+            with lock:
+                contadores["divididos"] += 1
+            nombre_largo = entrada[1] + ".000000"
+            longitud = _longitud_trozo(nombre_largo, capacidad, miembro["comprimido"] / miembro["tamano"] * 1.05)
+            hechas += escribir_troceado(orden, entrada[0], entrada[1], miembro["tamano"], longitud, [])
+        for subplan in _repartir(elementos, capacidad):
+            parte, _ = nueva_parte([e[2] for e in subplan])
+            if parte is None:
+                raise RuntimeError(f"Un archivo cambió mientras se comprimía la parte de {subplan[0][2][1]}")
+            hechas.append((subplan[0][:2], *parte))
+        return hechas
+
+    def escribir_parte(plan):
+        parte, escritor = nueva_parte([e[2] for e in plan])
+        if parte is None:
+            return repartir_de_nuevo(plan, escritor.miembros)
+        return [(plan[0][:2] if plan else (0, 0), *parte)]
+
+    def escribir_troceado(orden, abs_path, rel_path, tamano, longitud, cola):
+        # Un trozo por parte, uno tras otro; el último comparte parte con 'cola'
+        nombre_largo = rel_path + ".000000"
+        segura = _longitud_trozo(nombre_largo, capacidad)
+        if segura <= 0:
+            raise ValueError(f"Las partes son demasiado pequeñas para {rel_path}")
+        ancho = max(3, len(str(-(-tamano // segura))))
+        hechas = []
+        inicio, indice = 0, 1
+        while inicio < tamano:
+            tramo = (inicio, min(longitud, tamano - inicio))
+            entrada = (abs_path, f"{rel_path}.{indice:0{ancho}d}", tramo)
+            extra = cola if inicio + tramo[1] == tamano else []
+            parte, escritor = nueva_parte([entrada] + [e[2] for e in extra])
+            if parte is None:
+                comprimido = escritor.miembros[0]["comprimido"]
+                if comprimido + _cota_miembro(entrada[1], 0) > capacidad:
+                    if tramo[1] <= segura:
+                        raise RuntimeError(f"{abs_path} cambió mientras se comprimía")
+                    # Se comprime peor de lo estimado: trozos más cortos según lo que ocupó este
+                    longitud = _longitud_trozo(nombre_largo, capacidad, comprimido / tramo[1] * 1.05)
+                    continue
+                # El trozo cabe solo: lo que lo acompañaba se reparte aparte
+                miembros = escritor.miembros[1:]
+                parte, _ = nueva_parte([entrada])
+                if parte is None:
+                    raise RuntimeError(f"{abs_path} cambió mientras se comprimía")
+                hechas += repartir_de_nuevo(extra, miembros)
+            hechas.append(((orden, indice), *parte))
+            inicio += tramo[1]
+            indice += 1
+        return hechas
+
+    executor = ThreadPoolExecutor(max_workers=concurrentes)
+    futuros = ([executor.submit(escribir_troceado, *troceado) for troceado in troceados]
+               + [executor.submit(escribir_parte, plan) for plan in planes])
+    try:
+        hechas = [parte for futuro in futuros for parte in futuro.result()]
+    except BaseException:
+        # Las partes en curso terminan o fallan por su cuenta; después se borran todas
+        executor.shutdown(cancel_futures=True)
+        for ruta in provisionales:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        raise
+    executor.shutdown()
+    # Por archivo y trozo: los trozos de un archivo quedan en partes consecutivas
+    hechas = [parte[1:] for parte in sorted(hechas, key=lambda parte: parte[0])]
+    if len(hechas) > 1:
+        base = os.path.splitext(zip_path)[0]
+        ancho = max(2, len(str(len(hechas))))
+        rutas = [f"{base}_parte{n:0{ancho}d}.zip" for n in range(1, len(hechas) + 1)]
+    else:
+        rutas = [zip_path]
+    for (provisional, *_), ruta in zip(hechas, rutas):
+        os.replace(provisional, ruta)
+    politica = {"almacenados": 0, "bytes_almacenados": 0, "cpu_ahorrada_s": 0.0, "bytes_ahorrados": 0}
+    for *_, politica_parte in hechas:
+        for clave in ("almacenados", "bytes_almacenados", "bytes_ahorrados"):
+            politica[clave] += politica_parte[clave]
+    resumen = _resumen_zip(rutas, [h[1] for h in hechas], inicio, sum(h[2] for h in hechas), politica, nivel)
+    resumen["divididos"] = contadores["divididos"]
+    resumen["repartidas"] = contadores["repartidas"]
+    resumen["verificadas"] = len(rutas) if verificar else 0
+    return resumen
+
+def _verificar_miembro_aes(f, info, password):
+    """Comprueba un miembro AES de WinZip: verificador de la clave, HMAC y contenido."""
+    import zipfile
+    if not password:
+        raise RuntimeError(f"{info.filename} está cifrado y hace falta la contraseña")
+    metodo = ZIP_STORED
+    extra = info.extra
+    posicion = 0
+    while posicion + 4 <= len(extra):
+        campo, tamano = struct.unpack_from("<2H", extra, posicion)
+        if campo == 0x9901:
+            metodo = struct.unpack_from("<H", extra, posicion + 9)[0]
+        posicion += 4 + tamano
+    f.seek(info.header_offset)
+    cabecera = f.read(_ZIP_CABECERA_LOCAL.size)
+    if cabecera[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Cabecera local dañada: {info.filename}")
+    campos = _ZIP_CABECERA_LOCAL.unpack(cabecera)
+    f.seek(campos[-2] + campos[-1], os.SEEK_CUR)
+    sal = f.read(16)
+    descifrador = CifradoAES(password, 0, sal)
+    if f.read(2) != descifrador.cabecera[16:]:
+        raise RuntimeError(f"Contraseña incorrecta para {info.filename}")
+    descompresor = zlib.decompressobj(-15) if metodo == ZIP_DEFLATED else None
+    crc = tamano = 0
+    restante = info.compress_size - 28
+    try:
+        while restante > 0:
+            datos = f.read(min(BUFFER_COPIA, restante))
+            if not datos:
+                raise zipfile.BadZipFile(f"Miembro truncado: {info.filename}")
+            restante -= len(datos)
+            claro = descifrador.descifrar(datos)
+            if descompresor is not None:
+                claro = descompresor.decompress(claro)
+            crc = zlib.crc32(claro, crc)
+            tamano += len(claro)
+        if descompresor is not None:
+            claro = descompresor.flush()
+            crc = zlib.crc32(claro, crc)
+            tamano += len(claro)
+    except zlib.error as e:
+        raise zipfile.BadZipFile(f"Datos dañados en {info.filename}: {e}") from e
+    if not hmac.compare_digest(f.read(10), descifrador.final()):
+        raise zipfile.BadZipFile(f"El HMAC no coincide: {info.filename}")
+    # AE-2 no guarda el CRC (queda a 0); AE-1 sí
+    if tamano != info.file_size or (info.CRC and crc != info.CRC):
+        raise zipfile.BadZipFile(f"Contenido incorrecto: {info.filename}")
+
+def verificar_zip(ruta, password=None):
+    """
+    Lee un ZIP entero y comprueba cada miembro: el CRC (sin cifrar o con ZipCrypto)
+    o, con AES, la contraseña, el HMAC y que el contenido tenga el tamaño guardado.
+    
+    Args:
+        ruta (str): Ruta del ZIP (completo; no sirve para una parte de un ZIP dividido).
+        password (str|None): Contraseña de los miembros cifrados.
+    
+    Returns:
+        int: Miembros comprobados.
+    
+    Raises:
+        zipfile.BadZipFile: Si el ZIP o algún miembro está dañado.
+        RuntimeError: Si falta la contraseña o es incorrecta (igual que zipfile).
+    """
+    import zipfile
+    pwd = password.encode("utf-8") if password else None
+    with zipfile.ZipFile(ruta) as archivo_zip, open(ruta, "rb") as f:
+        miembros = archivo_zip.infolist()
+        for info in miembros:
+            if info.compress_type == 99:
+                _verificar_miembro_aes(f, info, password)
+                continue
+            with archivo_zip.open(info, pwd=pwd) as miembro:
+                while miembro.read(BUFFER_COPIA):
+                    pass
+    return len(miembros)
+
 # --- Función Auxiliar del Sistema ---
 
 def abrir_carpeta(ruta):
@@ -406,6 +4451,7 @@ def abrir_carpeta(ruta):
         ruta (str): La ruta a la carpeta que se desea abrir.
     """
     try:
+        import subprocess
         if sys.platform == "win32":
             os.startfile(os.path.realpath(ruta))
         elif sys.platform == "darwin": # macOS
@@ -415,7 +4461,8 @@ def abrir_carpeta(ruta):
     except Exception as e:
         print(f"Error al intentar abrir la carpeta {ruta}: {e}")
 
-def comparar_y_mover_no_emparejados(carpeta_a, carpeta_b, carpeta_salida, mover_emparejados=False):
+def comparar_y_mover_no_emparejados(carpeta_a, carpeta_b, carpeta_salida, mover_emparejados=False,
+                                    opciones_transferencia=None, progreso=None):
     """
     Compara dos carpetas y mueve los archivos de la carpeta A que no tienen pareja en la carpeta B
     a la subcarpeta 'sin_pareja' dentro de la carpeta de salida. Opcionalmente, puede mover los emparejados.
@@ -425,12 +4472,17 @@ def comparar_y_mover_no_emparejados(carpeta_a, carpeta_b, carpeta_salida, mover_
         carpeta_b (str): Ruta de la segunda carpeta (para comparar).
         carpeta_salida (str): Ruta de la carpeta de salida.
         mover_emparejados (bool): Si es True, también mueve los emparejados a 'emparejadas'.
+        opciones_transferencia (dict|None): Argumentos extra para MotorTransferencia.
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
     
     Returns:
         dict: {'emparejados': [archivos], 'sin_pareja': [archivos]}
     """
-    archivos_a = [f for f in os.listdir(carpeta_a) if os.path.isfile(os.path.join(carpeta_a, f))]
-    archivos_b = [f for f in os.listdir(carpeta_b) if os.path.isfile(os.path.join(carpeta_b, f))]
+    progreso = _reporte_progreso(progreso)
+    if progreso is not None:
+        progreso.fase("analisis")
+    archivos_a = [registro.nombre for registro in escanear_carpeta(carpeta_a)]
+    archivos_b = [registro.nombre for registro in escanear_carpeta(carpeta_b)]
 
     # Normalizar a nombre base (sin extensión, lower)
     bases_a = {}
@@ -456,62 +4508,112 @@ def comparar_y_mover_no_emparejados(carpeta_a, carpeta_b, carpeta_salida, mover_
     os.makedirs(carpeta_emparejados, exist_ok=True)
     os.makedirs(carpeta_sin_pareja, exist_ok=True)
 
-    # Mover archivos sin pareja
-    for f in sin_pareja:
-        origen = os.path.join(carpeta_a, f)
-        destino = os.path.join(carpeta_sin_pareja, f)
-        shutil.move(origen, destino)
-
-    # Opcional: mover emparejados
-    if mover_emparejados:
-        for f in emparejados:
+    if progreso is not None:
+        progreso.fase("transferencia", len(sin_pareja) + (len(emparejados) if mover_emparejados else 0))
+    with MotorTransferencia(progreso=progreso, **(opciones_transferencia or {})) as motor:
+        # Mover archivos sin pareja
+        for f in sin_pareja:
             origen = os.path.join(carpeta_a, f)
-            destino = os.path.join(carpeta_emparejados, f)
-            shutil.move(origen, destino)
+            destino = os.path.join(carpeta_sin_pareja, f)
+            motor.transferir(origen, destino)
+
+        # Opcional: mover emparejados
+        if mover_emparejados:
+            for f in emparejados:
+                origen = os.path.join(carpeta_a, f)
+                destino = os.path.join(carpeta_emparejados, f)
+                motor.transferir(origen, destino)
 
+    if progreso is not None:
+        progreso.terminar()
     return {'emparejados': emparejados, 'sin_pareja': sin_pareja}
 
-def mover_no_emparejadas_ambas(carpetas, carpeta_salida):
+def mover_no_emparejadas_ambas(carpetas, carpeta_salida, opciones_transferencia=None, progreso=None):
     """
     Mueve todos los archivos sin pareja (por nombre base) de ambas carpetas a una sola carpeta 'sin_pareja' en la carpeta de salida.
     Args:
         carpetas (list): Lista de rutas de las dos carpetas a comparar.
         carpeta_salida (str): Ruta de la carpeta de salida.
+        opciones_transferencia (dict|None): Argumentos extra para MotorTransferencia.
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
     Returns:
         list: Lista de archivos movidos.
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar().
     """
     assert len(carpetas) == 2, "Se requieren exactamente dos carpetas."
+    progreso = _reporte_progreso(progreso)
+    if progreso is not None:
+        progreso.fase("analisis")
     archivos = []
     bases = [set(), set()]
     archivos_por_base = [{}, {}]
     # Recolectar archivos y bases
     for idx, carpeta in enumerate(carpetas):
-        for f in os.listdir(carpeta):
-            ruta = os.path.join(carpeta, f)
-            if os.path.isfile(ruta):
-                base = os.path.splitext(f)[0].lower()
-                bases[idx].add(base)
-                archivos_por_base[idx].setdefault(base, []).append(f)
+        for registro in escanear_carpeta(carpeta):
+            f = registro.nombre
+            base = os.path.splitext(f)[0].lower()
+            bases[idx].add(base)
+            archivos_por_base[idx].setdefault(base, []).append((f, registro.tamano))
     # Detectar sin pareja
     sin_pareja = []
     for idx in [0, 1]:
         otros = bases[1-idx]
         for base, files in archivos_por_base[idx].items():
             if base not in otros:
-                for f in files:
-                    sin_pareja.append((carpetas[idx], f))
+                for f, tamano in files:
+                    sin_pareja.append((carpetas[idx], f, tamano))
     # Mover a carpeta de salida
     carpeta_destino = os.path.join(carpeta_salida, 'sin_pareja')
     os.makedirs(carpeta_destino, exist_ok=True)
     movidos = []
-    for origen, f in sin_pareja:
-        ruta_origen = os.path.join(origen, f)
-        ruta_destino = os.path.join(carpeta_destino, f)
-        shutil.move(ruta_origen, ruta_destino)
-        movidos.append(f)
+    if progreso is not None:
+        progreso.fase("transferencia", len(sin_pareja), sum(tamano for _, _, tamano in sin_pareja))
+    with MotorTransferencia(progreso=progreso, **(opciones_transferencia or {})) as motor:
+        for origen, f, tamano in sin_pareja:
+            ruta_origen = os.path.join(origen, f)
+            ruta_destino = os.path.join(carpeta_destino, f)
+            motor.transferir(ruta_origen, ruta_destino, tamano)
+            movidos.append(f)
+    if progreso is not None:
+        progreso.terminar()
     return movidos
 
-def comprimir_carpeta_zip(carpeta, destino_dir, nombre_auto='nombre', password=None, split_size=None):
+def _comprimir_archivos(zip_path, files, rel_files, password, split_size, progreso, estadisticas, cifrado,
+                        independientes=False):
+    """
+    Parte común de comprimir_carpeta_zip y comprimir_varias_carpetas_zip.
+    
+    Los ZIP con contraseña y sin partes siguen saliendo de pyminizip (ZipCrypto,
+    que abre el explorador de Windows); el resto los escribe escribir_zip, que
+    además divide en partes mientras escribe, o escribir_zip_independiente.
+    """
+    if split_size and independientes:
+        resumen = escribir_zip_independiente(zip_path, files, rel_files, split_size * 1024 * 1024,
+                                             progreso=progreso, password=password, cifrado=cifrado)
+        partes = resumen["partes"]
+        if estadisticas is not None:
+            estadisticas.update(resumen)
+    elif password and not split_size:
+        if progreso is not None:
+            progreso.fase("compresion", len(files))
+        import pyminizip
+        pyminizip.compress_multiple(files, rel_files, zip_path, password, 5)
+        partes = [zip_path]
+    else:
+        # split_size en MB, None = sin particionar
+        resumen = escribir_zip(zip_path, files, rel_files, progreso=progreso,
+                               tamano_parte=split_size * 1024 * 1024 if split_size else None,
+                               password=password, cifrado=cifrado)
+        partes = resumen["partes"]
+        if estadisticas is not None:
+            estadisticas.update(resumen)
+    if progreso is not None:
+        progreso.terminar()
+    return partes
+
+def comprimir_carpeta_zip(carpeta, destino_dir, nombre_auto='nombre', password=None, split_size=None,
+                          progreso=None, estadisticas=None, cifrado=None, partes_independientes=False):
     """
     Comprime una carpeta a un archivo ZIP, con opción de contraseña y particionado.
     Args:
@@ -520,9 +4622,23 @@ def comprimir_carpeta_zip(carpeta, destino_dir, nombre_auto='nombre', password=N
         nombre_auto (str): 'nombre', 'fecha', 'editado'.
         password (str|None): Contraseña opcional.
         split_size (int|None): Tamaño de parte en MB (None = sin particionar).
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
+            Con contraseña y sin partes solo se avisa de la fase, no de cada archivo.
+        estadisticas (dict|None): Si se pasa, se guarda en él el resumen de escribir_zip
+            (incluida la CPU y el tamaño que ahorró no recomprimir los archivos ya comprimidos).
+        cifrado (str|None): Cifrado de los ZIP particionados con contraseña: 'aes',
+            'zipcrypto' o None (AES si está instalado 'cryptography').
+        partes_independientes (bool): Con split_size, cada parte es un ZIP completo que se
+            extrae por sí solo (ver escribir_zip_independiente) en lugar de un ZIP dividido.
     Returns:
-        list: Lista de rutas de archivos ZIP generados (1 o varias partes).
+        list: Lista de rutas de archivos ZIP generados (1 o varias partes, en orden:
+            archivo.z01, archivo.z02, ..., archivo.zip, o archivo_parte01.zip, ...
+            con partes independientes).
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar() (el ZIP a medias se borra).
+        zipfile.BadZipFile: Si una parte independiente no supera la verificación.
     """
+    progreso = _reporte_progreso(progreso)
     # Determinar nombre del ZIP
     base = os.path.basename(os.path.normpath(carpeta))
     if nombre_auto == 'nombre':
@@ -540,33 +4656,12 @@ def comprimir_carpeta_zip(carpeta, destino_dir, nombre_auto='nombre', password=N
     for root, dirs, filenames in os.walk(carpeta):
         for f in filenames:
             files.append(os.path.join(root, f))
-    # Comprimir
-    if password or split_size:
-        rel_files = [os.path.relpath(f, start=carpeta) for f in files]
-        # split_size en MB, None = sin particionar
-        pyminizip.compress_multiple(files, rel_files, zip_path, password or '', 5, split_size)
-    else:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for f in files:
-                arcname = os.path.relpath(f, start=carpeta)
-                zf.write(f, arcname)
-    # Si hay particionado, devolver todas las partes
-    if split_size:
-        # pyminizip nombra las partes como archivo.zip, archivo.z01, archivo.z02, ...
-        partes = [zip_path]
-        idx = 1
-        while True:
-            parte = zip_path[:-4] + f'.z{idx:02d}'
-            if os.path.exists(parte):
-                partes.append(parte)
-                idx += 1
-            else:
-                break
-        return partes
-    else:
-        return [zip_path]
+    rel_files = [os.path.relpath(f, start=carpeta) for f in files]
+    return _comprimir_archivos(zip_path, files, rel_files, password, split_size, progreso, estadisticas, cifrado,
+                               partes_independientes)
 
-def comprimir_varias_carpetas_zip(carpetas, destino_dir, nombre_auto='nombre', password=None, split_size=None):
+def comprimir_varias_carpetas_zip(carpetas, destino_dir, nombre_auto='nombre', password=None, split_size=None,
+                                  progreso=None, estadisticas=None, cifrado=None, partes_independientes=False):
     """
     Comprime varias carpetas en un solo archivo ZIP, con opción de contraseña y particionado.
     Args:
@@ -575,9 +4670,23 @@ def comprimir_varias_carpetas_zip(carpetas, destino_dir, nombre_auto='nombre', p
         nombre_auto (str): 'nombre', 'fecha', 'editado'.
         password (str|None): Contraseña opcional.
         split_size (int|None): Tamaño de parte en MB (None = sin particionar).
+        progreso (callable|ReporteProgreso|None): Función que recibe los eventos de progreso.
+            Con contraseña y sin partes solo se avisa de la fase, no de cada archivo.
+        estadisticas (dict|None): Si se pasa, se guarda en él el resumen de escribir_zip
+            (incluida la CPU y el tamaño que ahorró no recomprimir los archivos ya comprimidos).
+        cifrado (str|None): Cifrado de los ZIP particionados con contraseña: 'aes',
+            'zipcrypto' o None (AES si está instalado 'cryptography').
+        partes_independientes (bool): Con split_size, cada parte es un ZIP completo que se
+            extrae por sí solo (ver escribir_zip_independiente) en lugar de un ZIP dividido.
     Returns:
-        list: Lista de rutas de archivos ZIP generados (1 o varias partes).
+        list: Lista de rutas de archivos ZIP generados (1 o varias partes, en orden:
+            archivo.z01, archivo.z02, ..., archivo.zip, o archivo_parte01.zip, ...
+            con partes independientes).
+    Raises:
+        OperacionCancelada: Si se canceló con progreso.cancelar() (el ZIP a medias se borra).
+        zipfile.BadZipFile: Si una parte independiente no supera la verificación.
     """
+    progreso = _reporte_progreso(progreso)
     # Determinar nombre del ZIP
     if nombre_auto == 'nombre':
         zipname = 'comprimido.zip'
@@ -600,24 +4709,5 @@ def comprimir_varias_carpetas_zip(carpetas, destino_dir, nombre_auto='nombre', p
                 rel_path = os.path.join(base, os.path.relpath(abs_path, start=carpeta))
                 files.append(abs_path)
                 rel_files.append(rel_path)
-    # Comprimir
-    if password or split_size:
-        pyminizip.compress_multiple(files, rel_files, zip_path, password or '', 5, split_size)
-    else:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for abs_path, rel_path in zip(files, rel_files):
-                zf.write(abs_path, rel_path)
-    # Si hay particionado, devolver todas las partes
-    if split_size:
-        partes = [zip_path]
-        idx = 1
-        while True:
-            parte = zip_path[:-4] + f'.z{idx:02d}'
-            if os.path.exists(parte):
-                partes.append(parte)
-                idx += 1
-            else:
-                break
-        return partes
-    else:
-        return [zip_path]
+    return _comprimir_archivos(zip_path, files, rel_files, password, split_size, progreso, estadisticas, cifrado,
+                               partes_independientes)
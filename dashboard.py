@@ -12,14 +12,198 @@ from PySide6.QtWidgets import (
     QGridLayout, QFrame, QScrollArea, QSizePolicy, QSpacerItem, QDialog,
     QComboBox, QCheckBox, QFileDialog, QMessageBox, QProgressBar, QLineEdit, QSlider
 )
-from PySide6.QtCore import Qt, QTimer, QUrl, QSize
+from PySide6.QtCore import Qt, QTimer, QUrl, QSize, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QFont, QDesktopServices, QCursor, QMovie, QPixmap, QPainter, QColor, QBrush
 import sys
 import os
-from core import procesar_proyecto, procesar_proyecto_por_fecha, abrir_carpeta
+# El core se importa al abrir cada diálogo o al encolar un trabajo, no antes de pintar la ventana
 
 APP_VERSION = "v2.0.0"
 
+# Texto de estado para cada fase que informa el core
+TEXTO_FASES = {
+    "analisis": "Analizando...",
+    "fechas": "Leyendo fechas",
+    "estructura": "Creando carpetas...",
+    "indice": "Revisando el destino...",
+    "hash_parcial": "Buscando duplicados",
+    "hash_completo": "Comparando duplicados",
+    "hash_perceptual": "Analizando imágenes",
+    "similares": "Agrupando similares",
+    "transferencia": "Transfiriendo",
+    "compresion": "Comprimiendo",
+    "reportes": "Generando reportes..."
+}
+
+class SenalesTrabajo(QObject):
+    """Señales de un Trabajo (QRunnable no puede emitir señales por sí mismo)."""
+    progreso = Signal(dict)
+    terminado = Signal(object)
+    fallo = Signal(str)
+    cancelado = Signal()
+
+class Trabajo(QRunnable):
+    """
+    Ejecuta una función del core en el pool de trabajos, fuera del hilo de la interfaz.
+    
+    La función recibe un argumento 'progreso' (un ReporteProgreso) cuyos eventos se
+    reenvían con la señal 'progreso'; Qt los entrega en el hilo principal. cancelar()
+    detiene la función entre dos archivos, o evita que empiece si aún está en la cola.
+    """
+    def __init__(self, titulo, funcion, *args, resumen=None, carpeta_resultado=None, **kwargs):
+        """
+        Args:
+            titulo (str): Texto que identifica el trabajo en el panel.
+            funcion (callable): Función del core a ejecutar.
+            resumen (callable|None): Convierte el resultado de la función en el texto final.
+            carpeta_resultado (str|None): Carpeta que se ofrece abrir al terminar.
+        """
+        super().__init__()
+        self.setAutoDelete(False)  # El panel conserva la referencia mientras lo muestra
+        self.titulo = titulo
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.resumen = resumen or (lambda resultado: "✅ Terminado")
+        self.carpeta_resultado = carpeta_resultado
+        self.senales = SenalesTrabajo()
+        from core import ReporteProgreso
+        self.reporte = ReporteProgreso(self.senales.progreso.emit)
+
+    def cancelar(self):
+        self.reporte.cancelar()
+
+    def run(self):
+        from core import OperacionCancelada
+        if self.reporte.cancelado:
+            self.senales.cancelado.emit()
+            return
+        try:
+            resultado = self.funcion(*self.args, progreso=self.reporte, **self.kwargs)
+        except OperacionCancelada:
+            self.senales.cancelado.emit()
+        except Exception as e:
+            self.senales.fallo.emit(str(e))
+        else:
+            self.senales.terminado.emit(resultado)
+
+class FilaTrabajo(QFrame):
+    """
+    Fila del panel de trabajos: estado, barra de progreso y botón para cancelar.
+    """
+    def __init__(self, trabajo, parent=None):
+        super().__init__(parent)
+        from core import abrir_carpeta
+        self.trabajo = trabajo
+        self.setStyleSheet("background-color: #2a2a2a; border-radius: 6px;")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(12, 8, 12, 8)
+        
+        textos = QVBoxLayout()
+        titulo = QLabel(trabajo.titulo)
+        titulo.setStyleSheet("font-weight: bold; color: #ffffff;")
+        self.estado = QLabel("En cola...")
+        self.estado.setStyleSheet("font-size: 12px; color: #cccccc;")
+        self.estado.setWordWrap(True)
+        textos.addWidget(titulo)
+        textos.addWidget(self.estado)
+        layout.addLayout(textos, 2)
+        
+        self.barra = QProgressBar()
+        self.barra.setTextVisible(False)
+        self.barra.setValue(0)
+        layout.addWidget(self.barra, 1)
+        
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_abrir = QPushButton("📂 Abrir")
+        self.btn_abrir.setVisible(False)
+        self.btn_quitar = QPushButton("✕")
+        self.btn_quitar.setFixedWidth(28)
+        self.btn_quitar.setVisible(False)
+        layout.addWidget(self.btn_cancelar)
+        layout.addWidget(self.btn_abrir)
+        layout.addWidget(self.btn_quitar)
+        
+        self.btn_cancelar.clicked.connect(self.cancelar)
+        self.btn_abrir.clicked.connect(lambda: abrir_carpeta(trabajo.carpeta_resultado))
+        self.btn_quitar.clicked.connect(self.deleteLater)
+        trabajo.senales.progreso.connect(self.actualizar)
+        trabajo.senales.terminado.connect(self.terminado)
+        trabajo.senales.fallo.connect(self.fallo)
+        trabajo.senales.cancelado.connect(self.cancelado)
+
+    def cancelar(self):
+        self.trabajo.cancelar()
+        self.btn_cancelar.setEnabled(False)
+        self.estado.setText("Cancelando (se termina el archivo en curso)...")
+
+    def actualizar(self, evento):
+        if self.trabajo.reporte.cancelado or evento["tipo"] == "fin":
+            return
+        texto = TEXTO_FASES.get(evento["fase"], evento["fase"] or "")
+        if evento["bytes_totales"]:
+            self.barra.setMaximum(100)
+            self.barra.setValue(int(evento["bytes_hechos"] * 100 / evento["bytes_totales"]))
+        elif evento["archivos_totales"]:
+            self.barra.setMaximum(100)
+            self.barra.setValue(int(evento["archivos_hechos"] * 100 / evento["archivos_totales"]))
+        else:
+            self.barra.setMaximum(0)  # Indeterminada
+        if evento["archivos_totales"]:
+            texto += f" · {evento['archivos_hechos']}/{evento['archivos_totales']} archivos"
+        if evento["bytes_por_segundo"] and evento["bytes_hechos"]:
+            texto += f" · {evento['bytes_por_segundo'] / 1048576:.1f} MB/s"
+        self.estado.setText(texto)
+
+    def _finalizar(self, texto, valor):
+        self.barra.setMaximum(100)
+        self.barra.setValue(valor)
+        self.estado.setText(texto)
+        self.btn_cancelar.setVisible(False)
+        self.btn_quitar.setVisible(True)
+
+    def terminado(self, resultado):
+        self._finalizar(self.trabajo.resumen(resultado), 100)
+        self.btn_abrir.setVisible(bool(self.trabajo.carpeta_resultado))
+
+    def fallo(self, mensaje):
+        self._finalizar(f"❌ Error: {mensaje}", 0)
+
+    def cancelado(self):
+        self._finalizar("⏹️ Cancelado. Los archivos ya procesados se conservan.", self.barra.value())
+
+class PanelTrabajos(QFrame):
+    """
+    Cola de trabajos del dashboard.
+    
+    Los trabajos se ejecutan de uno en uno en un QThreadPool propio, en el orden
+    en que se encolan, mientras la interfaz sigue respondiendo.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.layout_filas = QVBoxLayout(self)
+        self.layout_filas.setContentsMargins(0, 0, 0, 0)
+        self.layout_filas.setSpacing(8)
+        self.setVisible(False)
+
+    def encolar(self, trabajo):
+        """Añade una fila para el trabajo y lo pone en la cola."""
+        fila = FilaTrabajo(trabajo, self)
+        self.layout_filas.addWidget(fila)
+        self.setVisible(True)
+        self.pool.start(trabajo)
+        return fila
+
+    def cancelar_todos(self):
+        """Cancela los trabajos en curso y en cola y espera a que se detengan."""
+        for i in range(self.layout_filas.count()):
+            fila = self.layout_filas.itemAt(i).widget()
+            if isinstance(fila, FilaTrabajo):
+                fila.trabajo.cancelar()
+        self.pool.waitForDone()
+
 class TarjetaFuncionalidad(QFrame):
     """
     Widget de tarjeta para representar una funcionalidad del programa.
@@ -96,9 +280,26 @@ class OrganizadorPorTipoDialog(QDialog):
         self.checkbox_copiar = QCheckBox("Copiar archivos (en lugar de moverlos)")
         self.checkbox_crear_todas = QCheckBox("Crear todas las carpetas (incluso vacías)")
         self.checkbox_readme = QCheckBox("Incluir archivos README.md")
+        self.checkbox_reanudar = QCheckBox("Reanudar una organización interrumpida")
+        self.checkbox_reanudar.setToolTip("Continúa la última organización hacia este destino sin repetir los archivos que ya llegaron.")
+        self.checkbox_incremental = QCheckBox("Solo archivos nuevos o modificados")
+        self.checkbox_incremental.setToolTip("Omite los archivos que ya están en el destino con el mismo tamaño y fecha (ideal para volver a importar una tarjeta).")
+        self.checkbox_medir = QCheckBox("Medir el rendimiento")
+        self.checkbox_medir.setToolTip("Añade a proyecto_info.json lo que tardó cada fase y los archivos más lentos, y guarda traza_rendimiento.json (se abre en ui.perfetto.dev).")
         layout.addWidget(self.checkbox_copiar)
         layout.addWidget(self.checkbox_crear_todas)
         layout.addWidget(self.checkbox_readme)
+        self.checkbox_duplicados = QCheckBox("No repetir archivos duplicados")
+        self.checkbox_duplicados.setToolTip("Detecta archivos con el mismo contenido aunque tengan otro nombre y transfiere solo uno.")
+        self.checkbox_enlazar = QCheckBox("Crear los duplicados como enlaces al original")
+        self.checkbox_enlazar.setToolTip("Los duplicados aparecen en el destino sin ocupar espacio extra (enlaces duros).")
+        self.checkbox_enlazar.setEnabled(False)
+        self.checkbox_duplicados.toggled.connect(self.checkbox_enlazar.setEnabled)
+        layout.addWidget(self.checkbox_reanudar)
+        layout.addWidget(self.checkbox_incremental)
+        layout.addWidget(self.checkbox_duplicados)
+        layout.addWidget(self.checkbox_enlazar)
+        layout.addWidget(self.checkbox_medir)
         
         # Botón de acción
         self.btn_organizar = QPushButton("🚀 ORGANIZAR")
@@ -139,6 +340,13 @@ class OrganizadorPorTipoDialog(QDialog):
             self.destino = carpeta
             self.btn_destino.setText(f"📁 Destino: {os.path.basename(carpeta)}")
     
+    def _instrumentacion(self):
+        """Instrumentacion con la traza en el destino si se pidió medir el rendimiento."""
+        if not self.checkbox_medir.isChecked():
+            return None
+        from core import Instrumentacion
+        return Instrumentacion(traza=os.path.join(self.destino, "traza_rendimiento.json"))
+    
     def organizar(self):
         if not self.origen or not self.destino:
             QMessageBox.warning(self, "⚠️ Error", "Debes seleccionar ambas carpetas.")
@@ -147,25 +355,26 @@ class OrganizadorPorTipoDialog(QDialog):
         copiar = self.checkbox_copiar.isChecked()
         crear_todas = self.checkbox_crear_todas.isChecked()
         incluir_readme = self.checkbox_readme.isChecked()
-        
-        log, tipo_proyecto = procesar_proyecto(self.origen, self.destino, copiar, crear_todas, incluir_readme)
-        
-        if tipo_proyecto == "vacio":
-            QMessageBox.information(self, "ℹ️ Sin archivos", "No hay archivos para procesar en la carpeta origen.")
-            return
-        
         accion_str = "copiados" if copiar else "movidos"
-        mensaje = f"✅ ¡Éxito! {len(log)} archivos {accion_str}.\n📂 Proyecto: {tipo_proyecto}"
+        duplicados = None
+        if self.checkbox_duplicados.isChecked():
+            duplicados = "enlazar" if self.checkbox_enlazar.isChecked() else "omitir"
         
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle("Proceso finalizado")
-        msg_box.setText(mensaje)
-        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        msg_box.setDefaultButton(QMessageBox.Yes)
-        
-        if msg_box.exec() == QMessageBox.Yes:
-            abrir_carpeta(self.destino)
+        def resumen(resultado):
+            log, tipo_proyecto = resultado
+            if tipo_proyecto == "vacio":
+                return "ℹ️ No hay archivos para procesar en la carpeta origen."
+            return f"✅ ¡Éxito! {len(log)} archivos {accion_str}. 📂 Proyecto: {tipo_proyecto}"
         
+        # El trabajo se ejecuta en segundo plano; su progreso se ve en el panel del dashboard
+        from core import procesar_proyecto
+        self.parent().encolar_trabajo(Trabajo(
+            f"📁 Por tipo: {os.path.basename(self.origen)}",
+            procesar_proyecto, self.origen, self.destino, copiar, crear_todas, incluir_readme,
+            reanudar=self.checkbox_reanudar.isChecked(), incremental=self.checkbox_incremental.isChecked(),
+            duplicados=duplicados, instrumentacion=self._instrumentacion(), resumen=resumen,
+            carpeta_resultado=self.destino
+        ))
         self.accept()
 
 class OrganizadorPorFechaDialog(QDialog):
@@ -233,8 +442,17 @@ class OrganizadorPorFechaDialog(QDialog):
         # Opciones
         self.checkbox_copiar = QCheckBox("Copiar archivos (en lugar de moverlos)")
         self.checkbox_readme = QCheckBox("Incluir archivos README.md")
+        self.checkbox_reanudar = QCheckBox("Reanudar una organización interrumpida")
+        self.checkbox_reanudar.setToolTip("Continúa la última organización hacia este destino sin repetir los archivos que ya llegaron.")
+        self.checkbox_incremental = QCheckBox("Solo archivos nuevos o modificados")
+        self.checkbox_incremental.setToolTip("Omite los archivos que ya están en el destino con el mismo tamaño y fecha (ideal para volver a importar una tarjeta).")
+        self.checkbox_medir = QCheckBox("Medir el rendimiento")
+        self.checkbox_medir.setToolTip("Añade a proyecto_info.json lo que tardó cada fase y los archivos más lentos, y guarda traza_rendimiento.json (se abre en ui.perfetto.dev).")
         layout.addWidget(self.checkbox_copiar)
         layout.addWidget(self.checkbox_readme)
+        layout.addWidget(self.checkbox_reanudar)
+        layout.addWidget(self.checkbox_incremental)
+        layout.addWidget(self.checkbox_medir)
         
         # Botón de acción
         self.btn_organizar = QPushButton("🚀 ORGANIZAR")
@@ -270,6 +488,13 @@ class OrganizadorPorFechaDialog(QDialog):
             self.destino = carpeta
             self.btn_destino.setText(f"📁 Destino: {os.path.basename(carpeta)}")
     
+    def _instrumentacion(self):
+        """Instrumentacion con la traza en el destino si se pidió medir el rendimiento."""
+        if not self.checkbox_medir.isChecked():
+            return None
+        from core import Instrumentacion
+        return Instrumentacion(traza=os.path.join(self.destino, "traza_rendimiento.json"))
+    
     def organizar(self):
         if not self.origen or not self.destino:
             QMessageBox.warning(self, "⚠️ Error", "Debes seleccionar ambas carpetas.")
@@ -286,27 +511,22 @@ class OrganizadorPorFechaDialog(QDialog):
         
         copiar = self.checkbox_copiar.isChecked()
         incluir_readme = self.checkbox_readme.isChecked()
-        
-        log, total_archivos = procesar_proyecto_por_fecha(
-            self.origen, self.destino, nivel_organizacion, copiar, incluir_readme
-        )
-        
-        if total_archivos == 0:
-            QMessageBox.information(self, "ℹ️ Sin archivos", "No hay archivos para procesar en la carpeta origen.")
-            return
-        
         accion_str = "copiados" if copiar else "movidos"
-        mensaje = f"✅ ¡Éxito! {total_archivos} archivos {accion_str}.\n📂 Organizados por {nivel_organizacion}"
-        
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle("Proceso finalizado")
-        msg_box.setText(mensaje)
-        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        msg_box.setDefaultButton(QMessageBox.Yes)
         
-        if msg_box.exec() == QMessageBox.Yes:
-            abrir_carpeta(self.destino)
+        def resumen(resultado):
+            log, total_archivos = resultado
+            if total_archivos == 0:
+                return "ℹ️ No hay archivos para procesar en la carpeta origen."
+            return f"✅ ¡Éxito! {total_archivos} archivos {accion_str}. 📂 Organizados por {nivel_organizacion}"
         
+        from core import procesar_proyecto_por_fecha
+        self.parent().encolar_trabajo(Trabajo(
+            f"📅 Por fecha: {os.path.basename(self.origen)}",
+            procesar_proyecto_por_fecha, self.origen, self.destino, nivel_organizacion, copiar, incluir_readme,
+            cache=True, reanudar=self.checkbox_reanudar.isChecked(),
+            incremental=self.checkbox_incremental.isChecked(), instrumentacion=self._instrumentacion(),
+            resumen=resumen, carpeta_resultado=self.destino
+        ))
         self.accept()
 
 class CompararEmparejarDialog(QDialog):
@@ -378,15 +598,103 @@ class CompararEmparejarDialog(QDialog):
             QMessageBox.warning(self, "⚠️ Error", "Debes seleccionar las tres carpetas.")
             return
         from core import mover_no_emparejadas_ambas
-        movidos = mover_no_emparejadas_ambas([self.carpeta_a, self.carpeta_b], self.carpeta_salida)
-        mensaje = f"✅ Proceso finalizado.\n\nArchivos sin pareja movidos: {len(movidos)}\n\n¿Abrir carpeta de salida?"
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle("Comparación finalizada")
-        msg_box.setText(mensaje)
-        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        msg_box.setDefaultButton(QMessageBox.Yes)
-        if msg_box.exec() == QMessageBox.Yes:
-            abrir_carpeta(self.carpeta_salida)
+        self.parent().encolar_trabajo(Trabajo(
+            f"🔗 Comparar: {os.path.basename(self.carpeta_a)} / {os.path.basename(self.carpeta_b)}",
+            mover_no_emparejadas_ambas, [self.carpeta_a, self.carpeta_b], self.carpeta_salida,
+            resumen=lambda movidos: f"✅ Archivos sin pareja movidos: {len(movidos)}",
+            carpeta_resultado=self.carpeta_salida
+        ))
+        self.accept()
+
+class ImagenesSimilaresDialog(QDialog):
+    """
+    Diálogo para encontrar fotos casi iguales (ráfagas, reexportaciones) en una carpeta.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from core import DISTANCIA_SIMILARES
+        self.setWindowTitle("Buscar Imágenes Similares")
+        self.setMinimumSize(500, 420)
+        self.setStyleSheet("background-color: #212121; color: #e0e0e0;")
+        self.carpeta = ""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(20)
+        layout.setContentsMargins(30, 30, 30, 30)
+        titulo = QLabel("🧹 Buscar Imágenes Similares")
+        titulo.setStyleSheet("font-size: 20px; font-weight: bold; color: #bb86fc;")
+        titulo.setAlignment(Qt.AlignCenter)
+        layout.addWidget(titulo)
+        desc = QLabel("Agrupa las fotos que son casi iguales aunque no sean idénticas (ráfagas, copias reexportadas o redimensionadas). El resultado se guarda en similares.md dentro de la carpeta.")
+        desc.setStyleSheet("font-size: 14px; color: #cccccc;")
+        desc.setAlignment(Qt.AlignCenter)
+        desc.setWordWrap(True)
+        layout.addWidget(desc)
+        self.btn_carpeta = QPushButton("📂 Seleccionar Carpeta")
+        layout.addWidget(self.btn_carpeta)
+        self.checkbox_recursivo = QCheckBox("Incluir subcarpetas")
+        self.checkbox_recursivo.setChecked(True)
+        self.checkbox_phash = QCheckBox("Tolerar cambios de brillo y contraste (más lento)")
+        layout.addWidget(self.checkbox_recursivo)
+        layout.addWidget(self.checkbox_phash)
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setMinimum(0)
+        self.slider.setMaximum(16)
+        self.slider.setValue(DISTANCIA_SIMILARES)
+        self.slider.setTickInterval(2)
+        self.slider.setTickPosition(QSlider.TicksBelow)
+        self.label_slider = QLabel()
+        self.actualizar_slider(self.slider.value())
+        layout.addWidget(self.label_slider)
+        layout.addWidget(self.slider)
+        self.btn_buscar = QPushButton("🔍 BUSCAR SIMILARES")
+        self.btn_buscar.setStyleSheet("""
+            QPushButton {
+                background-color: #bb86fc;
+                color: #121212;
+                font-size: 16px;
+                font-weight: bold;
+                padding: 12px;
+                border-radius: 8px;
+            }
+            QPushButton:hover {
+                background-color: #d1b3ff;
+            }
+        """)
+        layout.addWidget(self.btn_buscar)
+        self.btn_carpeta.clicked.connect(self.seleccionar_carpeta)
+        self.slider.valueChanged.connect(self.actualizar_slider)
+        self.btn_buscar.clicked.connect(self.buscar)
+    def seleccionar_carpeta(self):
+        carpeta = QFileDialog.getExistingDirectory(self, "📂 Seleccionar Carpeta")
+        if carpeta:
+            self.carpeta = carpeta
+            self.btn_carpeta.setText(f"📂 Carpeta: {os.path.basename(carpeta)}")
+    def actualizar_slider(self, value):
+        self.label_slider.setText(f"Tolerancia: {value} bits de 64" + (" (solo casi idénticas)" if value <= 2 else ""))
+    def buscar(self):
+        if not self.carpeta:
+            QMessageBox.warning(self, "⚠️ Error", "Debes seleccionar una carpeta.")
+            return
+        from core import buscar_similares, generar_reporte_similares
+        carpeta = self.carpeta
+        opciones = {
+            "distancia_max": self.slider.value(),
+            "algoritmo": "phash" if self.checkbox_phash.isChecked() else "dhash",
+            "recursivo": self.checkbox_recursivo.isChecked(),
+            "cache": True
+        }
+
+        def buscar_y_reportar(progreso=None):
+            estadisticas = {}
+            grupos = buscar_similares([carpeta], progreso=progreso, estadisticas=estadisticas, **opciones)
+            generar_reporte_similares(carpeta, grupos, estadisticas)
+            return estadisticas
+
+        self.parent().encolar_trabajo(Trabajo(
+            f"🧹 Similares: {os.path.basename(carpeta)}", buscar_y_reportar,
+            resumen=lambda e: f"✅ {e['grupos']} grupos de fotos similares ({e['imagenes_agrupadas']} de {e['imagenes']} imágenes)",
+            carpeta_resultado=carpeta
+        ))
         self.accept()
 
 class ComprimirParticionarDialog(QDialog):
@@ -462,6 +770,12 @@ class ComprimirParticionarDialog(QDialog):
         self.label_slider.setVisible(False)
         layout.addWidget(self.slider)
         layout.addWidget(self.label_slider)
+        self.checkbox_independientes = QCheckBox("Partes independientes (cada parte es un ZIP completo)")
+        self.checkbox_independientes.setToolTip(
+            "Cada parte se abre sin las demás: si se pierde una, el resto sigue sirviendo y se puede "
+            "extraer la primera mientras las otras se suben. Solo se trocean los archivos más grandes que una parte.")
+        self.checkbox_independientes.setVisible(False)
+        layout.addWidget(self.checkbox_independientes)
         # SwissTransfer opcional
         self.checkbox_swiss = QCheckBox("Abrir SwissTransfer al finalizar")
         self.checkbox_swiss.setChecked(False)
@@ -487,13 +801,12 @@ class ComprimirParticionarDialog(QDialog):
             }
         """)
         layout.addWidget(self.btn_comprimir)
-        # Barra de progreso emergente
-        self.progress_dialog = None
         # Conexiones
         self.btn_add.clicked.connect(self.agregar_carpeta)
         self.btn_destino.clicked.connect(self.seleccionar_destino)
         self.checkbox_pass.stateChanged.connect(self.toggle_pass)
         self.checkbox_partes.stateChanged.connect(self.toggle_partes)
+        self.checkbox_independientes.stateChanged.connect(self.actualizar_resumen)
         self.slider.valueChanged.connect(self.actualizar_slider)
         self.btn_comprimir.clicked.connect(self.comprimir)
         self.actualizar_lista()
@@ -538,12 +851,13 @@ class ComprimirParticionarDialog(QDialog):
             self.btn_destino.setText(f"📁 Destino: {os.path.basename(carpeta)}")
             self.actualizar_resumen()
     def toggle_pass(self, state):
-        self.input_pass.setEnabled(state == Qt.Checked)
+        self.input_pass.setEnabled(self.checkbox_pass.isChecked())
         self.actualizar_resumen()
     def toggle_partes(self, state):
-        visible = state == Qt.Checked
+        visible = self.checkbox_partes.isChecked()
         self.slider.setVisible(visible)
         self.label_slider.setVisible(visible)
+        self.checkbox_independientes.setVisible(visible)
         self.actualizar_resumen()
     def actualizar_slider(self, value):
         gb = value / 1024
@@ -567,7 +881,8 @@ class ComprimirParticionarDialog(QDialog):
         else:
             resumen += "<b>Contraseña:</b> No<br>"
         if self.checkbox_partes.isChecked():
-            resumen += f"<b>Particionado:</b> Sí, {self.slider.value()} MB por parte<br>"
+            tipo = "independientes" if self.checkbox_independientes.isChecked() else "dividido"
+            resumen += f"<b>Particionado:</b> Sí, {self.slider.value()} MB por parte ({tipo})<br>"
         else:
             resumen += "<b>Particionado:</b> No<br>"
         if self.checkbox_swiss.isChecked():
@@ -584,26 +899,32 @@ class ComprimirParticionarDialog(QDialog):
         nombre_auto = nombre_map[self.combo_nombre.currentIndex()]
         password = self.input_pass.text() if self.checkbox_pass.isChecked() else None
         split_size = self.slider.value() if self.checkbox_partes.isChecked() else None
-        # Barra de progreso emergente
-        from PySide6.QtWidgets import QProgressDialog
-        self.progress_dialog = QProgressDialog("Comprimiendo...", None, 0, 0, self)
-        self.progress_dialog.setWindowTitle("Progreso de compresión")
-        self.progress_dialog.setWindowModality(Qt.ApplicationModal)
-        self.progress_dialog.setMinimumDuration(0)
-        self.progress_dialog.show()
-        QApplication.processEvents()
-        try:
-            partes = comprimir_varias_carpetas_zip(self.carpetas, self.destino, nombre_auto, password, split_size)
-        except Exception as e:
-            self.progress_dialog.close()
-            QMessageBox.critical(self, "Error", f"Ocurrió un error al comprimir:\n{e}")
-            return
-        self.progress_dialog.close()
-        QMessageBox.information(self, "Completado", f"Se generaron {len(partes)} archivos ZIP/partes.")
-        self.archivos_generados = partes
+        independientes = self.checkbox_independientes.isChecked()
+        estadisticas = {}
+
+        def resumen(partes):
+            texto = f"✅ Se generaron {len(partes)} archivos ZIP/partes."
+            if estadisticas.get("verificadas"):
+                texto += f" {estadisticas['verificadas']} partes independientes verificadas."
+            if estadisticas.get("divididos"):
+                texto += f" {estadisticas['divididos']} archivos grandes se trocearon (.001, .002, ...)."
+            politica = estadisticas.get("politica")
+            if politica and politica["almacenados"]:
+                texto += (f" {politica['almacenados']} archivos ya comprimidos se guardaron sin recomprimir"
+                          f" (≈{politica['cpu_ahorrada_s']:.1f} s de CPU ahorrados).")
+            return texto
+
+        trabajo = Trabajo(
+            f"🗜️ Comprimir: {', '.join(os.path.basename(c) for c in self.carpetas)}",
+            comprimir_varias_carpetas_zip, list(self.carpetas), self.destino, nombre_auto, password, split_size,
+            estadisticas=estadisticas, partes_independientes=independientes, resumen=resumen,
+            carpeta_resultado=self.destino
+        )
         if self.checkbox_swiss.isChecked():
             import webbrowser
-            webbrowser.open('https://www.swisstransfer.com/es')
+            trabajo.senales.terminado.connect(lambda partes: webbrowser.open('https://www.swisstransfer.com/es'))
+        self.parent().encolar_trabajo(trabajo)
+        self.accept()
 
 class DashboardUI(QWidget):
     """
@@ -680,10 +1001,10 @@ class DashboardUI(QWidget):
             },
             {
                 "titulo": "Limpieza de Archivos",
-                "descripcion": "Encuentra y elimina archivos duplicados, temporales o innecesarios en tu proyecto.",
+                "descripcion": "Encuentra fotos casi iguales (ráfagas, reexportaciones) para revisarlas y limpiar tu proyecto.",
                 "icono": "🧹",
                 "color": "orange",
-                "dialogo": None  # TODO: Implementar
+                "dialogo": ImagenesSimilaresDialog
             },
             {
                 "titulo": "Conversión de Formatos",
@@ -728,6 +1049,10 @@ class DashboardUI(QWidget):
         scroll_area.setWidget(tarjetas_widget)
         main_layout.addWidget(scroll_area)
         
+        # Panel de trabajos en segundo plano (se muestra al encolar el primero)
+        self.trabajos = PanelTrabajos()
+        main_layout.addWidget(self.trabajos)
+        
         # Footer
         footer = QLabel("Desarrollado con ❤️ por Felipe Hincapié | Caracol Aventurero")
         footer.setStyleSheet("font-size: 12px; color: #888888; text-align: center;")
@@ -740,6 +1065,17 @@ class DashboardUI(QWidget):
         """
         dialogo = dialogo_class(self)
         dialogo.exec()
+    
+    def encolar_trabajo(self, trabajo):
+        """
+        Pone un trabajo en la cola de segundo plano y muestra su progreso en el panel.
+        """
+        self.trabajos.encolar(trabajo)
+    
+    def closeEvent(self, event):
+        # No cerrar la ventana con un trabajo a medias: se cancela entre dos archivos
+        self.trabajos.cancelar_todos()
+        super().closeEvent(event)
 
 # Punto de entrada de la aplicación
 if __name__ == "__main__":
@@ -11,7 +11,7 @@ from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, 
     QProgressBar, QMessageBox, QCheckBox, QSpacerItem, QSizePolicy, QHBoxLayout, QFrame, QDialog
 )
-from PySide6.QtCore import Qt, QTimer, QUrl
+from PySide6.QtCore import Qt, QUrl, QThread, Signal
 from PySide6.QtGui import QFont, QDesktopServices, QCursor, QMovie, QPixmap, QPainter, QColor, QBrush
 import sys
 import os
@@ -19,6 +19,36 @@ from core import procesar_proyecto, abrir_carpeta
 
 APP_VERSION = "v1.0.0"
 
+# Texto de la etiqueta de estado para cada fase del core
+TEXTO_FASES = {
+    "analisis": "Analizando la carpeta de origen...",
+    "estructura": "Creando las carpetas...",
+    "reportes": "Generando los reportes..."
+}
+
+class HiloOrganizar(QThread):
+    """
+    Ejecuta procesar_proyecto fuera del hilo de la interfaz.
+    
+    Los eventos de progreso del core llegan desde este hilo (o desde los hilos de
+    copia) y se reenvían con una señal, que Qt entrega en el hilo principal.
+    """
+    progreso = Signal(dict)
+    terminado = Signal(object)
+    fallo = Signal(str)
+
+    def __init__(self, argumentos, parent=None):
+        super().__init__(parent)
+        self.argumentos = argumentos
+
+    def run(self):
+        try:
+            resultado = procesar_proyecto(*self.argumentos, progreso=self.progreso.emit)
+        except Exception as e:
+            self.fallo.emit(str(e))
+        else:
+            self.terminado.emit(resultado)
+
 class FooterLabel(QLabel):
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
@@ -118,6 +148,7 @@ class OrganizadorUI(QWidget):
         # Propiedades para almacenar las rutas seleccionadas por el usuario
         self.origen = ""
         self.destino = ""
+        self.hilo = None
 
         # --- Creación del Layout Principal ---
         # QVBoxLayout organiza los widgets verticalmente.
@@ -205,9 +236,12 @@ class OrganizadorUI(QWidget):
         self.progreso.setValue(0)
         self.progreso.setTextVisible(False)  # Oculta el texto de porcentaje
         self.progreso.setToolTip("Muestra el progreso del proceso de organización.")
+        self.estado = QLabel("")
+        self.estado.setAlignment(Qt.AlignCenter)
 
         main_layout.addWidget(self.btn_organizar)
         main_layout.addWidget(self.progreso)
+        main_layout.addWidget(self.estado)
         
         # --- Footer Interactivo ---
         main_layout.addSpacing(15)
@@ -243,35 +277,66 @@ class OrganizadorUI(QWidget):
     def organizar(self):
         """
         Función principal que se ejecuta al pulsar el botón "Organizar".
-        Recopila todas las opciones y llama a la lógica del 'core'.
+        Recopila todas las opciones y lanza la lógica del 'core' en un hilo aparte.
         """
         # Validaciones iniciales
         if not self.origen or not self.destino:
             QMessageBox.warning(self, "⚠️ Error", "Debes seleccionar ambas carpetas.")
             return
-
-        total_archivos = len([a for a in os.listdir(self.origen) if os.path.isfile(os.path.join(self.origen, a))])
         
         # Recopila el estado de los checkboxes
-        copiar = self.checkbox_copiar.isChecked()
+        self.copiar = self.checkbox_copiar.isChecked()
         crear_todas = self.checkbox_crear_todas.isChecked()
         incluir_readme = self.checkbox_readme.isChecked()
 
-        # Llama a la función principal del core y le pasa todos los parámetros
-        log, tipo_proyecto = procesar_proyecto(self.origen, self.destino, copiar, crear_todas, incluir_readme)
+        # Lanza la función principal del core con todos los parámetros; la ventana
+        # sigue respondiendo y la barra avanza con los eventos reales de progreso
+        self.btn_organizar.setEnabled(False)
+        self.progreso.setMaximum(0)  # Modo indeterminado hasta conocer el total
+        self.progreso.setValue(0)
+        self.hilo = HiloOrganizar((self.origen, self.destino, self.copiar, crear_todas, incluir_readme), self)
+        self.hilo.progreso.connect(self.actualizar_progreso)
+        self.hilo.terminado.connect(self.organizacion_terminada)
+        self.hilo.fallo.connect(self.organizacion_fallida)
+        self.hilo.finished.connect(lambda: self.btn_organizar.setEnabled(True))
+        self.hilo.start()
+
+    def actualizar_progreso(self, evento):
+        """Refleja en la barra y en la etiqueta de estado un evento de progreso del core."""
+        if evento["fase"] != "transferencia":
+            if evento["tipo"] == "fase":
+                self.estado.setText(TEXTO_FASES.get(evento["fase"], ""))
+            return
+        totales = evento["bytes_totales"]
+        if evento["tipo"] == "fase":
+            # La barra avanza por bytes: los videos grandes pesan más que las fotos
+            self.progreso.setMaximum(100 if totales else 0)
+        elif totales:
+            self.progreso.setValue(int(evento["bytes_hechos"] * 100 / totales))
+        texto = f"{evento['archivos_hechos']}/{evento['archivos_totales']} archivos"
+        if evento["bytes_por_segundo"]:
+            texto += f" · {evento['bytes_por_segundo'] / 1048576:.1f} MB/s"
+        self.estado.setText(texto)
+
+    def organizacion_fallida(self, mensaje):
+        self.progreso.setMaximum(100)
+        self.progreso.setValue(0)
+        self.estado.setText("")
+        QMessageBox.critical(self, "❌ Error", f"No se pudo organizar el proyecto:\n{mensaje}")
 
+    def organizacion_terminada(self, resultado):
+        log, tipo_proyecto = resultado
+        self.progreso.setMaximum(100)
+        self.estado.setText("")
+        
         if tipo_proyecto == "vacio":
+            self.progreso.setValue(0)
             QMessageBox.information(self, "ℹ️ Sin archivos", "No hay archivos para procesar en la carpeta origen.")
             return
-
-        # Simulación de la barra de progreso
-        self.progreso.setMaximum(total_archivos)
-        for i in range(total_archivos + 1):
-            # QTimer.singleShot es una forma de no bloquear la GUI mientras se actualiza
-            QTimer.singleShot(i * 10, lambda i=i: self.progreso.setValue(i))
+        self.progreso.setValue(100)
 
         # Mensaje de éxito final
-        accion_str = "copiados" if copiar else "movidos"
+        accion_str = "copiados" if self.copiar else "movidos"
         mensaje_exito = f"✅ ¡Éxito! {len(log)} archivos {accion_str}.\n"
         mensaje_exito += f"📂 Proyecto detectado como: **{tipo_proyecto}**.\n\n"
         mensaje_exito += "¿Quieres abrir la carpeta de destino?"
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la lectura de fechas de cabecera sin bibliotecas: EXIF acotado en
+TIFF/JPEG, mvhd de MP4 y DateUTC de MKV, con archivos mínimos construidos a mano.
+Uso:
+
+    python -m pytest tests
+"""
+import struct
+from datetime import datetime
+
+import pytest
+
+import core
+
+FECHA = datetime(2024, 3, 12, 14, 30, 12)
+TEXTO_FECHA = b"2024:03:12 14:30:12\x00"
+
+
+def crear(tmp_path, nombre, contenido):
+    ruta = tmp_path / nombre
+    ruta.write_bytes(contenido)
+    return str(ruta)
+
+
+# --- EXIF ---
+
+def tiff(orden, offset_exif=None):
+    """
+    Cabecera TIFF con IFD0 -> ExifIFDPointer -> DateTimeOriginal. 'offset_exif'
+    sustituye al puntero real al IFD EXIF (para apuntar fuera del presupuesto).
+    """
+    marca = b"II" if orden == "<" else b"MM"
+    real = 8 + 18  # Cabecera + IFD0 con una entrada
+    ifd0 = struct.pack(orden + "HHHII", 1, 0x8769, 4, 1, real if offset_exif is None else offset_exif)
+    ifd_exif = struct.pack(orden + "HHHII", 1, 0x9003, 2, len(TEXTO_FECHA), real + 18)
+    return (marca + struct.pack(orden + "HI", 42, 8) + ifd0 + b"\x00" * 4
+            + ifd_exif + b"\x00" * 4 + TEXTO_FECHA)
+
+
+def jpeg(cabecera_tiff):
+    app1 = b"Exif\x00\x00" + cabecera_tiff
+    return b"\xff\xd8\xff\xe1" + struct.pack(">H", 2 + len(app1)) + app1 + b"\xff\xd9"
+
+
+@pytest.mark.parametrize("orden", ["<", ">"])
+def test_exif_tiff(tmp_path, orden):
+    ruta = crear(tmp_path, "foto.dng", tiff(orden))
+    assert core.leer_fecha_exif_rapida(ruta) == FECHA
+
+
+@pytest.mark.parametrize("orden", ["<", ">"])
+def test_exif_jpeg(tmp_path, orden):
+    ruta = crear(tmp_path, "foto.jpg", jpeg(tiff(orden)))
+    assert core.leer_fecha_exif_rapida(ruta) == FECHA
+
+
+@pytest.mark.parametrize("orden", ["<", ">"])
+def test_exif_truncado(tmp_path, orden):
+    ruta = crear(tmp_path, "foto.jpg", jpeg(tiff(orden))[:40])
+    with pytest.raises(ValueError):
+        core.leer_fecha_exif_rapida(ruta)
+
+
+def test_exif_fuera_del_presupuesto(tmp_path):
+    ruta = crear(tmp_path, "foto.dng", tiff("<", offset_exif=1 << 20))
+    with pytest.raises(ValueError, match="presupuesto"):
+        core.leer_fecha_exif_rapida(ruta, presupuesto=64 * 1024)
+
+
+def test_exif_sin_fecha(tmp_path):
+    ifd0_vacio = struct.pack("<H", 0) + b"\x00" * 4
+    ruta = crear(tmp_path, "foto.dng", b"II" + struct.pack("<HI", 42, 8) + ifd0_vacio)
+    assert core.leer_fecha_exif_rapida(ruta) is None
+
+
+# --- Videos ---
+
+def caja(tipo, datos):
+    return struct.pack(">I4s", 8 + len(datos), tipo) + datos
+
+
+def mp4(version):
+    segundos = int(FECHA.timestamp()) + core._EPOCA_MP4
+    if version == 1:
+        mvhd = bytes([1, 0, 0, 0]) + struct.pack(">QQ", segundos, segundos)
+    else:
+        mvhd = bytes(4) + struct.pack(">II", segundos, segundos)
+    # 'mdat' delante de 'moov', como en los archivos grabados por cámaras
+    return caja(b"ftyp", b"isom\x00\x00\x02\x00") + caja(b"mdat", bytes(1000)) + caja(b"moov", caja(b"mvhd", mvhd))
+
+
+def elemento(id_bytes, datos):
+    return id_bytes + bytes([0x80 | len(datos)]) + datos  # Tamaño de 1 byte (< 127)
+
+
+def mkv():
+    nanosegundos = round((FECHA.timestamp() - core._EPOCA_MKV) * 1e9)
+    fecha = elemento(b"\x44\x61", struct.pack(">q", nanosegundos))
+    info = elemento(b"\x15\x49\xa9\x66", fecha)
+    return elemento(b"\x1a\x45\xdf\xa3", b"") + elemento(b"\x18\x53\x80\x67", info)
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_mp4_mvhd(tmp_path, version):
+    ruta = crear(tmp_path, "video.mp4", mp4(version))
+    assert core.leer_fecha_video(ruta) == FECHA
+
+
+def test_mp4_truncado(tmp_path):
+    ruta = crear(tmp_path, "video.mp4", mp4(0)[:-8])
+    with pytest.raises(ValueError):
+        core.leer_fecha_video(ruta)
+
+
+def test_mkv_date_utc(tmp_path):
+    ruta = crear(tmp_path, "video.mkv", mkv())
+    assert core.leer_fecha_video(ruta) == FECHA
+
+
+def test_mkv_truncado(tmp_path):
+    ruta = crear(tmp_path, "video.mkv", mkv()[:-4])
+    with pytest.raises(ValueError):
+        core.leer_fecha_video(ruta)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de escribir_zip_independiente: qué se trocea, dónde van los trozos y que
+cada parte se extrae por sí sola. Uso:
+
+    python -m pytest tests
+"""
+import os
+import random
+import zipfile
+
+import core
+
+MIB = 1024 * 1024
+
+
+def crear(ruta, contenido):
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    return ruta
+
+
+def comprimir(tmp_path, nombres, tamano_parte):
+    origen = tmp_path / "origen"
+    files = [str(origen / nombre) for nombre in nombres]
+    resumen = core.escribir_zip_independiente(str(tmp_path / "salida.zip"), files, list(nombres), tamano_parte)
+    return resumen, resumen["partes"]
+
+
+def extraer(partes):
+    """Une el contenido de todas las partes: {nombre en el ZIP: bytes}, abriendo cada una por separado."""
+    contenido = {}
+    for parte in partes:
+        with zipfile.ZipFile(parte) as z:
+            for nombre in z.namelist():
+                contenido[nombre] = z.read(nombre)
+    return contenido
+
+
+def test_no_trocea_lo_que_cabe_comprimido(tmp_path):
+    origen = tmp_path / "origen"
+    origen.mkdir()
+    texto = b"".join(b"linea %08d del registro de prueba\n" % n for n in range(35000))
+    repetido = bytes(range(256)) * 4096
+    assert len(texto) > MIB and len(repetido) >= MIB
+    crear(origen / "registro.txt", texto)
+    crear(origen / "datos.bin", repetido)
+    crear(origen / "nota.txt", b"hola\n")
+
+    resumen, partes = comprimir(tmp_path, ["registro.txt", "datos.bin", "nota.txt"], MIB)
+
+    assert resumen["divididos"] == 0
+    assert len(partes) == 1
+    assert extraer(partes) == {"registro.txt": texto, "datos.bin": repetido, "nota.txt": b"hola\n"}
+
+
+def test_trozos_en_partes_consecutivas(tmp_path):
+    origen = tmp_path / "origen"
+    origen.mkdir()
+    azar = random.Random(20)
+    grande = azar.randbytes(3 * MIB + 1000)
+    pequenos = {f"p{n}.bin": azar.randbytes(300 * 1024) for n in range(4)}
+    crear(origen / "a.txt", b"primero\n")
+    crear(origen / "grande.bin", grande)
+    for nombre, contenido in pequenos.items():
+        crear(origen / nombre, contenido)
+
+    resumen, partes = comprimir(tmp_path, ["a.txt", "grande.bin", *pequenos], MIB)
+
+    assert resumen["divididos"] == 1
+    assert all(os.path.getsize(parte) <= MIB for parte in partes)
+    # Qué parte tiene cada trozo: deben ser partes seguidas y en orden
+    indices = []
+    for indice, parte in enumerate(partes):
+        with zipfile.ZipFile(parte) as z:
+            indices += [(nombre, indice) for nombre in z.namelist() if nombre.startswith("grande.bin.")]
+    indices.sort()
+    assert [indice for _, indice in indices] == list(range(indices[0][1], indices[0][1] + len(indices)))
+    contenido = extraer(partes)
+    assert b"".join(contenido.pop(nombre) for nombre, _ in indices) == grande
+    assert contenido == {"a.txt": b"primero\n", **pequenos}